@@ -0,0 +1,146 @@
+"""
+Módulo `async_api.py`
+
+API asíncrona del traductor para servicios basados en asyncio:
+
+    regex = await translate_async("letters then digits")
+
+`translate_to_regex` es CPU puro y bloquearía el bucle de eventos, así que
+el trabajo se delega en un executor configurable (hilos o procesos).
+Además:
+
+- Coalescencia: peticiones idénticas (misma frase, `simplify` y
+  `capture`) que llegan mientras otra igual está
+  en curso esperan el mismo resultado, sin volver a calcularlo.
+- Micro-lotes: las peticiones que llegan dentro de una ventana corta
+  (`window`, 2 ms por defecto) se envían juntas en una sola llamada al
+  executor, hasta `max_batch` frases por llamada.
+
+Con un `ThreadPoolExecutor` el bucle sigue compartiendo el GIL con la
+traducción; para aislarlo del todo conviene un `ProcessPoolExecutor`.
+"""
+
+import asyncio
+import weakref
+
+from lark_parser import translate_to_regex
+
+
+def _translate_batch(keys):
+    """Traduce un lote de claves (frase, simplify, capture) en el executor."""
+    return [translate_to_regex(phrase, simplify, capture) for phrase, simplify, capture in keys]
+
+
+class AsyncTranslator:
+    """
+    Traductor asíncrono ligado a un bucle de eventos.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor | None
+        Dónde se ejecuta la traducción; None usa el executor por defecto
+        del bucle (un pool de hilos).
+    window : float
+        Segundos que se espera a juntar peticiones antes de enviar el lote.
+    max_batch : int
+        Tamaño máximo de un lote; al alcanzarlo se envía sin esperar.
+    """
+
+    def __init__(self, executor=None, window: float = 0.002, max_batch: int = 64):
+        if max_batch < 1:
+            raise ValueError("max_batch debe ser al menos 1")
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self._inflight = {}     # (frase, simplify, capture) → asyncio.Future
+        self._batch = []        # claves esperando a la siguiente llamada
+        self._timer = None
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+
+    async def translate(self, phrase: str, simplify: bool = False, capture: bool = True) -> str:
+        """Equivalente asíncrono de `translate_to_regex(phrase, simplify, capture)`."""
+        self.requests += 1
+        key = (phrase, simplify, capture)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._enqueue(key)
+        else:
+            self.coalesced += 1
+        # `shield`: si un llamante se cancela, los demás siguen esperando
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        """Peticiones recibidas, coalescidas y llamadas al executor."""
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "inflight": len(self._inflight),
+        }
+
+    def _enqueue(self, key) -> None:
+        self._batch.append(key)
+        if len(self._batch) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    def _flush(self) -> None:
+        """Envía las claves acumuladas al executor en una sola llamada."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        keys, self._batch = self._batch, []
+        if not keys:
+            return
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        work = loop.run_in_executor(self.executor, _translate_batch, keys)
+        work.add_done_callback(lambda done: self._deliver(keys, done))
+
+    def _deliver(self, keys, done) -> None:
+        """Reparte los resultados (o la excepción) del lote entre sus esperas."""
+        if done.cancelled():
+            error, results = asyncio.CancelledError(), None
+        else:
+            error = done.exception()
+            results = None if error is not None else done.result()
+        for i, key in enumerate(keys):
+            future = self._inflight.pop(key, None)
+            if future is None or future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+
+# Un traductor por defecto por bucle de eventos
+_default_translators = weakref.WeakKeyDictionary()
+
+
+def get_translator() -> AsyncTranslator:
+    """Traductor por defecto del bucle de eventos en curso."""
+    loop = asyncio.get_running_loop()
+    translator = _default_translators.get(loop)
+    if translator is None:
+        translator = _default_translators[loop] = AsyncTranslator()
+    return translator
+
+
+def set_translator(translator: AsyncTranslator) -> None:
+    """Sustituye el traductor por defecto del bucle en curso (executor, ventana...)."""
+    _default_translators[asyncio.get_running_loop()] = translator
+
+
+async def translate_async(phrase: str, simplify: bool = False, capture: bool = True) -> str:
+    """
+    Traduce `phrase` sin bloquear el bucle de eventos, usando el traductor
+    por defecto del bucle (ver `get_translator` / `set_translator`). Sin
+    `capture`, los grupos se emiten sin captura, `(?:...)`.
+    """
+    return await get_translator().translate(phrase, simplify, capture)
@@ -0,0 +1,316 @@
+"""
+Módulo `batch.py`
+
+Modo por lotes (`python cli.py --batch FILE`): traduce un archivo de
+frases, una por línea, y escribe un registro JSONL por frase.
+
+- Las frases se leen y se escriben de una en una (streaming): la memoria
+  usada no depende del tamaño de la entrada.
+- La salida usa un búfer grande, sin vaciarlo tras cada línea.
+- Un error en una frase queda en su registro ("error") y el lote sigue.
+- Las líneas vacías se ignoran; cada registro lleva el número de línea
+  de la entrada ("line").
+- Con `match` (`--batch FILE --test TEXTO`), cada registro indica además si
+  TEXTO coincide completamente con su regex ("match").
+- Con `capture=False` (`--no-capture`) los grupos de cada regex se
+  emiten sin captura, `(?: ... )`.
+- Con `redos=True` (`--redos`), cada registro lleva el riesgo de
+  retroceso catastrófico de su regex ("redos", ver `redos.py`).
+- Con `jobs > 1` las frases se reparten por bloques entre procesos de
+  trabajo (`--jobs N`, `translate_many`), conservando el orden de la
+  entrada. Si un proceso muere, se reintenta su trabajo en otro nuevo.
+"""
+
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+import lark_parser
+from lark_parser import translate_record
+from profiler import TimingHistogram
+
+# Tamaño del búfer de salida (bytes)
+OUTPUT_BUFFER = 1 << 16
+
+# Frases por bloque enviado a un proceso de trabajo
+CHUNKSIZE = 256
+
+# Bloques en vuelo por proceso: acota la memoria sin dejar procesos ociosos
+CHUNKS_PER_JOB = 4
+
+# Error de los registros cuyo proceso de trabajo murió en todos los intentos
+WORKER_CRASH_ERROR = "ERROR interno: el proceso de trabajo terminó inesperadamente."
+
+
+def numbered_phrases(lines):
+    """Pares (número de línea, frase) de las líneas no vacías de `lines`."""
+    for number, line in enumerate(lines, start=1):
+        phrase = line.rstrip("\r\n")
+        if phrase.strip():
+            yield number, phrase
+
+
+def iter_records(lines, simplify: bool = True, jobs: int = 1, match: str | None = None,
+                 capture: bool = True, redos: bool = False):
+    """
+    Genera un registro de `translate_record` por cada línea no vacía de
+    `lines` (cualquier iterable de cadenas, p. ej. un archivo abierto),
+    en el orden de la entrada.
+
+    Con `jobs > 1` la traducción se reparte entre `jobs` procesos (ver
+    `ParallelTranslator`); `jobs=0` usa un proceso por núcleo. Con
+    `match`, cada registro lleva "match"; `capture` y `redos` se pasan
+    igual a `translate_record`.
+    """
+    jobs = resolve_jobs(jobs)
+    if jobs > 1:
+        translator = ParallelTranslator(jobs, simplify=simplify, match=match, capture=capture,
+                                        redos=redos)
+        yield from translator.run(numbered_phrases(lines))
+        return
+    for number, phrase in numbered_phrases(lines):
+        record = translate_record(phrase, simplify=simplify, match=match, capture=capture,
+                                  redos=redos)
+        record["line"] = number
+        yield record
+
+
+def translate_many(phrases, jobs: int = 1, simplify: bool = False,
+                   capture: bool = True) -> list:
+    """
+    Traduce una colección de frases, opcionalmente en paralelo.
+
+    Equivale a `[translate_to_regex(p, simplify, capture) for p in phrases]` (sin
+    caché): cada elemento es la regex o el mensaje de error que empieza
+    por "ERROR", en el mismo orden que `phrases`.
+
+    Parámetros
+    ----------
+    phrases : iterable de str
+        Frases a traducir (una frase por elemento).
+    jobs : int
+        Procesos de trabajo; 1 traduce en este proceso y 0 usa uno por núcleo.
+    simplify : bool
+        Si es True, simplifica además cada regex.
+    capture : bool
+        Si es False, los grupos se emiten sin captura `(?: ... )`.
+    """
+    results = []
+    pairs = enumerate(phrases, start=1)
+    if resolve_jobs(jobs) > 1:
+        records = ParallelTranslator(resolve_jobs(jobs), simplify=simplify,
+                                     capture=capture).run(pairs)
+    else:
+        records = (translate_record(phrase, simplify=simplify, capture=capture)
+                   for _, phrase in pairs)
+    for record in records:
+        results.append(record["error"] if record["error"] is not None else record["regex"])
+    return results
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Número efectivo de procesos: 0 (o negativo) = uno por núcleo."""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+# ----------------------------------------------------------------------
+# PROCESOS DE TRABAJO
+# ----------------------------------------------------------------------
+
+def _init_worker(engine: str) -> None:
+    """
+    Inicializa un proceso de trabajo: la gramática ya se cargó al importar
+    `lark_parser` (una vez por proceso); solo falta elegir el motor.
+    """
+    lark_parser.set_engine(engine)
+
+
+def _translate_chunk(chunk, simplify: bool, match: str | None = None, capture: bool = True,
+                     redos: bool = False):
+    """Traduce un bloque de pares (línea, frase) dentro de un proceso de trabajo."""
+    records = []
+    for number, phrase in chunk:
+        record = translate_record(phrase, simplify=simplify, match=match, capture=capture,
+                                  redos=redos)
+        record["line"] = number
+        records.append(record)
+    return records
+
+
+class ParallelTranslator:
+    """
+    Reparte bloques de frases entre procesos de trabajo y devuelve los
+    registros en el orden de la entrada.
+
+    Solo hay `jobs * CHUNKS_PER_JOB` bloques en vuelo, así que la memoria
+    no depende del tamaño de la entrada. Si un proceso muere (señal,
+    `os._exit`, falta de memoria...), el pool entero queda roto y no se
+    sabe qué bloque fue el culpable: se crea otro pool y los bloques
+    pendientes se repiten de uno en uno. El bloque que vuelve a romperlo
+    se traduce frase a frase, y la frase que sigue matando al proceso
+    recibe `WORKER_CRASH_ERROR`; el resto del lote continúa.
+    """
+
+    def __init__(self, jobs: int, simplify: bool = True, chunksize: int = CHUNKSIZE,
+                 match: str | None = None, capture: bool = True, redos: bool = False):
+        self.jobs = jobs
+        self.simplify = simplify
+        self.chunksize = chunksize
+        self.match = match
+        self.capture = capture
+        self.redos = redos
+        self.restarts = 0
+        self._pool = None
+
+    def run(self, pairs):
+        """Genera los registros de los pares (línea, frase) de `pairs`."""
+        pairs = iter(pairs)
+        pending = deque()   # (bloque, future) en orden de entrada
+        window = self.jobs * CHUNKS_PER_JOB
+        try:
+            while True:
+                while len(pending) < window:
+                    chunk = list(islice(pairs, self.chunksize))
+                    if not chunk:
+                        break
+                    pending.append((chunk, self._submit(chunk)))
+                if not pending:
+                    return
+                chunk, future = pending.popleft()
+                try:
+                    records = future.result()
+                except BrokenProcessPool:
+                    suspects = [chunk] + [c for c, _ in pending]
+                    pending.clear()
+                    self._restart()
+                    for suspect in suspects:
+                        yield from self._run_alone(suspect)
+                    continue
+                yield from records
+        finally:
+            self._shutdown()
+
+    def _submit(self, chunk):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.jobs,
+                initializer=_init_worker,
+                initargs=(lark_parser.engine,),
+            )
+        try:
+            return self._pool.submit(_translate_chunk, chunk, self.simplify, self.match,
+                                     self.capture, self.redos)
+        except BrokenProcessPool as e:
+            # El pool se rompió mientras se llenaba la ventana: el bloque
+            # se trata igual que uno cuyo proceso murió
+            future = Future()
+            future.set_exception(e)
+            return future
+
+    def _run_alone(self, chunk):
+        """Traduce `chunk` sin otros bloques en vuelo."""
+        try:
+            return self._submit(chunk).result()
+        except BrokenProcessPool:
+            self._restart()
+            return self._isolate(chunk)
+
+    def _isolate(self, chunk):
+        """Traduce `chunk` frase a frase para aislar las que matan al proceso."""
+        records = []
+        for number, phrase in chunk:
+            try:
+                records.extend(self._submit([(number, phrase)]).result())
+            except BrokenProcessPool:
+                self._restart()
+                record = {
+                    "phrase": phrase, "normalized": None, "regex": None,
+                    "valid": False, "error": WORKER_CRASH_ERROR,
+                    "timings": {}, "line": number,
+                }
+                if self.match is not None:
+                    record["match"] = False
+                if self.redos:
+                    record["redos"] = None
+                records.append(record)
+        return records
+
+    def _restart(self) -> None:
+        """Descarta el pool roto; `_submit` creará uno nuevo."""
+        self._shutdown()
+        self.restarts += 1
+
+    def _shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+def translate_stream(lines, out, simplify: bool = True, jobs: int = 1,
+                     profile: bool = False, match: str | None = None,
+                     capture: bool = True, redos: bool = False) -> dict:
+    """
+    Traduce `lines` y escribe un registro JSON por línea en `out`.
+
+    Devuelve un resumen: {"phrases": N, "errors": M, "invalid": K}, más
+    "matches" (frases cuya regex acepta `match`) si se pasa `match` y
+    "risky" (regex con riesgo "medium" o "high") si `redos=True`. Con
+    `profile=True` incluye además "profile": los percentiles de los
+    tiempos de cada fase (ver `profiler.TimingHistogram`).
+    """
+    summary = {"phrases": 0, "errors": 0, "invalid": 0}
+    if match is not None:
+        summary["matches"] = 0
+    if redos:
+        summary["risky"] = 0
+    histogram = TimingHistogram() if profile else None
+    dumps = json.dumps
+    write = out.write
+    for record in iter_records(lines, simplify=simplify, jobs=jobs, match=match,
+                               capture=capture, redos=redos):
+        summary["phrases"] += 1
+        if record.get("match"):
+            summary["matches"] += 1
+        if record.get("redos") and record["redos"]["risk"] != "none":
+            summary["risky"] += 1
+        if histogram is not None:
+            histogram.add(record["timings"])
+        if record["error"] is not None:
+            summary["errors"] += 1
+        elif not record["valid"]:
+            summary["invalid"] += 1
+        write(dumps(record, ensure_ascii=False))
+        write("\n")
+    if histogram is not None:
+        summary["profile"] = histogram.summary()
+    return summary
+
+
+def run_batch(source: str, simplify: bool = True, jobs: int = 1,
+              profile: bool = False, match: str | None = None,
+              capture: bool = True, redos: bool = False) -> dict:
+    """
+    Traduce el archivo `source` ("-" para la entrada estándar) y escribe
+    el JSONL en la salida estándar con un búfer de `OUTPUT_BUFFER` bytes.
+    `jobs` es el número de procesos de trabajo (ver `iter_records`);
+    `profile`, `match`, `capture` y `redos` se pasan a `translate_stream`.
+    """
+    out = open(sys.stdout.fileno(), "w", encoding="utf-8",
+               buffering=OUTPUT_BUFFER, closefd=False)
+    try:
+        if source == "-":
+            return translate_stream(sys.stdin, out, simplify=simplify, jobs=jobs,
+                                    profile=profile, match=match, capture=capture,
+                                    redos=redos)
+        with open(source, encoding="utf-8") as lines:
+            return translate_stream(lines, out, simplify=simplify, jobs=jobs,
+                                    profile=profile, match=match, capture=capture,
+                                    redos=redos)
+    finally:
+        out.flush()
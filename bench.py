@@ -0,0 +1,914 @@
+"""
+Módulo `bench.py`
+
+Micro-benchmarks del pipeline frase → regex. Cada benchmark compara la
+implementación actual contra la versión anterior (o contra una variante)
+y muestra una tabla con los tiempos medidos.
+
+Uso:
+
+    python bench.py                # ejecuta todos los benchmarks
+    python bench.py normalizer     # solo los indicados
+"""
+
+import argparse
+import re
+import time
+
+from normalizer import Normalizer
+
+
+# -------------------------------------------------------------------
+#  UTILIDADES DE MEDICIÓN
+# -------------------------------------------------------------------
+
+def measure(func, *args, repeat: int = 5, number: int = 1) -> float:
+    """
+    Ejecuta `func(*args)` `number` veces por ronda y devuelve el mejor
+    tiempo medio por llamada (en segundos) entre `repeat` rondas.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        elapsed = (time.perf_counter() - start) / number
+        best = min(best, elapsed)
+    return best
+
+
+def print_table(title: str, headers, rows) -> None:
+    """Imprime una tabla simple alineada por columnas."""
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows))
+        for i, h in enumerate(headers)
+    ]
+    print(f"\n=== {title} ===")
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+
+
+def fmt_us(seconds: float) -> str:
+    """Formatea un tiempo en microsegundos."""
+    return f"{seconds * 1e6:,.1f} µs"
+
+
+# -------------------------------------------------------------------
+#  NORMALIZER: SINÓNIMOS Y CONECTORES
+# -------------------------------------------------------------------
+
+def _legacy_expand(text: str) -> str:
+    """
+    Expansión previa a `PhraseExpander`: una pasada de `str.replace`
+    por sinónimo más una por conector.
+    """
+    text = re.sub(r"\bonce\b", "1 times", text)
+    text = re.sub(r"\btwice\b", "2 times", text)
+    text = re.sub(r"\bthrice\b", "3 times", text)
+    for src, tgt in Normalizer.SYNONYMS.items():
+        text = text.replace(src, tgt)
+    text = text.replace(" then ", " followed by ")
+    text = text.replace(" next ", " followed by ")
+    text = text.replace(" optionally ", " optional ")
+    return text
+
+
+def bench_normalizer() -> None:
+    """Expansión de sinónimos: bucle de `str.replace` vs trie compilado."""
+    short = "lowercase letters then hex digits optionally followed by digit twice"
+    unit = "letters then digits next 'abc' optionally followed by hex digits "
+    long = unit * (10 * 1024 // len(unit))
+
+    rows = []
+    for label, phrase, number in (("corta", short, 2000), ("10 KB", long, 20)):
+        legacy = measure(_legacy_expand, phrase, number=number)
+        current = measure(Normalizer.EXPANDER.expand, phrase, number=number)
+        rows.append((
+            label, len(phrase), fmt_us(legacy), fmt_us(current),
+            f"{legacy / current:.2f}x",
+        ))
+
+    print_table(
+        "Normalizer: expansión de sinónimos",
+        ("frase", "chars", "bucle replace", "trie (re)", "speedup"),
+        rows,
+    )
+
+
+def bench_normalizer_modes() -> None:
+    """Normalizer: reescritura de cadenas ("text") vs lista de tokens ("tokens")."""
+    import tracemalloc
+    from test import ENGLISH_NUMBER_TESTS, BASIC_TESTS, QUANTIFIER_TESTS
+
+    phrases = [p for p, _ in BASIC_TESTS + QUANTIFIER_TESTS + ENGLISH_NUMBER_TESTS]
+    long = " then ".join(phrases) * 8
+
+    rows = []
+    for mode in Normalizer.MODES:
+        norm = Normalizer(mode)
+        short_t = measure(lambda: [norm.normalize(p) for p in phrases], number=50)
+        long_t = measure(norm.normalize, long, number=5)
+
+        tracemalloc.start()
+        norm.normalize(long)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        rows.append((
+            mode, fmt_us(short_t / len(phrases)), fmt_us(long_t),
+            f"{peak / 1024:,.0f} KiB",
+        ))
+
+    print_table(
+        f"Normalizer: modos ({len(long)} chars en la frase larga)",
+        ("modo", "por frase", "frase larga", "pico memoria"),
+        rows,
+    )
+
+
+def bench_cache() -> None:
+    """Pipeline completo sin caché vs con caché LRU caliente."""
+    import lark_parser
+    from test import BASIC_TESTS, CLASS_TESTS, QUANTIFIER_TESTS
+
+    phrases = [p for p, _ in BASIC_TESTS + CLASS_TESTS + QUANTIFIER_TESTS]
+
+    def run():
+        for p in phrases:
+            lark_parser.translate_to_regex(p, simplify=True)
+
+    lark_parser.configure_cache(maxsize=0, error_maxsize=0, dsl_maxsize=0, ir_maxsize=0)
+    cold = measure(run, number=20)
+    # Solo el nivel del DSL: simula frases nuevas que se normalizan a un DSL
+    # conocido (se normaliza, pero no se parsea ni se traduce)
+    lark_parser.configure_cache(maxsize=0, error_maxsize=0)
+    run()
+    dsl = measure(run, number=20)
+    lark_parser.configure_cache()
+    run()
+    warm = measure(run, number=20)
+    stats = lark_parser.cache_stats()["results"]
+
+    print_table(
+        "Pipeline: caché LRU",
+        ("variante", "por frase", "speedup"),
+        [
+            ("sin caché", fmt_us(cold / len(phrases)), "1.00x"),
+            ("nivel DSL normalizado", fmt_us(dsl / len(phrases)), f"{cold / dsl:.1f}x"),
+            ("caché caliente", fmt_us(warm / len(phrases)), f"{cold / warm:.0f}x"),
+        ],
+    )
+    print(f"hits={stats['hits']} misses={stats['misses']} size={stats['size']}")
+
+
+_STARTUP_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import lark_parser
+t1 = time.perf_counter()
+lark_parser.translate_to_regex("letters then digits that appear three times")
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+
+def bench_startup(runs: int = 5) -> None:
+    """Import de `lark_parser` + primera traducción, con y sin tablas LALR cacheadas."""
+    import os
+    import statistics
+    import subprocess
+    import sys
+
+    import lark_parser
+
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def child(env_extra=None, before=None):
+        imports, firsts = [], []
+        for _ in range(runs):
+            if before:
+                before()
+            env = dict(os.environ, **(env_extra or {}))
+            out = subprocess.run(
+                [sys.executable, "-c", _STARTUP_SNIPPET],
+                cwd=here, env=env, capture_output=True, text=True, check=True,
+            ).stdout.split()
+            imports.append(float(out[0]))
+            firsts.append(float(out[1]))
+        return statistics.median(imports), statistics.median(firsts)
+
+    def remove_artifact():
+        try:
+            os.remove(lark_parser.grammar_cache_path())
+        except FileNotFoundError:
+            pass
+
+    variants = (
+        ("sin caché (en vivo)", child({"TRADUCTORREGEX_NO_GRAMMAR_CACHE": "1"})),
+        ("artefacto frío", child(before=remove_artifact)),
+        ("artefacto caliente", child()),
+    )
+    print_table(
+        f"Arranque: import + primera traducción (mediana de {runs})",
+        ("variante", "import", "1ª traducción", "total"),
+        [
+            (name, f"{imp * 1e3:.1f} ms", f"{first * 1e3:.1f} ms", f"{(imp + first) * 1e3:.1f} ms")
+            for name, (imp, first) in variants
+        ],
+    )
+
+
+def _dsl_corpus(size: int):
+    """
+    Corpus de frases ya normalizadas: los casos válidos de `test.py`
+    más concatenaciones de varios de ellos con "followed by".
+    """
+    import random
+
+    import lark_parser
+    from test import BASIC_TESTS, CLASS_TESTS, QUANTIFIER_TESTS, RANGE_TESTS
+
+    base = [
+        lark_parser.normalize_text(p)
+        for p, _ in BASIC_TESTS + CLASS_TESTS + QUANTIFIER_TESTS + RANGE_TESTS
+    ]
+    simple = [b for b in base if " or " not in b]
+    rng = random.Random(0)
+    corpus = []
+    while len(corpus) < size:
+        corpus.append(rng.choice(base))
+        corpus.append(" followed by ".join(rng.choices(simple, k=rng.randint(2, 8))))
+    return corpus[:size]
+
+
+def bench_fused(size: int = 5000) -> None:
+    """Parseo + traducción en dos pasos (árbol) vs fusionado dentro del LALR."""
+    import tracemalloc
+
+    import lark_parser
+
+    corpus = _dsl_corpus(size)
+    variants = (
+        ("dos pasos (árbol)",
+         lambda dsl: lark_parser.translate_tree(lark_parser.parse_normalized(dsl))),
+        ("fusionado", lark_parser.parse_and_translate),
+    )
+
+    rows = []
+    for name, translate in variants:
+        def run():
+            for dsl in corpus:
+                translate(dsl)
+
+        elapsed = measure(run, repeat=3)
+
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        rows.append((name, f"{len(corpus) / elapsed:,.0f}", f"{peak / 1024:,.1f} KiB"))
+
+    print_table(
+        f"Parseo + traducción ({len(corpus)} frases DSL)",
+        ("ruta", "frases/s", "pico memoria"),
+        rows,
+    )
+
+
+def bench_engines(size: int = 5000) -> None:
+    """Motores de parseo: Lark (árbol), Lark (fusionado) y parser escrito a mano."""
+    import lark_parser
+
+    corpus = _dsl_corpus(size)
+    variants = (
+        ("lark (árbol)",
+         lambda dsl: lark_parser.translate_tree(lark_parser.parse_normalized(dsl))),
+        ("lark (fusionado)", lambda dsl: lark_parser.parse_and_translate(dsl, "lark")),
+        ("fast", lambda dsl: lark_parser.parse_and_translate(dsl, "fast")),
+    )
+
+    rows = []
+    baseline = None
+    for name, translate in variants:
+        def run():
+            for dsl in corpus:
+                translate(dsl)
+
+        elapsed = measure(run, repeat=3)
+        baseline = baseline or elapsed
+        rows.append((name, f"{len(corpus) / elapsed:,.0f}", f"{baseline / elapsed:.2f}x"))
+
+    print_table(
+        f"Motores de parseo ({len(corpus)} frases DSL)",
+        ("motor", "frases/s", "speedup"),
+        rows,
+    )
+
+
+def bench_simplify() -> None:
+    """Simplificador: punto fijo de `re.sub` vs optimizador estructural sobre la IR."""
+    import random
+
+    import lark_parser
+    from regex_ir import to_regex
+    from utils import optimize_regex, simplify_regex, simplify_regex_legacy
+
+    corpus = [dsl for dsl in _dsl_corpus(400) if " or " not in dsl]
+    rng = random.Random(1)
+
+    def nested(depth):
+        # Grupos anidados: el punto fijo quita un nivel de paréntesis por pasada
+        return "group " * depth + "digit" + " end group" * depth
+
+    cases = [
+        (f"secuencia x{count}", " followed by ".join(rng.choices(corpus, k=count)))
+        for count in (10, 100, 1000)
+    ] + [
+        (f"anidados {depth}x{count}", " followed by ".join([nested(depth)] * count))
+        for depth, count in ((10, 10), (40, 20))
+    ]
+
+    rows = []
+    for label, dsl in cases:
+        node = lark_parser.parse_to_ir(dsl)
+        raw = to_regex(node)
+        number = max(1, 20000 // len(raw))
+
+        legacy = measure(simplify_regex_legacy, raw, repeat=3, number=number)
+        text = measure(simplify_regex, raw, repeat=3, number=number)
+        ir = measure(lambda: to_regex(optimize_regex(node)), repeat=3, number=number)
+        rows.append((
+            label, len(raw), fmt_us(legacy), fmt_us(text), fmt_us(ir),
+            f"{legacy / text:.2f}x", f"{legacy / ir:.2f}x",
+        ))
+
+    print_table(
+        "Simplificador de regex",
+        ("caso", "chars", "punto fijo", "estructural (texto)", "estructural (IR)",
+         "speedup texto", "speedup IR"),
+        rows,
+    )
+
+
+def bench_alternation(lines: int = 100000) -> None:
+    """
+    Búsqueda línea a línea con alternativas de un carácter sin unir (la
+    regex cruda, como la dejaba antes el simplificador) vs unidas en una
+    sola clase: `search` de X{8} y `fullmatch` de X+ sobre cada línea.
+    """
+    import random
+
+    import lark_parser
+    from utils import compile_regex
+
+    phrases = [
+        "digit or letter or space",
+        "vowel or digit or '_'",
+        "range 'a' to 'f' or range 'A' to 'F' or digit or whitespace",
+        "hex digit or space or '_' or ','",
+    ]
+    rng = random.Random(2)
+    text_lines = [
+        "".join(rng.choices("abcdefxyzABCDEF0123456789 _-.,;:!?\t", k=rng.randint(20, 60)))
+        for _ in range(lines)
+    ]
+    # Para `fullmatch`, líneas con caracteres que casi todas las clases aceptan
+    words = ["".join(rng.choices("abc019 ", k=rng.randint(20, 60))) for _ in range(lines)]
+
+    def run(pattern, method, data):
+        match = getattr(pattern, method)
+        return [match(line) is not None for line in data]
+
+    rows = []
+    for phrase in phrases:
+        lark_parser.clear_cache()
+        before = lark_parser.translate_to_regex(phrase)
+        after = lark_parser.translate_to_regex(phrase, simplify=True)
+        timings = []
+        for regex in (before, after):
+            search = compile_regex(f"{regex}{{8}}")
+            full = compile_regex(f"{regex}+")
+            timings.append((
+                measure(run, search, "search", text_lines),
+                measure(run, full, "fullmatch", words),
+            ))
+            results = (run(search, "search", text_lines), run(full, "fullmatch", words))
+            if regex is before:
+                expected = results
+            assert results == expected, phrase
+        (search_before, full_before), (search_after, full_after) = timings
+        rows.append((
+            phrase, before, after,
+            f"{search_before * 1e3:,.1f} ms", f"{search_after * 1e3:,.1f} ms",
+            f"{search_before / search_after:.1f}x",
+            f"{full_before * 1e3:,.1f} ms", f"{full_after * 1e3:,.1f} ms",
+            f"{full_before / full_after:.1f}x",
+        ))
+
+    print_table(
+        f"Alternativas de un carácter vs clase única ({lines:,} líneas)",
+        ("frase", "antes", "después", "search X{8} antes", "después", "speedup",
+         "fullmatch X+ antes", "después", "speedup"),
+        rows,
+    )
+
+
+def bench_trie(lines: int = 20000) -> None:
+    """
+    Listas de palabras clave (100 a 10.000 literales): alternativa plana
+    vs factorizada en forma de trie. Mide el coste de simplificar, de
+    compilar con `re` y de buscar línea a línea.
+    """
+    import random
+    import re
+
+    import lark_parser
+    from regex_ir import to_regex
+    from utils import optimize_regex
+
+    rng = random.Random(3)
+    syllables = ["con", "pro", "tra", "ment", "ing", "er", "al", "de", "re", "ta",
+                 "sub", "inter", "pre", "ly", "ous", "ver", "ca", "mo", "ni", "st"]
+
+    def keyword():
+        return "".join(rng.choices(syllables, k=rng.randint(2, 4)))
+
+    rows = []
+    for size in (100, 1000, 10000):
+        words = list(dict.fromkeys(keyword() for _ in range(size * 2)))[:size]
+        node = lark_parser.parse_to_ir(" or ".join(f"'{w}'" for w in words))
+        before = to_regex(node)
+        simplify = measure(lambda: to_regex(optimize_regex(node)), repeat=3)
+        after = to_regex(optimize_regex(node))
+        text = [" ".join(keyword() for _ in range(6)) for _ in range(lines)]
+
+        timings = []
+        for regex in (before, after):
+            compile_time = measure(re.compile, regex, repeat=1)
+            re.purge()
+            pattern = re.compile(regex)
+            search = measure(lambda: [pattern.search(line) for line in text], repeat=3)
+            timings.append((compile_time, search, [m and m.span() for m in map(pattern.search, text)]))
+        (compile_before, search_before, spans_before), (compile_after, search_after, spans_after) = timings
+        assert spans_before == spans_after
+        rows.append((
+            size, f"{len(before):,}", f"{len(after):,}", f"{simplify * 1e3:,.1f} ms",
+            f"{compile_before * 1e3:,.1f} ms", f"{compile_after * 1e3:,.1f} ms",
+            f"{search_before * 1e3:,.1f} ms", f"{search_after * 1e3:,.1f} ms",
+            f"{search_before / search_after:.1f}x",
+        ))
+
+    print_table(
+        f"Alternativas literales en forma de trie ({lines:,} líneas)",
+        ("literales", "chars plana", "chars trie", "simplificar", "compilar plana",
+         "compilar trie", "search plana", "search trie", "speedup"),
+        rows,
+    )
+
+
+def bench_capture(lines: int = 100000, rounds: int = 7) -> None:
+    """
+    Grupos de captura vs sin captura (`capture=False`): la misma frase
+    traducida en los dos modos; `search` y `fullmatch` sobre cada línea.
+    Las rondas de los dos modos se alternan para que el ruido de la
+    máquina afecte a ambos por igual.
+    """
+    import random
+    from collections import deque
+
+    import lark_parser
+    from utils import compile_regex
+
+    phrases = [
+        "group letter followed by digit end group one or more",
+        "group group vowel followed by consonant end group 2 times followed by digit end group one or more",
+        "letter one or more followed by group ' ' followed by letter one or more end group zero or more",
+        "'ab' or 'cd' or digit one or more",
+        "group group letter then digit end group then space end group one or more",
+    ]
+    rng = random.Random(4)
+    # Líneas en las que casi todas las regex encuentran (y repiten) su grupo
+    text_lines = [
+        "".join(rng.choices(["a1", "e4", "ik", "ob", "x9 ", "cd", "ab", "Qz ", "7"], k=rng.randint(8, 30)))
+        for _ in range(lines)
+    ]
+
+    def run(match):
+        start = time.perf_counter()
+        deque(map(match, text_lines), maxlen=0)
+        return time.perf_counter() - start
+
+    def spans(match):
+        return [m and m.span() for m in map(match, text_lines)]
+
+    rows = []
+    for phrase in phrases:
+        lark_parser.clear_cache()
+        capturing = lark_parser.translate_to_regex(phrase, simplify=True)
+        plain = lark_parser.translate_to_regex(phrase, simplify=True, capture=False)
+        best = {}
+        for method in ("search", "fullmatch"):
+            both = [getattr(compile_regex(regex), method) for regex in (capturing, plain)]
+            assert spans(both[0]) == spans(both[1]), phrase
+            best[method] = [float("inf")] * 2
+            for _ in range(rounds):
+                for i, match in enumerate(both):
+                    best[method][i] = min(best[method][i], run(match))
+        (search_cap, search_plain), (full_cap, full_plain) = best["search"], best["fullmatch"]
+        rows.append((
+            capturing, plain,
+            f"{search_cap * 1e3:,.1f} ms", f"{search_plain * 1e3:,.1f} ms",
+            f"{search_cap / search_plain:.2f}x",
+            f"{full_cap * 1e3:,.1f} ms", f"{full_plain * 1e3:,.1f} ms",
+            f"{full_cap / full_plain:.2f}x",
+        ))
+
+    print_table(
+        f"Grupos de captura vs sin captura ({lines:,} líneas)",
+        ("con captura", "sin captura", "search (...)", "search (?:...)", "speedup",
+         "fullmatch (...)", "fullmatch (?:...)", "speedup"),
+        rows,
+    )
+
+
+def bench_dfa(lines: int = 20000) -> None:
+    """
+    Motor DFA (`dfa.py`) frente a `re`: `search` línea a línea con regex
+    típicas del traductor, y entradas hostiles para regex con
+    cuantificadores anidados, donde `re` tarda un tiempo exponencial.
+    """
+    import random
+
+    import lark_parser
+    from dfa import compile_dfa
+    from utils import compile_regex
+
+    rng = random.Random(5)
+    typical = [
+        "letters then digits",
+        "digit or letter or space",
+        "group letter followed by digit end group one or more",
+        "'hello' or 'help' or 'helm' or 'world'",
+        "letter one or more followed by group ' ' followed by letter one or more end group zero or more",
+    ]
+    text_lines = [
+        "".join(rng.choices(["ab", "c1", " ", "hel", "lo", "world", "x9", "Q"], k=rng.randint(5, 20)))
+        for _ in range(lines)
+    ]
+    rows = []
+    for phrase in typical:
+        regex = lark_parser.translate_to_regex(phrase, simplify=True)
+        pattern, automaton = compile_regex(regex), compile_dfa(regex)
+        assert [m and m.start() for m in map(pattern.search, text_lines)] == \
+            [m and m.start() for m in map(automaton.search, text_lines)], phrase
+        before = measure(lambda: [pattern.search(line) for line in text_lines], repeat=3)
+        after = measure(lambda: [automaton.search(line) for line in text_lines], repeat=3)
+        rows.append((regex, f"{lines:,} líneas", f"{before * 1e3:,.1f} ms",
+                     f"{after * 1e3:,.1f} ms", f"{before / after:.2f}x"))
+
+    # "aaa...a!" obliga a `re` a probar todas las formas de repartir las
+    # letras entre los dos cuantificadores antes de fallar
+    hostile = [
+        ("group letter one or more end group one or more followed by digit", "a", "!"),
+        ("group digit zero or more followed by digit end group one or more followed by 'y'", "1", "!"),
+    ]
+    for phrase, unit, tail in hostile:
+        regex = lark_parser.translate_to_regex(phrase, simplify=True)
+        pattern, automaton = compile_regex(regex), compile_dfa(regex)
+        for size in (16, 18, 20, 22, 100000):
+            text = unit * size + tail
+            after = measure(automaton.search, text, repeat=3)
+            if size <= 22:
+                before = measure(pattern.search, text, repeat=1)
+                speedup = f"{before / after:,.0f}x"
+                before = f"{before * 1e3:,.1f} ms"
+            else:
+                before, speedup = "(exponencial)", "-"
+            rows.append((regex, f"{unit!r} x {size:,} + {tail!r}", before,
+                         f"{after * 1e3:,.2f} ms", speedup))
+
+    print_table(
+        "Motor DFA vs re (search)",
+        ("regex", "entrada", "re", "dfa", "speedup"),
+        rows,
+    )
+
+
+def bench_redos(phrases: int = 2000) -> None:
+    """
+    Analizador de retroceso catastrófico (`redos.py`): lo que cuesta en el
+    modo por lotes (`translate_record` con y sin `redos=True`) y el tiempo
+    de `re.fullmatch` (como `--test`) con la regex original y con su
+    reescritura segura en entradas hostiles.
+    """
+    from collections import Counter
+
+    import lark_parser
+    from phrase_generator import PhraseGenerator
+    from redos import analyze_redos
+    from utils import compile_regex
+
+    corpus = list(PhraseGenerator(seed=25, max_depth=3).phrases(phrases))
+    before = measure(lambda: [lark_parser.translate_record(p) for p in corpus], repeat=3)
+    after = measure(lambda: [lark_parser.translate_record(p, redos=True) for p in corpus],
+                    repeat=3)
+    risks = Counter(r["redos"]["risk"] for r in
+                    (lark_parser.translate_record(p, redos=True) for p in corpus) if r["redos"])
+    rows = [(f"{phrases:,} frases generadas", "sin análisis / con análisis",
+             f"{before * 1e3:,.0f} ms", f"{after * 1e3:,.0f} ms",
+             f"+{(after - before) / phrases * 1e3:.2f} ms/frase")]
+    rows.append(("riesgo", ", ".join(f"{k}: {v}" for k, v in risks.most_common()), "", "", ""))
+
+    hostile = [
+        ("group letter one or more end group one or more followed by digit", "a", "!"),
+        ("group digit zero or more end group one or more followed by 'y'", "1", "!"),
+    ]
+    for phrase, unit, tail in hostile:
+        regex = lark_parser.translate_to_regex(phrase, simplify=True)
+        rewrite = analyze_redos(regex)["rewrite"]
+        pattern, safe = compile_regex(regex), compile_regex(rewrite)
+        for size in (16, 20, 22, 100000):
+            text = unit * size + tail
+            after = measure(safe.fullmatch, text, repeat=3)
+            if size <= 22:
+                before = measure(pattern.fullmatch, text, repeat=1)
+                speedup = f"{before / after:,.0f}x"
+                before = f"{before * 1e3:,.1f} ms"
+            else:
+                before, speedup = "(exponencial)", "-"
+            rows.append((f"{regex} → {rewrite}", f"{unit!r} x {size:,} + {tail!r}", before,
+                         f"{after * 1e3:,.2f} ms", speedup))
+
+    print_table(
+        "Análisis ReDoS: coste y regex reescrita (re.fullmatch)",
+        ("caso", "entrada", "antes", "después", "diferencia"),
+        rows,
+    )
+
+
+def bench_hashcons() -> None:
+    """IR sin compartir vs internada (`NodeTable`) en frases con subárboles repetidos."""
+    import gc
+    import tracemalloc
+
+    from fast_parser import FastParser
+    from profiler import count_nodes
+    from regex_ir import NodeTable, to_regex
+    from translator import CONSTANTS, RegexTranslator
+    from utils import optimize_regex
+
+    sub = "group digit followed by letter 2 times end group one or more"
+    cases = [
+        ("secuencia x300", " followed by ".join([sub] * 300)),
+        ("alternativas x200", " or ".join([sub] * 200)),
+        ("anidados x100", " followed by ".join(
+            [f"group group {sub} followed by vowel end group followed by digit end group 3 times"] * 100)),
+    ]
+
+    def build(dsl, maxsize):
+        # Tabla nueva en cada llamada: se mide la compartición dentro de la frase
+        translator = RegexTranslator(nodes=NodeTable(seed=CONSTANTS, maxsize=maxsize))
+        return FastParser(translator).parse(dsl)
+
+    rows = []
+    for label, dsl in cases:
+        results = {}
+        for name, maxsize in (("árbol", 0), ("internada", 65536)):
+            node = build(dsl, maxsize)
+            tracemalloc.start()
+            kept = build(dsl, maxsize)
+            gc.collect()    # solo cuenta lo que sigue vivo: la IR
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del kept
+            parse = measure(build, dsl, maxsize, repeat=3, number=5)
+            simplify = measure(lambda: to_regex(optimize_regex(node)), repeat=3, number=5)
+            results[name] = (parse, simplify, memory, _unique_nodes(node))
+        tree, shared = results["árbol"], results["internada"]
+        rows.append((
+            label, count_nodes(build(dsl, 0)), shared[3],
+            fmt_us(tree[0]), fmt_us(shared[0]),
+            fmt_us(tree[1]), fmt_us(shared[1]), f"{tree[1] / shared[1]:.1f}x",
+            f"{tree[2] / 1024:,.1f} KiB", f"{shared[2] / 1024:,.1f} KiB",
+        ))
+
+    print_table(
+        "Hash-consing de la IR",
+        ("caso", "nodos", "únicos", "parseo árbol", "parseo internada",
+         "simplif. árbol", "simplif. internada", "speedup", "memoria árbol", "memoria internada"),
+        rows,
+    )
+
+
+def _unique_nodes(node) -> int:
+    """Nodos distintos (por identidad) bajo `node`."""
+    from regex_ir import Node
+
+    seen = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        for name in ("child", "items", "branches", "quantifier"):
+            value = getattr(current, name, None)
+            if isinstance(value, Node):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(value)
+    return len(seen)
+
+
+def bench_parallel(size: int = 20000) -> None:
+    """Traducción por lotes con 1, 2, 4, 8 y 16 procesos de trabajo."""
+    import os
+
+    import batch
+    from test import BASIC_TESTS, CLASS_TESTS, QUANTIFIER_TESTS, SYNONYM_TESTS
+
+    base = [p for p, _ in BASIC_TESTS + CLASS_TESTS + QUANTIFIER_TESTS + SYNONYM_TESTS]
+    phrases = [f"{p} then digit {i % 50 + 1} times" for i, p in
+               zip(range(size), base * (size // len(base) + 1))]
+
+    rows = []
+    baseline = None
+    for jobs in (1, 2, 4, 8, 16):
+        start = time.perf_counter()
+        batch.translate_many(phrases, jobs=jobs)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        rows.append((jobs, f"{elapsed:.2f} s", f"{size / elapsed:,.0f}", f"{baseline / elapsed:.2f}x"))
+
+    print_table(
+        f"Lotes en paralelo ({size} frases, {os.cpu_count()} núcleos)",
+        ("procesos", "tiempo", "frases/s", "speedup"),
+        rows,
+    )
+
+
+def bench_serve(runs: int = 10) -> None:
+    """Una traducción por proceso: `cli.py` completo vs `client.py` contra el servidor."""
+    import os
+    import statistics
+    import subprocess
+    import sys
+    import tempfile
+
+    import client
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    phrase = "letters then digits that appear three times"
+
+    def run(argv):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *argv], cwd=here, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+    cli_time = run(["cli.py", phrase])
+    client.connect(path).close()   # lanza el servidor y espera a que responda
+    try:
+        client_time = run(["client.py", "--socket", path, phrase])
+    finally:
+        client.request({"op": "shutdown"}, path, spawn=False)
+
+    print_table(
+        f"Una frase por proceso (mediana de {runs})",
+        ("comando", "tiempo", "speedup"),
+        [
+            ("python cli.py", f"{cli_time * 1e3:.0f} ms", "1.00x"),
+            ("python client.py (servidor)", f"{client_time * 1e3:.0f} ms", f"{cli_time / client_time:.1f}x"),
+        ],
+    )
+
+
+def bench_async(clients: int = 50, per_client: int = 40) -> None:
+    """
+    Prueba de carga: latencia del bucle de eventos mientras `clients`
+    tareas traducen frases, llamando a `translate_to_regex` directamente
+    (bloquea el bucle) o con `translate_async` sobre hilos o procesos.
+    """
+    import asyncio
+    import random
+    import statistics
+    from concurrent.futures import ProcessPoolExecutor
+
+    import lark_parser
+    from async_api import AsyncTranslator, _translate_batch
+    from test import BASIC_TESTS, CLASS_TESTS, QUANTIFIER_TESTS, SYNONYM_TESTS
+
+    base = [p for p, _ in BASIC_TESTS + CLASS_TESTS + QUANTIFIER_TESTS + SYNONYM_TESTS]
+    rng = random.Random(0)
+    # Frases con repeticiones, como las de un servicio real; sin caché LRU
+    # para que cada traducción haga el trabajo completo
+    workload = [[f"{rng.choice(base)} then digit {rng.randint(1, 20)} times"
+                 for _ in range(per_client)] for _ in range(clients)]
+    lark_parser.configure_cache(maxsize=0, error_maxsize=0, dsl_maxsize=0, ir_maxsize=0)
+
+    async def run(translate):
+        lags = []
+        done = asyncio.Event()
+
+        async def ticker():
+            loop = asyncio.get_running_loop()
+            while not done.is_set():
+                expected = loop.time() + 0.001
+                await asyncio.sleep(0.001)
+                lags.append(loop.time() - expected)
+
+        async def client(phrases):
+            for phrase in phrases:
+                await translate(phrase)
+                await asyncio.sleep(rng.random() * 0.002)
+
+        tick = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*(client(p) for p in workload))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await tick
+        return elapsed, lags
+
+    async def direct(phrase):
+        return lark_parser.translate_to_regex(phrase)
+
+    rows = []
+    total = clients * per_client
+
+    def add(name, result, stats=None):
+        elapsed, lags = result
+        lags.sort()
+        batches = f"{stats['batches']} lotes, {stats['coalesced']} coalescidas" if stats else "-"
+        rows.append((
+            name,
+            f"{statistics.median(lags) * 1e3:.2f} ms",
+            f"{lags[int(len(lags) * 0.99)] * 1e3:.2f} ms",
+            f"{lags[-1] * 1e3:.1f} ms",
+            f"{total / elapsed:,.0f}",
+            batches,
+        ))
+
+    add("directa (bloquea el bucle)", asyncio.run(run(direct)))
+    for name, executor in (("async, hilos", None),
+                           ("async, procesos", ProcessPoolExecutor(max_workers=2))):
+        translator = AsyncTranslator(executor=executor)
+        if executor is not None:
+            executor.submit(_translate_batch, []).result()   # arranca los procesos
+        add(name, asyncio.run(run(translator.translate)), translator.stats())
+        if executor is not None:
+            executor.shutdown()
+    lark_parser.configure_cache()
+
+    print_table(
+        f"Bucle de eventos bajo carga ({clients} clientes x {per_client} frases)",
+        ("variante", "retraso p50", "retraso p99", "retraso máx", "frases/s", "ejecutor"),
+        rows,
+    )
+
+
+# Registro de benchmarks disponibles (nombre → función)
+BENCHMARKS = {
+    "normalizer": bench_normalizer,
+    "normalizer-modes": bench_normalizer_modes,
+    "cache": bench_cache,
+    "startup": bench_startup,
+    "fused": bench_fused,
+    "engines": bench_engines,
+    "simplify": bench_simplify,
+    "hashcons": bench_hashcons,
+    "alternation": bench_alternation,
+    "trie": bench_trie,
+    "capture": bench_capture,
+    "dfa": bench_dfa,
+    "redos": bench_redos,
+    "parallel": bench_parallel,
+    "serve": bench_serve,
+    "async": bench_async,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks del traductor DSL → regex"
+    )
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help=f"Benchmarks a ejecutar (por defecto, todos): {', '.join(BENCHMARKS)}.",
+    )
+    args = parser.parse_args()
+
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"benchmark desconocido: {', '.join(unknown)}")
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,294 @@
+"""
+Módulo `bench_suite.py`
+
+Suite de rendimiento del pipeline con detección de regresiones.
+
+Mide cada fase por separado (`Normalizer.normalize`, `parse_normalized`,
+`translate_tree`, `simplify_regex`) y el pipeline completo
+(`translate_to_regex` sin caché) sobre dos corpus:
+
+- "tests": las frases válidas de `test.py`.
+- "synthetic": frases más largas, encadenando las anteriores con
+  conectores y alternativas (tamaño configurable con `--size`).
+
+Para cada fase y corpus informa del rendimiento (frases/s), la latencia
+por frase (p50 y p99) y el pico de memoria (tracemalloc, en otra pasada).
+
+Uso:
+
+    python bench_suite.py --save            # guarda la línea base
+    python bench_suite.py                   # compara con la línea base
+    python bench_suite.py --threshold 0.1   # tolerancia del 10%
+
+Sale con código 1 si alguna fase empeora más que el umbral respecto a la
+línea base: menos frases/s, más latencia p50 o más memoria. La p99 se
+informa pero no se compara (es demasiado ruidosa en un solo proceso).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import lark_parser
+from utils import simplify_regex
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "bench_baseline.json")
+
+# Formato del archivo de línea base
+BASELINE_VERSION = 1
+
+# Fases medidas, en orden
+STAGES = ("normalize", "parse", "translate", "simplify", "pipeline")
+
+# Métricas que se comparan con la línea base: (clave, mayor es mejor)
+GATED_METRICS = (("throughput", True), ("p50_us", False), ("peak_kib", False))
+
+# Las métricas de memoria varían menos: tolerancia propia por defecto
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MEMORY_THRESHOLD = 0.10
+
+
+# -------------------------------------------------------------------
+#  CORPUS
+# -------------------------------------------------------------------
+
+def test_phrases():
+    """Frases válidas de los grupos de pruebas de `test.py`."""
+    from test import (
+        BASIC_TESTS, RANGE_TESTS, CLASS_TESTS, QUANTIFIER_TESTS,
+        ENGLISH_NUMBER_TESTS, SYNONYM_TESTS,
+    )
+    groups = (BASIC_TESTS + RANGE_TESTS + CLASS_TESTS + QUANTIFIER_TESTS
+              + ENGLISH_NUMBER_TESTS + SYNONYM_TESTS)
+    return [phrase for phrase, expected in groups if expected is not None]
+
+
+def synthetic_phrases(size: int, seed: int = 0):
+    """
+    Corpus reproducible de `size` frases: de 2 a 12 frases de prueba
+    unidas con "then" / "followed by", y algunas alternativas con "or".
+    Solo se conservan las que el pipeline traduce sin error.
+    """
+    base = test_phrases()
+    simple = [p for p in base if " or " not in p and "group" not in p]
+    rng = random.Random(seed)
+    corpus = []
+    while len(corpus) < size:
+        if rng.random() < 0.2:
+            phrase = " or ".join(rng.choices(simple, k=rng.randint(2, 4)))
+        else:
+            connector = rng.choice((" then ", " followed by "))
+            phrase = connector.join(rng.choices(base, k=rng.randint(2, 12)))
+        if not lark_parser._translate_uncached(phrase, False).startswith("ERROR"):
+            corpus.append(phrase)
+    return corpus
+
+
+# -------------------------------------------------------------------
+#  MEDICIÓN
+# -------------------------------------------------------------------
+
+def stage_inputs(phrases):
+    """
+    Entrada de cada fase, calculada con la fase anterior, para medirlas
+    por separado: {fase: (función, [entradas])}.
+    """
+    normalized = [lark_parser.normalize_text(p) for p in phrases]
+    trees = [lark_parser.parse_normalized(n) for n in normalized]
+    raw = [lark_parser.translate_tree(t) for t in trees]
+    return {
+        "normalize": (lark_parser.normalizer.normalize, phrases),
+        "parse": (lark_parser.parse_normalized, normalized),
+        "translate": (lark_parser.translate_tree, trees),
+        "simplify": (simplify_regex, raw),
+        "pipeline": (lambda p: lark_parser._translate_uncached(p, True), phrases),
+    }
+
+
+def measure_stage(func, inputs, rounds: int) -> dict:
+    """
+    Rendimiento, latencias y pico de memoria de `func` sobre `inputs`.
+
+    Tras una ronda de calentamiento, la latencia se toma por llamada en
+    `rounds` rondas; el rendimiento, de la mejor ronda completa. La
+    memoria se mide en una pasada aparte para que tracemalloc no afecte a
+    los tiempos.
+    """
+    perf_counter = time.perf_counter
+    for item in inputs:
+        func(item)   # calentamiento: cachés del normalizador, del intérprete...
+    latencies = []
+    best = float("inf")
+    for _ in range(rounds):
+        round_start = perf_counter()
+        for item in inputs:
+            start = perf_counter()
+            func(item)
+            latencies.append(perf_counter() - start)
+        best = min(best, perf_counter() - round_start)
+    latencies.sort()
+
+    tracemalloc.start()
+    for item in inputs:
+        func(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "count": len(inputs),
+        "throughput": round(len(inputs) / best, 1),
+        "p50_us": round(_percentile(latencies, 50) * 1e6, 2),
+        "p99_us": round(_percentile(latencies, 99) * 1e6, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _percentile(sorted_values, p: float) -> float:
+    """Percentil `p` (0-100) de una lista ya ordenada (rango más cercano)."""
+    index = max(0, min(len(sorted_values) - 1, round(len(sorted_values) * p / 100) - 1))
+    return sorted_values[index]
+
+
+def run_suite(size: int = 2000, rounds: int = 5, stages=STAGES) -> dict:
+    """
+    Ejecuta la suite y devuelve los resultados con el formato de la
+    línea base: {"results": {"corpus/fase": {métricas}}, ...}.
+    """
+    corpora = {"tests": test_phrases(), "synthetic": synthetic_phrases(size)}
+    results = {}
+    lark_parser.clear_cache()
+    for corpus, phrases in corpora.items():
+        inputs = stage_inputs(phrases)
+        for stage in stages:
+            func, items = inputs[stage]
+            results[f"{corpus}/{stage}"] = measure_stage(func, items, rounds)
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "size": size,
+        "results": results,
+    }
+
+
+# -------------------------------------------------------------------
+#  LÍNEA BASE
+# -------------------------------------------------------------------
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            memory_threshold: float = DEFAULT_MEMORY_THRESHOLD):
+    """
+    Compara `current` con `baseline` y devuelve la lista de regresiones
+    como tuplas (clave, métrica, valor base, valor actual, cambio).
+
+    Una métrica regresa si empeora más que su umbral (fracción): menos
+    frases/s o más latencia p50 (`threshold`), o más memoria
+    (`memory_threshold`). Las claves que no están en ambas se ignoran.
+    """
+    regressions = []
+    for key, metrics in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        for metric, higher_is_better in GATED_METRICS:
+            old, new = base[metric], metrics[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            limit = memory_threshold if metric == "peak_kib" else threshold
+            worse = -change if higher_is_better else change
+            if worse > limit:
+                regressions.append((key, metric, old, new, change))
+    return regressions
+
+
+def load_baseline(path: str):
+    """Lee la línea base de `path`; None si no existe o es de otro formato."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baseline.get("version") != BASELINE_VERSION:
+        return None
+    return baseline
+
+
+def save_baseline(results: dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def print_results(results: dict, baseline=None) -> None:
+    """Tabla con las métricas de cada fase y, si hay línea base, el cambio."""
+    from bench import print_table
+
+    rows = []
+    for key, m in results["results"].items():
+        row = [key, m["count"], f"{m['throughput']:,.0f}", f"{m['p50_us']:,.1f}",
+               f"{m['p99_us']:,.1f}", f"{m['peak_kib']:,.1f}"]
+        base = baseline and baseline["results"].get(key)
+        if base:
+            row.append(f"{(m['throughput'] - base['throughput']) / base['throughput']:+.1%}")
+        rows.append(row)
+    headers = ["corpus/fase", "n", "frases/s", "p50 µs", "p99 µs", "pico KiB"]
+    if baseline:
+        headers.append("Δ frases/s")
+        rows = [r + [""] * (len(headers) - len(r)) for r in rows]
+    print_table(f"Suite de rendimiento ({results['size']} frases sintéticas)", headers, rows)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Suite de rendimiento del pipeline con línea base."
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Archivo JSON de la línea base (por defecto: bench_baseline.json).")
+    parser.add_argument("--save", action="store_true",
+                        help="Guarda los resultados como nueva línea base.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Empeoramiento máximo tolerado en frases/s y p50 (fracción; por defecto: 0.25).")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                        help="Empeoramiento máximo tolerado en memoria (fracción; por defecto: 0.10).")
+    parser.add_argument("--size", type=int, default=2000,
+                        help="Frases del corpus sintético (por defecto: 2000).")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="Rondas por fase (por defecto: 5).")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES,
+                        help="Fases a medir (por defecto, todas).")
+    args = parser.parse_args(argv)
+
+    results = run_suite(size=args.size, rounds=args.rounds, stages=args.stages)
+    baseline = None if args.save else load_baseline(args.baseline)
+    print_results(results, baseline)
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"\nLínea base guardada en {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"\nNo hay línea base en {args.baseline}; créala con --save.")
+        return 0
+    if baseline.get("size") != results["size"]:
+        print(f"\nAVISO: la línea base usa {baseline.get('size')} frases sintéticas "
+              f"y esta ejecución {results['size']}.")
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    if not regressions:
+        print("\nSin regresiones respecto a la línea base.")
+        return 0
+    print("\nREGRESIONES:")
+    for key, metric, old, new, change in regressions:
+        print(f"  {key} {metric}: {old:,} → {new:,} ({change:+.1%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Módulo `cache.py`
+
+Caché LRU acotada y segura para hilos, usada para memorizar resultados
+del pipeline frase → regex.
+
+Características:
+
+- Tamaño máximo (`maxsize`): al superarlo se descarta la entrada usada
+  hace más tiempo.
+- Tiempo de vida opcional (`ttl`, en segundos): las entradas caducadas
+  se descartan al consultarlas.
+- Contadores de aciertos, fallos, desalojos y caducidades (`stats()`).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Centinela para distinguir "no está en caché" de un valor None almacenado
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Caché LRU con límite de tamaño y TTL opcional.
+
+    Todas las operaciones están protegidas por un único `threading.Lock`,
+    por lo que la misma instancia puede compartirse entre hilos.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None, clock=time.monotonic):
+        """
+        Parameters
+        ----------
+        maxsize : int
+            Número máximo de entradas. Con 0 la caché queda desactivada.
+        ttl : float | None
+            Segundos de vida de cada entrada; None significa sin caducidad.
+        clock : callable
+            Fuente de tiempo (inyectable para pruebas).
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize no puede ser negativo")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # clave → (valor, instante de caducidad)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=MISSING):
+        """
+        Devuelve el valor asociado a `key` (marcándolo como el más reciente)
+        o `default` si no existe o ha caducado.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        """Guarda `value` bajo `key`, desalojando la entrada más antigua si hace falta."""
+        if self.maxsize == 0:
+            return
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict:
+        """Devuelve un diccionario con los contadores y el tamaño actual."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
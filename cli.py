@@ -8,33 +8,46 @@ Permite:
 - Activar modo debug para ver DSL normalizado, AST y regex cruda.
 - Probar la regex generada contra una cadena de prueba.
 - Entrar en modo interactivo con autocompletado del DSL.
+- Emitir todos los grupos sin captura, `(?:...)` (`--no-capture`).
+- Probar la cadena de `--test` con el motor DFA de `dfa.py`, en tiempo
+  lineal (`--matcher dfa`).
+- Analizar el riesgo de retroceso catastrófico (ReDoS) de la regex y,
+  si se puede, reescribirla de forma segura (`--redos`, ver `redos.py`).
+- Traducir un archivo de frases por lotes, con salida JSONL (`--batch`).
+- Medir el tiempo y la memoria de cada fase del pipeline (`--profile`).
+- Guardar las traducciones en una caché persistente (`--disk-cache`) y
+  precargarla desde un archivo de frases (`--warm`).
+- Funcionar como servidor persistente en un socket Unix (`--serve`); el
+  cliente ligero correspondiente está en `client.py`.
 - (Opcional) Mostrar una explicación paso a paso de cómo se construye la regex.
 """
 
 import argparse
+import os
 import re
+import sys
 
-<<<<<<< HEAD
-=======
 from colorama import Fore, init
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-from lark_parser import translate_to_regex, normalizer, parser
-from translator import RegexTranslator
+from lark_parser import (
+    translate, translate_tree, normalizer, parser, ENGINES, set_engine,
+    configure_disk_cache, warm_disk_cache, DEFAULT_DISK_CACHE_PATH,
+)
 from completer import DSLCompleter
 from commands import show_help, show_tokens, show_examples
-from explain import explain_phrase_and_regex
-from utils import validate_regex, simplify_regex
+from explain import explain_phrase_and_regex, pretty_tree
+from utils import compile_regex, noncapturing_regex, simplify_regex
 from prompt_toolkit import prompt
 from prompt_toolkit.history import FileHistory
 
+# `batch`, `dfa`, `profiler`, `redos` y `server` se importan en las ramas
+# que los usan: una ejecución de una sola frase no paga su carga
+
 # Inicializa colorama para que los colores se “reset” automáticamente
 # después de cada impresión, evitando tener que resetear manualmente.
 init(autoreset=True)
 
 
 def main():
-<<<<<<< HEAD
-=======
     """
     Punto de entrada del programa cuando se ejecuta `python cli.py`.
 
@@ -43,21 +56,10 @@ def main():
     - Llama a `run_conversion` o `run_interactive` según corresponda.
     """
     # Parser de argumentos para la CLI
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     parser_arg = argparse.ArgumentParser(
         description="TraductorRegex – DSL para generar expresiones regulares."
     )
 
-<<<<<<< HEAD
-    parser_arg.add_argument("phrase", nargs="?", help="Frase pseudonatural a convertir.")
-    parser_arg.add_argument("--test", help="Cadena para validar contra la Regex.")
-    parser_arg.add_argument("--explain", action="store_true", help="Explica paso a paso la conversión.")
-    parser_arg.add_argument("--debug", action="store_true", help="Muestra DSL normalizado, AST y regex sin simplificar.")
-    parser_arg.add_argument("--interactive", action="store_true", help="Modo interactivo con autocompletado.")
-
-    args = parser_arg.parse_args()
-
-=======
     # Argumento posicional: la frase en pseudolenguaje natural a convertir
     parser_arg.add_argument(
         "phrase",
@@ -71,6 +73,24 @@ def main():
         help="Cadena para validar contra la Regex.",
     )
 
+    # Opción: motor con el que se prueba la cadena de --test
+    parser_arg.add_argument(
+        "--matcher",
+        choices=("re", "dfa"),
+        default="re",
+        help="Motor para --test: re (por defecto) o dfa (tiempo lineal, sin retroceso).",
+    )
+
+    # Opción: análisis de retroceso catastrófico (y reescritura segura con "fix")
+    parser_arg.add_argument(
+        "--redos",
+        nargs="?",
+        const="report",
+        choices=("report", "fix"),
+        help="Informa del riesgo de retroceso catastrófico de la regex; con 'fix' usa "
+             "además la reescritura segura (en --batch añade el campo \"redos\").",
+    )
+
     # Opción: explicar paso a paso el proceso (normalización, AST, etc.)
     parser_arg.add_argument(
         "--explain",
@@ -92,41 +112,130 @@ def main():
         help="Modo interactivo con autocompletado.",
     )
 
+    # Opción: grupos sin captura (reconocen lo mismo y `re` no guarda capturas)
+    parser_arg.add_argument(
+        "--no-capture",
+        dest="capture",
+        action="store_false",
+        help="Emite todos los grupos sin captura, (?:...), en vez de (...).",
+    )
+
+    # Opción: motor de parseo (Lark o el parser descendente recursivo)
+    parser_arg.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="lark",
+        help="Motor de parseo del DSL (por defecto: lark).",
+    )
+
+    # Opción: modo por lotes – un registro JSONL por frase del archivo
+    parser_arg.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Traduce las frases de FILE (una por línea; '-' = stdin) y escribe JSONL.",
+    )
+
+    # Opción: procesos de trabajo para el modo por lotes
+    parser_arg.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Procesos en paralelo para --batch (0 = uno por núcleo; por defecto: 1).",
+    )
+
+    # Opción: servidor persistente (ver `server.py` y `client.py`)
+    parser_arg.add_argument(
+        "--serve",
+        nargs="?",
+        const="",
+        metavar="SOCKET",
+        help="Atiende peticiones en un socket Unix (por defecto: $TRADUCTORREGEX_SOCKET "
+             "o /tmp/traductorregex-<uid>.sock).",
+    )
+
+    # Opción: perfilado por fases (tiempo y memoria; percentiles en --batch)
+    parser_arg.add_argument(
+        "--profile",
+        action="store_true",
+        help="Muestra el tiempo y la memoria de cada fase (percentiles con --batch).",
+    )
+
+    # Opción: volcado de cProfile de toda la ejecución
+    parser_arg.add_argument(
+        "--profile-out",
+        metavar="FILE",
+        help="Guarda un perfil de cProfile en FILE (se lee con `python -m pstats FILE`).",
+    )
+
+    # Opción: caché de traducciones persistente (ver `disk_cache.py`)
+    parser_arg.add_argument(
+        "--disk-cache",
+        nargs="?",
+        const=DEFAULT_DISK_CACHE_PATH,
+        metavar="PATH",
+        help="Usa una caché de traducciones en disco compartida entre ejecuciones "
+             "(por defecto: ~/.cache/traductorregex/translations.sqlite3).",
+    )
+
+    # Opción: precarga de la caché en disco desde un archivo de frases
+    parser_arg.add_argument(
+        "--warm",
+        metavar="FILE",
+        help="Traduce las frases de FILE (una por línea; '-' = stdin) y las guarda "
+             "en la caché en disco (implica --disk-cache).",
+    )
+
     # Parseo final de los argumentos
     args = parser_arg.parse_args()
+    set_engine(args.engine)
+    if args.disk_cache or args.warm:
+        configure_disk_cache(args.disk_cache or DEFAULT_DISK_CACHE_PATH)
+
+    if args.profile_out:
+        from profiler import cprofile_to
+
+        with cprofile_to(args.profile_out):
+            run_mode(args)
+    else:
+        run_mode(args)
+
+
+def run_mode(args):
+    """Ejecuta el modo elegido en la línea de comandos (servidor, lotes, REPL o frase)."""
+    # Modo servidor: mantiene el pipeline cargado hasta recibir "shutdown"
+    if args.serve is not None:
+        run_serve_mode(args.serve)
+        return
+
+    # Precarga de la caché en disco
+    if args.warm:
+        run_warm_mode(args.warm, args.capture)
+        return
+
+    # Modo por lotes: no usa la frase posicional ni el modo interactivo
+    if args.batch:
+        run_batch_mode(args.batch, args.jobs, args.profile, args.test, args.capture,
+                       args.redos is not None)
+        return
 
     # Si se pidió modo interactivo, delegamos a `run_interactive`
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     if args.interactive:
         run_interactive(args)
         return
 
-<<<<<<< HEAD
-=======
     # Si no hay frase y no estamos en interactivo, es un error de uso
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     if not args.phrase:
         print(Fore.YELLOW + "ERROR: No ingresaste ninguna frase.")
         return
 
     # Flujo normal: convertir una sola frase
     run_conversion(args.phrase, args)
+    if args.profile:
+        print_profile(args.phrase)
 
 
 def run_conversion(phrase, args):
-<<<<<<< HEAD
-
-    # --------------------------------------
-    # MODO DEBUG → mostrar salida detallada
-    # --------------------------------------
-    if args.debug:
-        print(Fore.CYAN + "\n=== DEBUG MODE ACTIVADO ===\n")
-
-        print(Fore.GREEN + "Frase original:")
-        print(" ", phrase, "\n")
-
-        # 1. Normalización
-=======
     """
     Ejecuta el flujo de conversión para una frase dada.
 
@@ -135,12 +244,15 @@ def run_conversion(phrase, args):
         * Muestra el DSL normalizado.
         * Construye y muestra el AST con Lark.
         * Traduce el AST a regex cruda (sin optimizaciones).
-        * Simplifica la regex y la muestra.
+        * Simplifica la regex y la muestra (sin grupos de captura si
+          `args.capture` es False).
     - Si no está en debug:
-        * Usa `translate_to_regex` (pipeline normal).
-        * Simplifica la regex final.
-        * Valida que la regex sea sintácticamente correcta.
+        * Usa `translate` (pipeline normal, con caché) y simplifica la
+          regex final, que llega ya compilada.
+        * Comprueba que la regex sea sintácticamente correcta.
         * Imprime la regex generada.
+        * Avisa si la regex tiene riesgo alto de retroceso catastrófico
+          (con `--redos`, el informe completo y la reescritura segura).
         * Opcionalmente explica el proceso (`--explain`).
         * Opcionalmente prueba la regex contra una cadena (`--test`).
     """
@@ -153,99 +265,201 @@ def run_conversion(phrase, args):
         print(" ", phrase, "\n")
 
         # 2) Normalizar con el normalizador global de lark_parser
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         normalized = normalizer.normalize(phrase)
         print(Fore.GREEN + "DSL normalizado:")
         print(" ", normalized, "\n")
 
-<<<<<<< HEAD
-        # 2. AST
-=======
         # 3) Construir AST con el parser de Lark
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         try:
             tree = parser.parse(normalized)
             print(Fore.GREEN + "AST generado:")
-            print(tree.pretty(), "\n")
+            print(pretty_tree(tree), "\n")
         except Exception as e:
-<<<<<<< HEAD
-            print(Fore.RED + "Error al generar AST:", e)
-            return
-
-        # 3. Regex cruda
-=======
             # Si algo falla en el parsing, lo reportamos y salimos
             print(Fore.RED + "Error al generar AST:", e)
             return
 
         # 4) Traducir AST a regex con el Transformer de `translator.py`
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         try:
-            raw_regex = RegexTranslator().transform(tree)
+            raw_regex = translate_tree(tree)
             print(Fore.GREEN + "Regex cruda generada:")
             print(" ", raw_regex, "\n")
         except Exception as e:
-<<<<<<< HEAD
-            print(Fore.RED + "Error durante traducción a regex:", e)
-            return
-
-        # 4. Regex final (simplificada)
-=======
             # Si falla la transformación (regla no manejada, etc.), se reporta
             print(Fore.RED + "Error durante traducción a regex:", e)
             return
 
         # 5) Simplificar/optimizar la regex resultante
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         final_regex = simplify_regex(raw_regex)
+        if not args.capture:
+            final_regex = noncapturing_regex(final_regex)
         print(Fore.GREEN + "Regex simplificada (final):")
         print(" ", final_regex, "\n")
+        final_regex = check_redos(final_regex, args.redos)
 
-<<<<<<< HEAD
-        if args.test:
-            test_regex(final_regex, args.test)
-
-        return
-
-    # --------------------------------------
-    # MODO NORMAL
-    # --------------------------------------
-=======
         # 6) Si se pasó `--test`, probamos la regex contra la cadena dada
         if args.test:
-            test_regex(final_regex, args.test)
+            test_regex(final_regex, args.test, args.matcher)
 
         # En modo debug nunca llegamos al flujo normal de `translate_to_regex`
         return
 
     # ------------------ MODO NORMAL ------------------
-    # 1) Usa el pipeline completo (normalización + parseo + traducción)
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-    regex = translate_to_regex(phrase)
-
-    # 2) Aplica las simplificaciones de regex (optimización, forma canónica, etc.)
-    regex = simplify_regex(regex)
+    # 1-2) Pipeline completo (normalización + parseo + traducción),
+    #      simplificación y compilación de la regex; la regex queda en la
+    #      caché LRU y el patrón compilado en la de `utils.compile_regex`
+    result = translate(phrase, simplify=True, capture=args.capture)
+    regex = result.regex
 
     # 3) Manejo de errores provenientes del pipeline (mensajes tipo "ERROR: ...")
-    if regex.startswith("ERROR"):
-        print(Fore.YELLOW + regex)
+    if result.error:
+        print(Fore.YELLOW + result.error)
         return
 
-    # 4) Validar que la regex generada sea compilable por `re`
-    if not validate_regex(regex):
+    # 4) La regex generada debe ser compilable por `re`
+    if not result.valid:
         print(Fore.RED + "ERROR: La regex generada no es válida.")
         return
 
-    # 5) Imprimir regex final
+    # 5) Imprimir regex final y, si tiene riesgo de ReDoS, avisar
     print(Fore.GREEN + "Regex generada:", regex)
+    safe_regex = check_redos(regex, args.redos)
 
     # 6) Si se pide explicación estructural, la imprimimos
     if args.explain:
         print(explain_phrase_and_regex(phrase, regex))
 
-    # 7) Si se pasó `--test`, probamos la regex contra la cadena
+    # 7) Si se pasó `--test`, probamos el patrón ya compilado (o el DFA) contra la cadena
     if args.test:
-        test_regex(regex, args.test)
+        if safe_regex != regex or args.matcher == "dfa":
+            test_regex(safe_regex, args.test, args.matcher)
+        else:
+            test_regex(result.pattern, args.test, args.matcher)
+
+
+# Nombre de cada nivel de riesgo de `redos.analyze_redos`
+RISK_NAMES = {"none": "ninguno", "medium": "medio", "high": "alto"}
+
+# Un riesgo alto exige un grupo repetido: sin `)` seguido de `*`, `+` o
+# `{` el aviso por defecto ni siquiera carga `redos.py`
+REPEATED_GROUP = re.compile(r"\)[*+{]")
+
+
+def check_redos(regex, mode=None):
+    """
+    Analiza el riesgo de retroceso catastrófico de `regex` (`redos.py`).
+
+    - Sin `mode` solo avisa (una línea) si el riesgo es alto.
+    - Con "report" imprime el riesgo, cada subpatrón responsable y la
+      reescritura segura, si la hay.
+    - Con "fix" imprime lo mismo y devuelve la reescritura en lugar de
+      `regex`, para usarla en `--test`.
+
+    Devuelve la regex que debe usarse a partir de aquí.
+    """
+    if mode is None and not REPEATED_GROUP.search(regex):
+        return regex
+    from redos import analyze_redos
+
+    try:
+        report = analyze_redos(regex)
+    except ValueError:
+        return regex
+    if mode is None:
+        if report["risk"] == "high":
+            fragment = report["findings"][0]["fragment"]
+            print(Fore.YELLOW + f"AVISO: '{fragment}' puede tardar un tiempo exponencial "
+                                "con `re` (retroceso catastrófico). Ver --redos.")
+        return regex
+
+    color = Fore.GREEN if report["risk"] == "none" else Fore.YELLOW
+    print(color + f"Riesgo de retroceso catastrófico: {RISK_NAMES[report['risk']]}")
+    for finding in report["findings"]:
+        print(color + f"  [{RISK_NAMES[finding['risk']]}] {finding['fragment']}: "
+                      f"{finding['message']}")
+    if report["rewrite"]:
+        print(Fore.GREEN + "Reescritura segura:", report["rewrite"])
+        if mode == "fix":
+            return report["rewrite"]
+    return regex
+
+
+def print_profile(phrase):
+    """Imprime el tiempo y la memoria de cada fase al traducir `phrase`."""
+    from profiler import profile_phrase, format_profile
+
+    print(Fore.CYAN + "Perfil por fases:")
+    print(format_profile(profile_phrase(phrase, simplify=True)))
+
+
+def run_batch_mode(source, jobs=1, profile=False, match=None, capture=True, redos=False):
+    """
+    Ejecuta `batch.run_batch` y muestra un resumen en stderr (stdout queda
+    reservado para el JSONL). Si la salida se cierra antes de tiempo
+    (p. ej. `| head`), termina sin traza. Con `profile`, el resumen
+    incluye los percentiles de cada fase; con `match` (`--test`), cada
+    registro indica si la cadena coincide con su regex. Sin `capture`, los
+    grupos se emiten sin captura. Con `redos`, cada registro lleva su
+    riesgo de retroceso catastrófico.
+    """
+    from batch import run_batch
+
+    try:
+        summary = run_batch(source, jobs=jobs, profile=profile, match=match,
+                            capture=capture, redos=redos)
+    except FileNotFoundError:
+        print(Fore.YELLOW + f"ERROR: No existe el archivo '{source}'.", file=sys.stderr)
+        sys.exit(1)
+    except BrokenPipeError:
+        # Evita un segundo error al vaciar stdout durante la salida
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    print(
+        f"{summary['phrases']} frases, {summary['errors']} con error, "
+        f"{summary['invalid']} regex inválidas."
+        + (f" '{match}' coincide con {summary['matches']}." if match is not None else "")
+        + (f" {summary['risky']} con riesgo de ReDoS." if redos else ""),
+        file=sys.stderr,
+    )
+    if profile and summary["phrases"]:
+        from profiler import format_summary
+
+        print(format_summary(summary["profile"]), file=sys.stderr)
+
+
+def run_warm_mode(source, capture=True):
+    """Precarga la caché en disco con las frases de `source` y resume en stderr."""
+    try:
+        if source == "-":
+            summary = warm_disk_cache(sys.stdin, capture=capture)
+        else:
+            with open(source, encoding="utf-8") as f:
+                summary = warm_disk_cache(f, capture=capture)
+    except FileNotFoundError:
+        print(Fore.YELLOW + f"ERROR: No existe el archivo '{source}'.", file=sys.stderr)
+        sys.exit(1)
+    print(
+        f"{summary['phrases']} frases: {summary['added']} añadidas "
+        f"({summary['errors']} con error), {summary['cached']} ya estaban en la caché.",
+        file=sys.stderr,
+    )
+
+
+def run_serve_mode(path=None):
+    """
+    Ejecuta `server.serve` en `path` (por defecto
+    `server.default_socket_path()`) informando por stderr del inicio y
+    del cierre.
+    """
+    from server import serve, default_socket_path
+
+    path = path or default_socket_path()
+    try:
+        serve(path, ready=lambda: print(Fore.CYAN + f"Escuchando en {path}", file=sys.stderr))
+    except (RuntimeError, OSError) as e:
+        print(Fore.YELLOW + f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(Fore.CYAN + "Servidor detenido.", file=sys.stderr)
 
 
 def run_interactive(args):
@@ -277,16 +491,11 @@ def run_interactive(args):
         # - gestionar autocompletado (TAB)
         # - registrar en el historial
         phrase = prompt("Frase > ", completer=completer, history=history)
-<<<<<<< HEAD
-        cleaned = phrase.strip().lower()
-
-=======
 
         # Versión “limpia” de la entrada para detectar comandos
         cleaned = phrase.strip().lower()
 
         # Comando: salir del modo interactivo
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         if cleaned == "exit":
             print(Fore.CYAN + "Saliendo del modo interactivo.")
             break
@@ -306,30 +515,38 @@ def run_interactive(args):
             print(show_tokens())
             continue
 
-<<<<<<< HEAD
-=======
         # Entrada vacía → advertimos y pedimos de nuevo
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         if not phrase.strip():
             print(Fore.YELLOW + "No escribiste ninguna frase.")
             continue
 
         # Cualquier otra cosa se trata como frase a traducir
         run_conversion(phrase, args)
+        if args.profile:
+            print_profile(phrase)
 
 
-def test_regex(pattern, text):
+def test_regex(pattern, text, matcher="re"):
     """
     Prueba si la cadena `text` coincide completamente con el patrón `pattern`.
 
-    - Usa `re.fullmatch` para requerir coincidencia total.
+    - `pattern` es un patrón ya compilado o una regex en texto, que se
+      compila una sola vez por regex con `compile_regex` o, si `matcher`
+      es "dfa", con `dfa.compile_dfa`.
+    - Usa `fullmatch` para requerir coincidencia total.
     - Imprime ✓ si coincide.
     - Imprime ✗ si no coincide.
     - Si hay un error al compilar/usar la regex, se informa.
     """
     try:
+        if isinstance(pattern, str) and matcher == "dfa":
+            from dfa import compile_dfa
+
+            pattern = compile_dfa(pattern)
+        elif isinstance(pattern, str):
+            pattern = compile_regex(pattern)
         # `fullmatch` exige que la regex cubra toda la cadena de prueba
-        if re.fullmatch(pattern, text):
+        if pattern.fullmatch(text):
             print(Fore.GREEN + f"✓ '{text}' coincide.")
         else:
             print(Fore.RED + f"✗ '{text}' NO coincide.")
@@ -0,0 +1,147 @@
+"""
+Módulo `client.py`
+
+Cliente ligero del servidor de traducción (`server.py`).
+
+Solo importa la biblioteca estándar, así que arranca mucho más rápido
+que `cli.py`: la gramática, Lark y las cachés viven en el servidor. Si
+no hay ningún servidor escuchando, lo lanza en segundo plano
+(`python cli.py --serve SOCKET`) y espera a que esté listo.
+
+Uso:
+
+    python client.py "letters then digits"
+    python client.py "digits" --test 123
+    python client.py "vowels" --explain
+    python client.py "'x' or 'yz'" --no-capture
+    python client.py --stop
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Segundos máximos de espera a que el servidor recién lanzado responda
+SPAWN_TIMEOUT = 15.0
+
+
+def default_socket_path() -> str:
+    """Misma ruta por defecto que `server.default_socket_path`."""
+    return os.environ.get("TRADUCTORREGEX_SOCKET") or f"/tmp/traductorregex-{os.getuid()}.sock"
+
+
+def _connect(path: str):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def spawn_server(path: str) -> None:
+    """Lanza `cli.py --serve path` desacoplado de este proceso."""
+    subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "cli.py"), "--serve", path],
+        cwd=HERE,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def connect(path: str, spawn: bool = True):
+    """
+    Abre una conexión con el servidor de `path`. Si no responde y `spawn`
+    es True, lanza uno y reintenta hasta `SPAWN_TIMEOUT` segundos.
+    """
+    try:
+        return _connect(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        if not spawn:
+            raise
+    spawn_server(path)
+    deadline = time.monotonic() + SPAWN_TIMEOUT
+    delay = 0.01
+    while True:
+        try:
+            return _connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"El servidor no respondió en {path}")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+
+
+def request(payload: dict, path: str | None = None, spawn: bool = True) -> dict:
+    """Envía una petición al servidor y devuelve su respuesta decodificada."""
+    with connect(path or default_socket_path(), spawn=spawn) as sock:
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("El servidor cerró la conexión sin responder.")
+    return json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cliente ligero del servidor de TraductorRegex."
+    )
+    parser.add_argument("phrase", nargs="?", help="Frase pseudonatural a convertir.")
+    parser.add_argument("--test", help="Cadena para validar contra la Regex.")
+    parser.add_argument("--explain", action="store_true", help="Explica paso a paso la conversión.")
+    parser.add_argument("--no-capture", dest="capture", action="store_false",
+                        help="Emite todos los grupos sin captura, (?:...), en vez de (...).")
+    parser.add_argument("--socket", default=None, help="Ruta del socket del servidor.")
+    parser.add_argument("--no-spawn", action="store_true", help="No lanzar el servidor si no está activo.")
+    parser.add_argument("--stop", action="store_true", help="Detiene el servidor.")
+    args = parser.parse_args()
+
+    try:
+        if args.stop:
+            request({"op": "shutdown"}, args.socket, spawn=False)
+            return 0
+        if not args.phrase:
+            print("ERROR: No ingresaste ninguna frase.", file=sys.stderr)
+            return 2
+        payload = {"op": "translate", "phrase": args.phrase}
+        if not args.capture:
+            payload["capture"] = False
+        if args.explain:
+            payload["op"] = "explain"
+        elif args.test is not None:
+            payload.update(op="test", text=args.test)
+        response = request(payload, args.socket, spawn=not args.no_spawn)
+    except (OSError, TimeoutError) as e:
+        print(f"ERROR: No se pudo contactar con el servidor: {e}", file=sys.stderr)
+        return 1
+
+    if not response.get("ok"):
+        print(f"ERROR: {response.get('error')}", file=sys.stderr)
+        return 1
+    if response["error"]:
+        print(response["error"])
+        return 1
+    if not response["valid"]:
+        print("ERROR: La regex generada no es válida.")
+        return 1
+    print("Regex generada:", response["regex"])
+    if "explanation" in response:
+        print(response["explanation"])
+    if "match" in response:
+        verdict = "coincide" if response["match"] else "NO coincide"
+        print(f"{'✓' if response['match'] else '✗'} '{args.test}' {verdict}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
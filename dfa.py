@@ -0,0 +1,545 @@
+"""
+Módulo `dfa.py`
+
+Motor de coincidencia alternativo a `re`, basado en un autómata finito
+determinista (DFA), con tiempo lineal garantizado.
+
+Las regex que genera el traductor solo usan clases, literales,
+concatenación, alternativas y repeticiones (sin referencias hacia atrás
+ni anclas), así que siempre describen un lenguaje regular. `re` las
+ejecuta con retroceso y una regex como `([a-zA-Z]+)+[0-9]` puede tardar
+un tiempo exponencial en una línea hostil; aquí cada carácter de la
+entrada cuesta un paso del autómata.
+
+- La regex se lee con `regex_ir.parse_regex` y se compila a un NFA de
+  Thompson (sin recursión, como el resto de recorridos de la IR).
+- El alfabeto se parte en clases de equivalencia: dos caracteres que
+  pertenecen a los mismos átomos (clases y literales de la regex) son
+  indistinguibles, y cada fila de la tabla de transiciones se indexa
+  por clase, no por carácter.
+- El DFA se construye de forma perezosa (subconjuntos de estados del NFA
+  calculados al llegar a ellos) y los estados se guardan en una caché
+  acotada (`max_states`): al llenarse se vacía y la búsqueda continúa,
+  de modo que la memoria no depende de la entrada.
+- El DFA no se minimiza. Minimizar exige construir antes todos los
+  estados, y el número de subconjuntos puede ser exponencial en el
+  tamaño del NFA; la construcción perezosa solo crea los que la entrada
+  visita. El tiempo sigue siendo lineal: cada carácter hace una
+  consulta en la tabla y, como mucho, crea un estado nuevo con un coste
+  que depende del NFA y no de la entrada. Un DFA mínimo solo ahorraría
+  memoria, que ya acota `max_states`.
+- `search` / `finditer` siguen la semántica POSIX "más a la izquierda,
+  más larga": el inicio coincide con el de `re`, pero el final puede ser
+  posterior cuando `re` se queda con una rama más corta (`(a|ab)` en
+  "ab" da "ab" aquí y "a" en `re`). `fullmatch` acepta exactamente las
+  mismas cadenas que `re`.
+- No hay grupos de captura: cada coincidencia es solo su tramo.
+"""
+
+import re
+import threading
+
+from cache import LRUCache, MISSING
+from regex_ir import (
+    Node, CharClass, Literal, Concat, Alt, Group, Repeat, child_nodes, parse_regex, to_regex,
+)
+
+# Estados del DFA en caché por patrón y sentido (al superarlos se vacía)
+DEFAULT_MAX_STATES = 4096
+
+# Estados del NFA permitidos: acota `x{1000}{1000}` y similares
+MAX_NFA_STATES = 200000
+
+# Caracteres cuya clase se recuerda (al superarlos se olvidan)
+MAX_CHARS = 1 << 16
+
+# Unidades de un literal: un carácter o un escape "\x"
+_LITERAL_UNIT_RE = re.compile(r"\\.|.", re.DOTALL)
+
+# Escapes de ancho cero o referencias hacia atrás: no son lenguaje regular
+# o no consumen un carácter
+_UNSUPPORTED_ESCAPES = frozenset("bBAZ123456789")
+
+# Patrones compilados por (regex, flags, max_states)
+dfa_cache = LRUCache(maxsize=256)
+
+
+def compile_dfa(regex, flags: int = 0, max_states: int = DEFAULT_MAX_STATES) -> "DFAPattern":
+    """
+    `DFAPattern` de `regex` (texto o nodo de la IR), compilado una sola
+    vez por (regex, flags, max_states), como `utils.compile_regex`.
+
+    Raises
+    ------
+    ValueError
+        Si la regex no es válida o usa construcciones que un DFA no
+        representa (anclas, `\\b`, referencias hacia atrás, posesivos).
+    """
+    if isinstance(regex, Node):
+        regex = to_regex(regex)
+    key = (regex, flags, max_states)
+    pattern = dfa_cache.get(key)
+    if pattern is MISSING:
+        pattern = DFAPattern(regex, flags, max_states)
+        dfa_cache.put(key, pattern)
+    return pattern
+
+
+class DFAMatch:
+    """Coincidencia de un `DFAPattern`: el tramo `[start, end)` de `string`."""
+
+    __slots__ = ("string", "pos", "endpos", "_start", "_end")
+
+    def __init__(self, string: str, start: int, end: int, pos: int, endpos: int):
+        self.string = string
+        self.pos = pos
+        self.endpos = endpos
+        self._start = start
+        self._end = end
+
+    def group(self, index: int = 0) -> str:
+        if index != 0:
+            raise IndexError("el motor DFA no tiene grupos de captura")
+        return self.string[self._start:self._end]
+
+    def __getitem__(self, index: int) -> str:
+        return self.group(index)
+
+    def start(self) -> int:
+        return self._start
+
+    def end(self) -> int:
+        return self._end
+
+    def span(self) -> tuple:
+        return self._start, self._end
+
+    def __repr__(self):
+        return f"<DFAMatch span={self.span()!r}, match={self.group()!r}>"
+
+
+class DFAPattern:
+    """
+    Regex compilada a DFA, con la interfaz de `re.Pattern` que usa el
+    proyecto: `fullmatch`, `match`, `search` y `finditer` (con `pos` y
+    `endpos`). Cada llamada recorre la entrada un número fijo de veces.
+
+    Parameters
+    ----------
+    regex : str
+        Regex en la sintaxis que genera el traductor.
+    flags : int
+        Flags de `re` que afectan a un solo carácter (`re.IGNORECASE`,
+        `re.DOTALL`, `re.ASCII`); `re.VERBOSE` no se admite.
+    max_states : int
+        Estados del DFA en caché por sentido de recorrido.
+    """
+
+    def __init__(self, regex: str, flags: int = 0, max_states: int = DEFAULT_MAX_STATES):
+        if flags & re.VERBOSE:
+            raise ValueError("El motor DFA no admite re.VERBOSE")
+        if max_states < 2:
+            raise ValueError("max_states debe ser al menos 2")
+        self.pattern = regex
+        self.flags = flags
+        node = parse_regex(regex)
+        atoms = {}                      # texto del átomo → índice
+        forward = _NFA(node, atoms, reverse=False)
+        backward = _NFA(node, atoms, reverse=True)
+        alphabet = _Alphabet(atoms, flags)
+        # Sentido normal, anclado: fullmatch / match y el final de search
+        self._forward = _LazyDFA(forward, alphabet, False, max_states)
+        # Sentido inverso, sin anclar: dónde empieza alguna coincidencia
+        self._backward = _LazyDFA(backward, alphabet, True, max_states)
+        self._alphabet = alphabet
+
+    def fullmatch(self, string: str, pos: int = 0, endpos: int | None = None):
+        pos, endpos = _bounds(string, pos, endpos)
+        if self._forward.longest(string, pos, endpos, full=True) < 0:
+            return None
+        return DFAMatch(string, pos, endpos, pos, endpos)
+
+    def match(self, string: str, pos: int = 0, endpos: int | None = None):
+        """Coincidencia más larga que empieza en `pos`."""
+        pos, endpos = _bounds(string, pos, endpos)
+        end = self._forward.longest(string, pos, endpos)
+        return None if end < 0 else DFAMatch(string, pos, end, pos, endpos)
+
+    def search(self, string: str, pos: int = 0, endpos: int | None = None):
+        """Coincidencia que empieza más a la izquierda (y la más larga desde ahí)."""
+        pos, endpos = _bounds(string, pos, endpos)
+        i = self._backward.starts(string, pos, endpos).find(1)
+        if i < 0:
+            return None
+        end = self._forward.longest(string, pos + i, endpos)
+        return DFAMatch(string, pos + i, end, pos, endpos)
+
+    def finditer(self, string: str, pos: int = 0, endpos: int | None = None):
+        """
+        Coincidencias sin solapar, de izquierda a derecha. Una sola pasada
+        inversa marca dónde empieza alguna coincidencia y cada una se
+        extiende después hacia delante hasta la más larga.
+        """
+        pos, endpos = _bounds(string, pos, endpos)
+        starts = self._backward.starts(string, pos, endpos)
+        i = 0
+        while True:
+            i = starts.find(1, i)
+            if i < 0:
+                return
+            start = pos + i
+            end = self._forward.longest(string, start, endpos)
+            yield DFAMatch(string, start, end, pos, endpos)
+            # Tras una coincidencia vacía se avanza un carácter, como en `re`
+            i = end - pos if end > start else i + 1
+
+    def stats(self) -> dict:
+        """Estados en caché y vaciados de cada sentido, y clases del alfabeto."""
+        return {
+            "nfa_states": len(self._forward.nfa.atom),
+            "forward": self._forward.stats(),
+            "backward": self._backward.stats(),
+            "classes": len(self._alphabet.members),
+        }
+
+    def __repr__(self):
+        return f"DFAPattern({self.pattern!r})"
+
+
+def _bounds(string: str, pos: int, endpos: int | None):
+    """`pos` y `endpos` recortados a la cadena, como en `re`."""
+    size = len(string)
+    endpos = size if endpos is None else min(max(endpos, 0), size)
+    return min(max(pos, 0), endpos), endpos
+
+
+# ----------------------------------------------------------------------
+#  NFA DE THOMPSON
+# ----------------------------------------------------------------------
+
+class _NFA:
+    """
+    NFA con un estado inicial y uno final. Cada estado tiene a lo sumo
+    una transición por un átomo (`atom[s]` → `out[s]`) y una lista de
+    transiciones vacías (`eps[s]`).
+
+    Se construye en postorden con una pila explícita. Los estados de un
+    subárbol quedan contiguos y, hasta que el padre los enlaza, ninguno
+    apunta fuera de su tramo: así una repetición `x{n}` copia el tramo de
+    `x` desplazando los índices, sin volver a recorrer el subárbol.
+    Con `reverse` se construye el NFA de la regex invertida.
+    """
+
+    def __init__(self, node: Node, atoms: dict, reverse: bool):
+        self.atom = []
+        self.out = []
+        self.eps = []
+        self._atoms = atoms
+        done = {}                       # id(nodo) → (inicio, fin, tramo de estados)
+        stack = [(node, -1)]
+        while stack:
+            current, first = stack.pop()
+            kind = type(current)
+            if first < 0 and kind in (Concat, Alt, Group, Repeat):
+                # Los hijos se construyen en orden, antes que el propio nodo
+                stack.append((current, len(self.atom)))
+                children = (current.child,) if kind is Repeat else child_nodes(current)
+                stack.extend((child, -1) for child in reversed(children))
+                continue
+            if first < 0:
+                first = len(self.atom)
+            if kind is CharClass:
+                start, end = self._chain([to_regex(current)])
+            elif kind is Literal:
+                units = _literal_units(current.text)
+                start, end = self._chain(units[::-1] if reverse else units)
+            elif kind is Concat:
+                items = [done.pop(id(item)) for item in current.items]
+                start, end = self._concat(items[::-1] if reverse else items)
+            elif kind is Alt:
+                start, end = self._state(), self._state()
+                for branch in current.branches:
+                    b_start, b_end, _, _ = done.pop(id(branch))
+                    self.eps[start].append(b_start)
+                    self.eps[b_end].append(end)
+            elif kind is Group:
+                start, end, _, _ = done.pop(id(current.child))
+            elif kind is Repeat:
+                start, end = self._repeat(current, done.pop(id(current.child)))
+            else:
+                raise ValueError(f"Nodo de IR no soportado por el motor DFA: {current!r}")
+            done[id(current)] = (start, end, first, len(self.atom))
+        self.start, self.accept, _, _ = done[id(node)]
+
+    def _state(self) -> int:
+        if len(self.atom) >= MAX_NFA_STATES:
+            raise ValueError(f"La regex necesita más de {MAX_NFA_STATES} estados en el NFA")
+        self.atom.append(-1)
+        self.out.append(-1)
+        self.eps.append([])
+        return len(self.atom) - 1
+
+    def _chain(self, units):
+        """Estados para una secuencia de átomos (un literal o una clase)."""
+        start = end = self._state()
+        for unit in units:
+            index = self._atoms.setdefault(unit, len(self._atoms))
+            target = self._state()
+            self.atom[end] = index
+            self.out[end] = target
+            end = target
+        return start, end
+
+    def _concat(self, fragments):
+        if not fragments:
+            state = self._state()
+            return state, state
+        for (_, a_end, *_), (b_start, *_) in zip(fragments, fragments[1:]):
+            self.eps[a_end].append(b_start)
+        return fragments[0][0], fragments[-1][1]
+
+    def _copy(self, fragment):
+        """Copia del tramo de estados de `fragment` (ver la clase)."""
+        start, end, first, last = fragment
+        offset = len(self.atom) - first
+        if offset + last > MAX_NFA_STATES:
+            raise ValueError(f"La regex necesita más de {MAX_NFA_STATES} estados en el NFA")
+        for s in range(first, last):
+            self.atom.append(self.atom[s])
+            self.out.append(self.out[s] + offset if self.out[s] >= 0 else -1)
+            self.eps.append([t + offset for t in self.eps[s]])
+        return start + offset, end + offset, first + offset, last + offset
+
+    def _repeat(self, node: Repeat, fragment):
+        low, high = node.quantifier.min, node.quantifier.max
+        if type(node.child) is Repeat:
+            # Modificador sobre otro cuantificador: perezoso ("+?") acepta
+            # lo mismo; posesivo ("++") cambia el lenguaje
+            if node.quantifier.text == "?":
+                return fragment[0], fragment[1]
+            raise ValueError(f"Cuantificador no soportado por el motor DFA: {to_regex(node)}")
+        if high == 0:
+            state = self._state()
+            return state, state
+        count = high if high is not None else max(low, 1)
+        copies = [fragment]
+        for _ in range(count - 1):
+            copies.append(self._copy(fragment))
+        pieces = []
+        for i, (start, end, _, _) in enumerate(copies):
+            if i < low and not (high is None and i == count - 1):
+                pieces.append((start, end))
+                continue
+            # Copia opcional (o la última de x{n,}, que además se repite)
+            entry, exit = self._state(), self._state()
+            self.eps[entry].append(start)
+            self.eps[end].append(exit)
+            if i >= low:
+                self.eps[entry].append(exit)
+            if high is None:
+                self.eps[end].append(start)
+            pieces.append((entry, exit))
+        return self._concat(pieces)
+
+
+def _literal_units(text: str) -> list:
+    """Átomos de un literal; rechaza anclas y escapes de ancho cero."""
+    units = _LITERAL_UNIT_RE.findall(text)
+    for unit in units:
+        if unit in ("^", "$") or (len(unit) == 2 and unit[1] in _UNSUPPORTED_ESCAPES):
+            raise ValueError(f"Construcción no soportada por el motor DFA: {unit!r}")
+    return units
+
+
+# ----------------------------------------------------------------------
+#  ALFABETO: CLASES DE EQUIVALENCIA DE CARACTERES
+# ----------------------------------------------------------------------
+
+class _Alphabet:
+    """
+    Asigna a cada carácter visto una clase: el conjunto de átomos de la
+    regex que lo aceptan. La pertenencia a cada átomo se decide con `re`
+    (una vez por carácter distinto), así que `\\w`, `.` o los rangos
+    significan exactamente lo mismo que en `re`.
+    """
+
+    def __init__(self, atoms: dict, flags: int):
+        self.predicates = [None] * len(atoms)
+        for text, index in atoms.items():
+            try:
+                self.predicates[index] = re.compile(text, flags).fullmatch
+            except re.error as e:
+                raise ValueError(f"Átomo inválido {text!r}: {e}") from None
+        self.chars = {}                 # carácter → clase
+        self.index = {}                 # átomos que lo aceptan → clase
+        self.members = []               # clase → frozenset de átomos
+        self.lock = threading.Lock()
+
+    def classify(self, ch: str) -> int:
+        with self.lock:
+            accepted = frozenset(i for i, accepts in enumerate(self.predicates) if accepts(ch))
+            cls = self.index.get(accepted)
+            if cls is None:
+                cls = self.index[accepted] = len(self.members)
+                self.members.append(accepted)
+            if len(self.chars) >= MAX_CHARS:
+                self.chars = {}
+            self.chars[ch] = cls
+            return cls
+
+
+# ----------------------------------------------------------------------
+#  DFA PEREZOSO
+# ----------------------------------------------------------------------
+
+class _States:
+    """Una generación de la caché de estados del DFA."""
+
+    __slots__ = ("sets", "index", "table", "accepting", "start", "dead")
+
+    def __init__(self):
+        self.sets = []                  # estado → frozenset de estados del NFA
+        self.index = {}                 # frozenset → estado
+        self.table = []                 # estado → [estado siguiente por clase, -1 = sin calcular]
+        self.accepting = []
+        self.start = -1
+        self.dead = -1
+
+    def add(self, nfa_states: frozenset, accept: int) -> int:
+        state = self.index.get(nfa_states)
+        if state is None:
+            state = self.index[nfa_states] = len(self.sets)
+            self.sets.append(nfa_states)
+            self.table.append([])
+            self.accepting.append(accept in nfa_states)
+        return state
+
+
+class _LazyDFA:
+    """
+    DFA de un `_NFA` construido a medida que se necesita. Sin anclar
+    (`unanchored`), cada paso vuelve a añadir el estado inicial: el DFA
+    reconoce las cadenas que terminan en una coincidencia.
+
+    Los estados viven en una generación (`_States`). Cuando una supera
+    `max_states` se empieza otra vacía; quien estaba recorriendo la
+    anterior sigue con ella hasta su siguiente fallo de caché, así que
+    varios hilos pueden compartir el patrón sin bloquear el bucle.
+    """
+
+    def __init__(self, nfa: _NFA, alphabet: _Alphabet, unanchored: bool, max_states: int):
+        self.nfa = nfa
+        self.alphabet = alphabet
+        self.unanchored = unanchored
+        self.max_states = max_states
+        self.flushes = 0
+        self._lock = threading.Lock()
+        self._states = self._new_states()
+
+    def _new_states(self) -> _States:
+        states = _States()
+        states.start = states.add(self._closure((self.nfa.start,)), self.nfa.accept)
+        if not self.unanchored:
+            states.dead = states.add(frozenset(), self.nfa.accept)
+        return states
+
+    def _closure(self, seeds) -> frozenset:
+        eps = self.nfa.eps
+        seen = set(seeds)
+        stack = list(seen)
+        while stack:
+            for target in eps[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return frozenset(seen)
+
+    def _step(self, states: _States, state: int, cls: int):
+        """Transición no calculada: devuelve (generación, estado siguiente)."""
+        with self._lock:
+            members = self.alphabet.members[cls]
+            atom, out = self.nfa.atom, self.nfa.out
+            targets = [out[s] for s in states.sets[state] if atom[s] in members]
+            if self.unanchored:
+                targets.append(self.nfa.start)
+            closure = self._closure(targets)
+            following = states.index.get(closure)
+            if following is None:
+                if len(states.sets) >= self.max_states:
+                    if states is self._states:
+                        self.flushes += 1
+                        self._states = self._new_states()
+                    return self._states, self._states.add(closure, self.nfa.accept)
+                following = states.add(closure, self.nfa.accept)
+            row = states.table[state]
+            if len(row) <= cls:
+                row.extend([-1] * (len(self.alphabet.members) - len(row)))
+            row[cls] = following
+            return states, following
+
+    def longest(self, string: str, pos: int, endpos: int, full: bool = False) -> int:
+        """
+        Final de la coincidencia anclada más larga desde `pos`, o -1.
+        Con `full`, solo cuenta una coincidencia que llega a `endpos`.
+        """
+        states = self._states
+        table, accepting = states.table, states.accepting
+        chars, classify = self.alphabet.chars, self.alphabet.classify
+        state = states.start
+        dead = states.dead
+        end = pos if accepting[state] else -1
+        i = pos
+        for ch in string[pos:endpos]:
+            cls = chars.get(ch)
+            if cls is None:
+                cls = classify(ch)
+            try:
+                following = table[state][cls]
+            except IndexError:
+                following = -1
+            if following < 0:
+                states, following = self._step(states, state, cls)
+                table, accepting, dead = states.table, states.accepting, states.dead
+            state = following
+            i += 1
+            if state == dead:
+                return -1 if full else end
+            if accepting[state]:
+                end = i
+        if full:
+            return endpos if accepting[state] else -1
+        return end
+
+    def starts(self, string: str, pos: int, endpos: int) -> bytearray:
+        """
+        Recorre `string[pos:endpos]` de derecha a izquierda (el NFA es el
+        de la regex invertida) y marca con 1 cada posición `pos + k`
+        donde empieza alguna coincidencia que termina antes de `endpos`.
+        """
+        marks = bytearray(endpos - pos + 1)
+        states = self._states
+        table, accepting = states.table, states.accepting
+        chars, classify = self.alphabet.chars, self.alphabet.classify
+        state = states.start
+        k = endpos - pos
+        if accepting[state]:
+            marks[k] = 1
+        for ch in reversed(string[pos:endpos]):
+            cls = chars.get(ch)
+            if cls is None:
+                cls = classify(ch)
+            try:
+                following = table[state][cls]
+            except IndexError:
+                following = -1
+            if following < 0:
+                states, following = self._step(states, state, cls)
+                table, accepting = states.table, states.accepting
+            state = following
+            k -= 1
+            if accepting[state]:
+                marks[k] = 1
+        return marks
+
+    def stats(self) -> dict:
+        return {"states": len(self._states.sets), "flushes": self.flushes}
@@ -0,0 +1,273 @@
+"""
+Módulo `disk_cache.py`
+
+Caché persistente de traducciones en SQLite (solo biblioteca estándar).
+
+Guarda frase → DSL normalizado → regex (o mensaje de error) para que un
+proceso nuevo no empiece con la caché en frío. Cada entrada lleva un
+espacio de nombres (`namespace`): un hash de todo lo que determina la
+traducción (ver `lark_parser.cache_namespace`). Si la gramática, las
+reglas del normalizador o el simplificador cambian, el hash cambia y las
+entradas antiguas dejan de servirse; se desalojan las primeras.
+
+- Varios procesos pueden leer y escribir a la vez: la base usa WAL y
+  cada proceso abre su propia conexión (también tras un `fork`).
+- Tamaño acotado: al pasar de `max_entries` se borran las entradas de
+  otros espacios de nombres y después las usadas hace más tiempo.
+- Las traducciones con y sin grupos de captura (`capture`) son entradas
+  distintas. Un archivo de una versión anterior, sin esa columna, se
+  vacía al abrirlo: sus entradas ya no coincidían con el espacio de
+  nombres actual.
+- Nunca rompe la traducción: cualquier error de SQLite o del sistema de
+  archivos (archivo bloqueado, corrupto, de solo lectura, directorio que
+  no se puede crear...) cuenta como fallo de caché.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from cache import MISSING
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    namespace  TEXT    NOT NULL,
+    phrase     TEXT    NOT NULL,
+    simplify   INTEGER NOT NULL,
+    capture    INTEGER NOT NULL DEFAULT 1,
+    normalized TEXT,
+    regex      TEXT    NOT NULL,
+    last_used  REAL    NOT NULL,
+    UNIQUE (namespace, phrase, simplify, capture)
+);
+CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used);
+"""
+
+# Segundos que espera una escritura a que otro proceso libere la base
+BUSY_TIMEOUT = 5.0
+
+# Una lectura solo actualiza `last_used` si tiene más de estos segundos:
+# evita convertir cada acierto en una escritura
+TOUCH_INTERVAL = 60.0
+
+# Cada cuántas escrituras se comprueba el tamaño
+EVICT_EVERY = 256
+
+# Errores que cuentan como fallo de caché: los de SQLite y los de abrir
+# el archivo o crear su directorio
+_ERRORS = (sqlite3.Error, OSError)
+
+
+class DiskCache:
+    """
+    Caché frase → (DSL normalizado, regex) en un archivo SQLite.
+
+    Parameters
+    ----------
+    path : str
+        Archivo de la base de datos (se crea si no existe).
+    namespace : str
+        Hash de la configuración del traductor; solo se sirven entradas
+        con el mismo espacio de nombres.
+    max_entries : int
+        Entradas máximas en el archivo (de todos los espacios de nombres).
+    """
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 100000):
+        if max_entries < 1:
+            raise ValueError("max_entries debe ser al menos 1")
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    # ------------------------------------------------------------------
+    #  CONEXIÓN
+    # ------------------------------------------------------------------
+
+    def _connection(self):
+        """Conexión de este proceso; tras un `fork` se abre una nueva."""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT,
+                                   check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _migrate(conn)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    #  LECTURA / ESCRITURA
+    # ------------------------------------------------------------------
+
+    def get(self, phrase: str, simplify: bool, capture: bool = True):
+        """(normalizado, regex) de `phrase`, o `MISSING` si no está."""
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT normalized, regex, last_used FROM translations "
+                    "WHERE namespace = ? AND phrase = ? AND simplify = ? AND capture = ?",
+                    (self.namespace, phrase, int(simplify), int(capture)),
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return MISSING
+                now = time.time()
+                if now - row[2] > TOUCH_INTERVAL:
+                    conn.execute(
+                        "UPDATE translations SET last_used = ? "
+                        "WHERE namespace = ? AND phrase = ? AND simplify = ? AND capture = ?",
+                        (now, self.namespace, phrase, int(simplify), int(capture)),
+                    )
+            except _ERRORS:
+                self.errors += 1
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            return row[0], row[1]
+
+    def put(self, phrase: str, simplify: bool, normalized, regex: str,
+            capture: bool = True) -> None:
+        """Guarda una traducción (o su mensaje de error)."""
+        self.put_many([(phrase, simplify, normalized, regex)], capture)
+
+    def put_many(self, entries, capture: bool = True) -> None:
+        """
+        Guarda varias tuplas (frase, simplify, normalizado, regex) en una
+        transacción, todas traducidas con el mismo `capture`.
+        """
+        now = time.time()
+        rows = [(self.namespace, phrase, int(simplify), int(capture), normalized, regex, now)
+                for phrase, simplify, normalized, regex in entries]
+        if not rows:
+            return
+        with self._lock:
+            try:
+                conn = self._connection()
+                with _transaction(conn):
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO translations "
+                        "(namespace, phrase, simplify, capture, normalized, regex, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                self.writes += len(rows)
+                self._writes += len(rows)
+                if self._writes >= EVICT_EVERY:
+                    self._writes = 0
+                    self._evict(conn)
+            except _ERRORS:
+                self.errors += 1
+
+    def contains(self, phrase: str, simplify: bool, capture: bool = True) -> bool:
+        """True si hay entrada vigente para `phrase` (no cuenta como acierto)."""
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT 1 FROM translations "
+                    "WHERE namespace = ? AND phrase = ? AND simplify = ? AND capture = ?",
+                    (self.namespace, phrase, int(simplify), int(capture)),
+                ).fetchone()
+            except _ERRORS:
+                self.errors += 1
+                return False
+            return row is not None
+
+    def evict(self) -> None:
+        """Aplica el límite de tamaño ahora (normalmente se hace cada `EVICT_EVERY` escrituras)."""
+        with self._lock:
+            try:
+                self._evict(self._connection())
+            except _ERRORS:
+                self.errors += 1
+
+    def _evict(self, conn) -> None:
+        """Borra las entradas sobrantes: primero otros espacios de nombres, luego LRU."""
+        with _transaction(conn):
+            total = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            excess = total - self.max_entries
+            if excess <= 0:
+                return
+            conn.execute(
+                "DELETE FROM translations WHERE rowid IN ("
+                " SELECT rowid FROM translations"
+                " ORDER BY namespace = ?, last_used LIMIT ?)",
+                (self.namespace, excess),
+            )
+            self.evictions += excess
+
+    def clear(self) -> None:
+        """Borra todas las entradas del archivo."""
+        with self._lock:
+            try:
+                self._connection().execute("DELETE FROM translations")
+            except _ERRORS:
+                self.errors += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            try:
+                return self._connection().execute(
+                    "SELECT COUNT(*) FROM translations WHERE namespace = ?",
+                    (self.namespace,),
+                ).fetchone()[0]
+            except _ERRORS:
+                self.errors += 1
+                return 0
+
+    def stats(self) -> dict:
+        """Contadores de este proceso y entradas vigentes en el archivo."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "path": self.path,
+        }
+
+
+def _migrate(conn) -> None:
+    """Borra la tabla de un archivo anterior a la columna `capture`."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(translations)")]
+    if columns and "capture" not in columns:
+        conn.execute("DROP TABLE translations")
+
+
+class _transaction:
+    """`BEGIN IMMEDIATE` ... `COMMIT` (o `ROLLBACK` si hay excepción)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        # IMMEDIATE toma el bloqueo de escritura al empezar: dos procesos
+        # no pueden quedar esperándose el uno al otro a mitad de transacción
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -6,43 +6,12 @@ se construye la expresión regular a partir de la frase en DSL:
 
 1. Muestra la frase original y su versión normalizada.
 2. Construye el AST usando `parse_normalized` (Lark).
-3. Recorre el AST con `explain_tree` para ir armando la regex
-   y acumulando mensajes explicativos.
+3. Recorre el AST con `explain_tree` (sin recursión) para ir armando
+   la regex y acumulando mensajes explicativos.
 4. Muestra la regex final (ya generada por el traductor principal).
 """
 
 from colorama import Fore
-<<<<<<< HEAD
-from lark_parser import normalize_text, parse_normalized, translate_tree
-
-
-def explain_phrase_and_regex(phrase, final_regex):
-    explanation = []
-
-    # ============================================================
-    # 1. NORMALIZACIÓN
-    # ============================================================
-    normalized = normalize_text(phrase)
-
-    explanation.append(Fore.CYAN + "=== Normalización ===")
-    explanation.append(Fore.GREEN + f"Frase original: {phrase}")
-    explanation.append(Fore.GREEN + f"DSL normalizado: {normalized}\n")
-
-    # ============================================================
-    # 2. PARSING → AST
-    # ============================================================
-    try:
-        tree = parse_normalized(normalized)
-    except Exception as e:
-        return Fore.RED + f"ERROR al generar AST: {e}"
-
-    explanation.append(Fore.CYAN + "=== AST generado ===")
-    explanation.append(tree.pretty() + "\n")
-
-    # ============================================================
-    # 3. EXPLICACIÓN ESTRUCTURAL
-    # ============================================================
-=======
 from lark_parser import normalize_text, parse_normalized
 
 
@@ -84,41 +53,105 @@ def explain_phrase_and_regex(phrase, final_regex):
         return Fore.RED + f"ERROR al generar AST: {e}"
 
     explanation.append(Fore.CYAN + "=== AST generado ===")
-    # `pretty()` dibuja el árbol de forma legible
-    explanation.append(tree.pretty() + "\n")
+    # `pretty_tree()` dibuja el árbol de forma legible
+    explanation.append(pretty_tree(tree) + "\n")
 
-    # 3) Recorrer recursivamente el AST para explicar la estructura
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
+    # 3) Recorrer el AST para explicar la estructura
     explanation.append(Fore.CYAN + "=== Explicación estructural ===")
     built_regex, steps = explain_tree(tree)
     explanation.extend(steps)
 
-<<<<<<< HEAD
-    # ============================================================
-    # 4. REGEX FINAL
-    # ============================================================
-=======
     # 4) Mostrar la regex final (la que realmente se usa)
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     explanation.append("\n" + Fore.CYAN + "=== Regex final ===")
     explanation.append(Fore.GREEN + final_regex)
 
     return "\n".join(explanation)
 
 
-<<<<<<< HEAD
-# ============================================================
-# FUNCIÓN RECURSIVA PRINCIPAL
-# ============================================================
+# Términos base (clases de caracteres y atajos). Cada entrada mapea una
+# regla de la gramática a: (regex, descripción legible)
+BASE_MAP = {
+    "t_digit": ("[0-9]", "digit → [0-9]"),
+    "t_letter": ("[a-zA-Z]", "letter → [a-zA-Z]"),
+    "t_space": (r"\s", "space → \\s"),
+    "t_any": (".", "any character → ."),
+    "t_upper": ("[A-Z]", "uppercase letter → [A-Z]"),
+    "t_lower": ("[a-z]", "lowercase letter → [a-z]"),
+    "t_vowel": ("[AEIOUaeiou]", "vowel → [AEIOUaeiou]"),
+    "t_consonant": (
+        "[BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz]",
+        "consonant → all consonants",
+    ),
+    "t_word": (r"\w", "word character → \\w"),
+    "t_alphanumeric": ("[A-Za-z0-9]", "alphanumeric → [A-Za-z0-9]"),
+    "t_hex": ("[0-9A-Fa-f]", "hex digit → [0-9A-Fa-f]"),
+    "t_whitespace": (r"\s", "whitespace → \\s"),
+    "t_non_whitespace": (r"\S", "non whitespace → \\S"),
+}
+
+# Reglas que se explican leyendo directamente sus tokens: sus hijos no se
+# recorren por separado
+LEAF_RULES = frozenset(BASE_MAP) | {
+    "t_range", "t_char", "t_string",
+    "r_optional", "r_one_or_more", "r_zero_or_more",
+    "r_exact", "r_range", "r_at_least", "r_at_most",
+}
+
+
+# Longitud máxima con la que un fragmento de regex aparece en un paso de
+# la explicación: cada paso repite el fragmento construido hasta ahí, y con
+# miles de grupos anidados el texto crecería con el cuadrado del tamaño.
+MAX_SHOWN = 120
+
+
+def _show(fragment: str) -> str:
+    """`fragment` abreviado por el medio si pasa de `MAX_SHOWN` caracteres."""
+    if len(fragment) <= MAX_SHOWN:
+        return fragment
+    half = (MAX_SHOWN - 3) // 2
+    return f"{fragment[:half]} … {fragment[-half:]}"
+
+
+# Niveles de sangría que dibuja `pretty_tree`; a partir de ahí se escribe
+# el nivel en lugar de seguir sangrando
+MAX_INDENT = 64
+
+
+def pretty_tree(tree, indent_str: str = "  ") -> str:
+    """
+    Igual que `lark.Tree.pretty()`, pero sin recursión: los árboles muy
+    profundos (miles de grupos anidados) no agotan la pila. Más allá de
+    `MAX_INDENT` niveles la sangría se sustituye por "[nivel] ", para que
+    el texto no crezca con el cuadrado de la profundidad.
+    """
+    def indent(level):
+        if level <= MAX_INDENT:
+            return indent_str * level
+        return f"{indent_str * MAX_INDENT}[{level}] "
+
+    lines = []
+    stack = [(tree, 0)]
+    while stack:
+        node, level = stack.pop()
+        if not hasattr(node, "data"):
+            lines.append(f"{indent(level)}{node}\n")
+            continue
+        children = node.children
+        if len(children) == 1 and not hasattr(children[0], "data"):
+            lines.append(f"{indent(level)}{node.data}\t{children[0]}\n")
+            continue
+        lines.append(f"{indent(level)}{node.data}\n")
+        stack.extend((child, level + 1) for child in reversed(children))
+    return "".join(lines)
 
-def explain_tree(tree):
-    nodetype = getattr(tree, "data", None)
 
-    # -------------------- TERMINALES --------------------
-=======
 def explain_tree(tree):
     """
-    Función recursiva que explica un nodo del AST y todos sus hijos.
+    Explica un nodo del AST y todos sus hijos.
+
+    El árbol se recorre en postorden con una pila explícita (sin
+    recursión): cada nodo se explica con los resultados de sus hijos ya
+    calculados, en `_explain_node`.
 
     Parámetros
     ----------
@@ -132,6 +165,45 @@ def explain_tree(tree):
         - steps : lista de líneas de explicación (con colores) sobre cómo
                   se construyó ese fragmento.
     """
+    results = []                        # (regex, steps) pendientes de su padre
+    stack = [(tree, -1)]
+    while stack:
+        node, count = stack.pop()
+        if count >= 0:
+            start = len(results) - count
+            children = results[start:]
+            del results[start:]
+            results.append(_explain_node(node, children))
+            continue
+        nodetype = getattr(node, "data", None)
+        if nodetype is None or nodetype in LEAF_RULES:
+            results.append(_explain_node(node, []))
+            continue
+        stack.append((node, len(node.children)))
+        stack.extend((child, -1) for child in reversed(node.children))
+    return results[0]
+
+
+def _join(children):
+    """
+    Une los resultados de varios hijos: (fragmentos, pasos). Los pasos se
+    añaden a la lista del primer hijo, que no vuelve a usarse, en lugar de
+    copiarlos en cada nivel del árbol.
+    """
+    parts = [r for r, _ in children]
+    if not children:
+        return parts, []
+    steps = children[0][1]
+    for _, s in children[1:]:
+        steps.extend(s)
+    return parts, steps
+
+
+def _explain_node(tree, children):
+    """
+    Explica un único nodo a partir de `children`, los (regex, steps) de
+    sus hijos (vacío para tokens y `LEAF_RULES`).
+    """
     # `data` es el nombre de la regla (para Tree); para Token no existe
     nodetype = getattr(tree, "data", None)
 
@@ -139,24 +211,20 @@ def explain_tree(tree):
     # CASO 1: TERMINALES (Tokens)
     # Si `nodetype` es None, Lark nos ha dado un Token (valor textual).
     # ------------------------------------------------------------------
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     if nodetype is None:
         token = str(tree)
         return token, [Fore.YELLOW + f"Terminal literal → '{token}'"]
 
-<<<<<<< HEAD
-    # ---------- BASE TERMS ----------
-=======
     # ------------------------------------------------------------------
     # CASO 2: Nodo raíz 'start'
     # Representa el punto de entrada de la gramática.
     # ------------------------------------------------------------------
     if nodetype == "start":
-        if not tree.children:
+        if not children:
             return "", [Fore.RED + "Árbol vacío en 'start'."]
         # Por diseño asumimos un único hijo que contiene toda la expresión
-        regex, steps = explain_tree(tree.children[0])
-        steps.append(Fore.YELLOW + f"start → expresión completa: {regex}")
+        regex, steps = children[0]
+        steps.append(Fore.YELLOW + f"start → expresión completa: {_show(regex)}")
         return regex, steps
 
     # ------------------------------------------------------------------
@@ -164,70 +232,16 @@ def explain_tree(tree):
     # Solo concatenan lo que producen sus hijos.
     # ------------------------------------------------------------------
     if nodetype in ("element", "term"):
-        parts = []
-        steps = []
-        for ch in tree.children:
-            r, s = explain_tree(ch)
-            parts.append(r)
-            steps.extend(s)
+        parts, steps = _join(children)
         regex = "".join(parts)
-        steps.append(Fore.YELLOW + f"{nodetype} → {regex}")
+        steps.append(Fore.YELLOW + f"{nodetype} → {_show(regex)}")
         return regex, steps
 
     # ------------------------------------------------------------------
-    # CASO 4: Términos base (clases de caracteres y atajos)
-    # Cada entrada mapea una regla de la gramática a:
-    #    (regex, descripción legible)
+    # CASO 4: Términos base (clases de caracteres y atajos, ver BASE_MAP)
     # ------------------------------------------------------------------
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-    base_map = {
-        "t_digit": ("[0-9]", "digit → [0-9]"),
-        "t_letter": ("[a-zA-Z]", "letter → [a-zA-Z]"),
-        "t_space": (r"\s", "space → \\s"),
-        "t_any": (".", "any character → ."),
-        "t_upper": ("[A-Z]", "uppercase letter → [A-Z]"),
-        "t_lower": ("[a-z]", "lowercase letter → [a-z]"),
-        "t_vowel": ("[AEIOUaeiou]", "vowel → [AEIOUaeiou]"),
-<<<<<<< HEAD
-        "t_consonant": ("[BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz]",
-                        "consonant → all consonants"),
-=======
-        "t_consonant": (
-            "[BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz]",
-            "consonant → all consonants",
-        ),
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-        "t_word": (r"\w", "word character → \\w"),
-        "t_alphanumeric": ("[A-Za-z0-9]", "alphanumeric → [A-Za-z0-9]"),
-        "t_hex": ("[0-9A-Fa-f]", "hex digit → [0-9A-Fa-f]"),
-        "t_whitespace": (r"\s", "whitespace → \\s"),
-        "t_non_whitespace": (r"\S", "non whitespace → \\S"),
-    }
-
-    if nodetype in base_map:
-<<<<<<< HEAD
-        regex, msg = base_map[nodetype]
-        return regex, [Fore.YELLOW + msg]
-
-    # ---------- LITERALES ----------
-    if nodetype == "t_char":
-        val = tree.children[0].value[1:-1]
-        return val, [Fore.YELLOW + f"character literal '{val}' → {val}"]
-
-    if nodetype == "t_string":
-        val = tree.children[0].value[1:-1]
-        return val, [Fore.YELLOW + f"string literal \"{val}\" → {val}"]
-
-    # ---------- RANGO ----------
-    if nodetype == "t_range":
-        c1 = tree.children[0][1:-1]
-        c2 = tree.children[1][1:-1]
-        r = f"[{c1}-{c2}]"
-        return r, [Fore.YELLOW + f"range '{c1}' to '{c2}' → {r}"]
-
-    # ---------- NEGACIÓN ----------
-=======
-        regex, desc = base_map[nodetype]
+    if nodetype in BASE_MAP:
+        regex, desc = BASE_MAP[nodetype]
         return regex, [Fore.YELLOW + desc]
 
     # ------------------------------------------------------------------
@@ -297,109 +311,38 @@ def explain_tree(tree):
     #
     # Construimos una clase negada: [^...] a partir del segundo hijo.
     # ------------------------------------------------------------------
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     if nodetype == "t_except":
-        base_r, base_steps = explain_tree(tree.children[0])
-        neg_r, neg_steps = explain_tree(tree.children[1])
-
-<<<<<<< HEAD
-        inside = neg_r.strip("[]")
-        r = f"[^{inside}]"
+        (base_r, _), (neg_r, _) = children[:2]
+        _, steps = _join(children)
 
-=======
         # Asumimos que neg_r es algo tipo "[...]" → extraemos el interior
         inside = neg_r.strip("[]")
         r = f"[^{inside}]"
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-        steps = base_steps + neg_steps
-        steps.append(Fore.YELLOW + f"except → negación → {r}")
+        steps.append(Fore.YELLOW + f"except → negación → {_show(r)}")
         return r, steps
 
-<<<<<<< HEAD
-    # ---------- REPETICIONES ----------
-    if nodetype == "r_optional":
-        return "?", ["optional → ?"]
-
-    if nodetype == "r_one_or_more":
-        return "+", ["one or more → +"]
-
-    if nodetype == "r_zero_or_more":
-        return "*", ["zero or more → *"]
-
-    if nodetype == "r_exact":
-        n = tree.children[0]
-        return f"{{{n}}}", [f"{n} times → {{{n}}}"]
-
-    if nodetype == "r_range":
-        a, b = tree.children
-        return f"{{{a},{b}}}", [f"between {a} and {b} times → {{{a},{b}}}"]
-
-    if nodetype == "r_at_least":
-        n = tree.children[0]
-        return f"{{{n},}}", [f"at least {n} times → {{{n},}}"]
-
-    if nodetype == "r_at_most":
-        n = tree.children[0]
-        return f"{{0,{n}}}", [f"at most {n} times → {{0,{n}}}"]
-
-    # ---------- SEQUENCE ----------
-=======
     # ------------------------------------------------------------------
     # CASO 9: sequence
     #
     # Representa concatenación de varios elementos.
     # ------------------------------------------------------------------
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     if nodetype == "sequence":
-        parts = []
-        steps = []
-        for ch in tree.children:
-            r, s = explain_tree(ch)
-            parts.append(r)
-            steps.extend(s)
-<<<<<<< HEAD
-        final = "".join(parts)
-        steps.append(Fore.YELLOW + f"sequence → concatenación: {final}")
-        return final, steps
-
-    # ---------- OR ----------
-    if nodetype == "or_expr":
-=======
+        parts, steps = _join(children)
         joined = "".join(parts)
-        steps.append(Fore.YELLOW + f"sequence → concatenación: {joined}")
+        steps.append(Fore.YELLOW + f"sequence → concatenación: {_show(joined)}")
         return joined, steps
 
     # ------------------------------------------------------------------
     # CASO 10: OR / OR_EXPR
     #
-    # Representa alternativas: (A|B).
+    # Representa alternativas: (A|B|C), una rama por hijo.
     # ------------------------------------------------------------------
     if nodetype in ("or", "or_expr"):
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-        left, s1 = explain_tree(tree.children[0])
-        right, s2 = explain_tree(tree.children[1])
-        r = f"({left}|{right})"
-        return r, s1 + s2 + [Fore.YELLOW + f"or → alternativa: {r}"]
-
-<<<<<<< HEAD
-    # ---------- REPEATED TERM ----------
-    if nodetype == "repeated_term":
-        steps = []
-        parts = []
-        for ch in tree.children:
-            r, s = explain_tree(ch)
-            parts.append(r)
-            steps.extend(s)
-        r = "".join(parts)
-        steps.append(Fore.YELLOW + f"repeated term → {r}")
+        parts, steps = _join(children)
+        r = "(" + "|".join(parts) + ")"
+        steps.append(Fore.YELLOW + f"or → alternativa: {_show(r)}")
         return r, steps
 
-    # ---------- GROUP ----------
-    if nodetype == "group":
-        seq_r, seq_steps = explain_tree(tree.children[0])
-        steps = seq_steps.copy()
-
-=======
     # ------------------------------------------------------------------
     # CASO 11: Nodos de repetición / cuantificadores
     #
@@ -452,19 +395,15 @@ def explain_tree(tree):
     # Donde "repetition" es alguno de los nodos r_* anteriores.
     # ------------------------------------------------------------------
     if nodetype == "repeated_term":
-        children = list(tree.children)
-
         # Solo un hijo → sin cuantificador explícito
         if len(children) == 1:
-            return explain_tree(children[0])
+            return children[0]
 
         # Dos hijos:
         #   o bien (term, repetition) o (repetition, term)
         if len(children) == 2:
-            c1, c2 = children
-            r1, s1 = explain_tree(c1)
-            r2, s2 = explain_tree(c2)
-            steps = s1 + s2
+            (r1, _), (r2, _) = children
+            _, steps = _join(children)
 
             quantifiers = ["?", "+", "*"]
             # Si el primer fragmento es cuantificador → va después del término
@@ -472,41 +411,33 @@ def explain_tree(tree):
                 regex = r2 + r1
                 steps.append(
                     Fore.YELLOW
-                    + f"repeated_term → aplicamos cuantificador '{r1}' al término '{r2}': {regex}"
+                    + f"repeated_term → aplicamos cuantificador '{r1}' al término '{_show(r2)}': {_show(regex)}"
                 )
             else:
                 regex = r1 + r2
                 steps.append(
                     Fore.YELLOW
-                    + f"repeated_term → aplicamos cuantificador '{r2}' al término '{r1}': {regex}"
+                    + f"repeated_term → aplicamos cuantificador '{r2}' al término '{_show(r1)}': {_show(regex)}"
                 )
             return regex, steps
 
         # Tres hijos:
         #   repetición antes, término en medio, repetición después.
         if len(children) == 3:
-            rep_before, term_node, rep_after = children
-            r_before, s_before = explain_tree(rep_before)
-            r_term, s_term = explain_tree(term_node)
-            r_after, s_after = explain_tree(rep_after)
+            (r_before, _), (r_term, _), (r_after, _) = children
+            _, steps = _join(children)
 
             regex = r_term + r_before + r_after
-            steps = s_before + s_term + s_after
             steps.append(
                 Fore.YELLOW
-                + f"repeated_term → cuantificador doble alrededor de '{r_term}': {regex}"
+                + f"repeated_term → cuantificador doble alrededor de '{_show(r_term)}': {_show(regex)}"
             )
             return regex, steps
 
         # Más de tres hijos (caso muy raro) → concatenamos todo sin más
-        parts = []
-        steps = []
-        for ch in children:
-            r, s = explain_tree(ch)
-            parts.append(r)
-            steps.extend(s)
+        parts, steps = _join(children)
         regex = "".join(parts)
-        steps.append(Fore.YELLOW + f"repeated_term → {regex}")
+        steps.append(Fore.YELLOW + f"repeated_term → {_show(regex)}")
         return regex, steps
 
     # ------------------------------------------------------------------
@@ -518,48 +449,31 @@ def explain_tree(tree):
     #   → (seq) o (seq)repetition
     # ------------------------------------------------------------------
     if nodetype == "group":
-        # Primero explicamos la secuencia interna
-        seq_r, seq_steps = explain_tree(tree.children[0])
-        steps = seq_steps.copy()
+        # La secuencia interna ya está explicada
+        seq_r, steps = children[0]
 
         # Sin repetición → solo agrupamos
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-        if len(tree.children) == 1:
+        if len(children) == 1:
             r = f"({seq_r})"
-            steps.append(Fore.YELLOW + f"group → {r}")
+            steps.append(Fore.YELLOW + f"group → {_show(r)}")
             return r, steps
 
-<<<<<<< HEAD
-        rep_r, rep_steps = explain_tree(tree.children[1])
-        steps.extend(rep_steps)
-
-=======
         # Con repetición → (expr)quantifier
-        rep_r, rep_steps = explain_tree(tree.children[1])
+        rep_r, rep_steps = children[1]
         steps.extend(rep_steps)
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         r = f"({seq_r}){rep_r}"
-        steps.append(Fore.YELLOW + f"group with repetition → {r}")
+        steps.append(Fore.YELLOW + f"group with repetition → {_show(r)}")
         return r, steps
 
-<<<<<<< HEAD
-    # Fallback
-    return "", [Fore.RED + f"⚠ nodo no reconocido: {nodetype}"]
-=======
     # ------------------------------------------------------------------
     # CASO 14: Fallback
     #
     # Si llega un nodo no contemplado explíticamente, no fallamos en seco:
-    # - Recorrermos recursivamente sus hijos para no perder la estructura.
+    # - Usamos lo que producen sus hijos para no perder la estructura.
     # - Anotamos un mensaje de advertencia con el tipo de nodo.
     # ------------------------------------------------------------------
-    regex_parts = []
     steps = [Fore.RED + f"⚠ nodo no reconocido: {nodetype}, se recorren hijos."]
-    for ch in getattr(tree, "children", []):
-        r, s = explain_tree(ch)
-        regex_parts.append(r)
+    for _, s in children:
         steps.extend(s)
-
-    regex = "".join(regex_parts)
+    regex = "".join(r for r, _ in children)
     return regex, steps
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
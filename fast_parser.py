@@ -0,0 +1,266 @@
+"""
+Módulo `fast_parser.py`
+
+Parser descendente recursivo escrito a mano para el DSL normalizado.
+
+Reconoce exactamente el mismo lenguaje que `grammar.lark` y, en lugar de
+construir un árbol, llama directamente a los métodos de `RegexTranslator`
+con los mismos hijos que les pasaría Lark. Así el resultado es idéntico
+al del motor Lark, pero sin el coste del runtime genérico.
+
+Los grupos anidados no se resuelven con recursión sino con una pila de
+secuencias abiertas: la profundidad de anidamiento solo está limitada
+por la memoria, no por el límite de recursión de Python.
+
+Gramática (ver `grammar.lark`):
+
+    start         : expr
+    expr          : sequence ("or" sequence)*
+    sequence      : element ("followed by" element)*
+    element       : group | repeated_term
+    group         : "group" sequence "end group" repetition?
+    repeated_term : repetition? term repetition?
+    term          : base_term ("except" base_term)? | range_expr
+    range_expr    : "range" CHAR_LITERAL "to" CHAR_LITERAL
+"""
+
+import re
+
+# Palabras clave con cada término base y el método del traductor asociado
+BASE_TERMS = {
+    "letter": "t_letter",
+    "digit": "t_digit",
+    "space": "t_space",
+    "any character": "t_any",
+    "uppercase letter": "t_upper",
+    "lowercase letter": "t_lower",
+    "vowel": "t_vowel",
+    "consonant": "t_consonant",
+    "alphanumeric": "t_alphanumeric",
+    "word character": "t_word",
+    "hex digit": "t_hex",
+    "whitespace": "t_whitespace",
+    "non whitespace": "t_non_whitespace",
+}
+
+# Cuantificadores sin argumentos
+SIMPLE_REPETITIONS = {
+    "one or more": "r_one_or_more",
+    "zero or more": "r_zero_or_more",
+    "optional": "r_optional",
+}
+
+KEYWORDS = (
+    list(BASE_TERMS) + list(SIMPLE_REPETITIONS) + [
+        "times", "between", "and", "at least", "at most",
+        "followed by", "or", "group", "end group", "except", "range", "to",
+    ]
+)
+
+# Como en Lark, las palabras clave se reconocen literalmente (sin exigir
+# frontera de palabra) y gana la coincidencia más larga.
+_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<INT>\d+)|(?P<LITERAL>'[^']*')|(?P<KEYWORD>"
+    + "|".join(re.escape(k) for k in sorted(KEYWORDS, key=len, reverse=True))
+    + "))"
+)
+
+
+class DSLSyntaxError(ValueError):
+    """
+    Error de sintaxis del motor rápido.
+
+    Expone `pos_in_stream` igual que `lark.UnexpectedInput`, de modo que
+    `lark_parser.describe_syntax_error` puede señalar la frase original.
+    Vale -1 cuando la entrada termina antes de tiempo.
+    """
+
+    def __init__(self, message: str, pos_in_stream: int):
+        super().__init__(message)
+        self.pos_in_stream = pos_in_stream
+
+
+def tokenize(text: str):
+    """
+    Divide el DSL normalizado en tokens (tipo, valor, posición).
+
+    El tipo es "INT", "LITERAL" o la propia palabra clave.
+    """
+    tokens = []
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        m = _TOKEN_RE.match(text, pos)
+        if m is None:
+            start = pos + len(text[pos:]) - len(text[pos:].lstrip())
+            raise DSLSyntaxError(f"Carácter inesperado en la posición {start}", start)
+        group = m.lastgroup
+        value = m.group(group)
+        kind = value if group == "KEYWORD" else group
+        tokens.append((kind, value, m.start(group)))
+        pos = m.end()
+    return tokens
+
+
+class FastParser:
+    """
+    Parser descendente que traduce mientras reconoce.
+
+    Parameters
+    ----------
+    translator : RegexTranslator
+        Instancia cuyos métodos generan cada nodo de la IR.
+    """
+
+    def __init__(self, translator):
+        self.t = translator
+
+    def parse(self, text: str):
+        """Traduce el DSL normalizado `text` al nodo raíz de la IR de regex."""
+        self.tokens = tokenize(text)
+        self.i = 0
+        result = self.t.start([self.expr()])
+        if self.i < len(self.tokens):
+            self.error()
+        return result
+
+    # ------------------------------------------------------------------
+    #  UTILIDADES
+    # ------------------------------------------------------------------
+
+    def peek(self):
+        """Tipo del token actual, o None al final de la entrada."""
+        if self.i < len(self.tokens):
+            return self.tokens[self.i][0]
+        return None
+
+    def expect(self, kind: str) -> str:
+        """Consume un token del tipo indicado y devuelve su valor."""
+        if self.peek() != kind:
+            self.error()
+        value = self.tokens[self.i][1]
+        self.i += 1
+        return value
+
+    def error(self):
+        if self.i < len(self.tokens):
+            kind, value, pos = self.tokens[self.i]
+            raise DSLSyntaxError(f"Token inesperado '{value}' en la posición {pos}", pos)
+        raise DSLSyntaxError("Fin de frase inesperado", -1)
+
+    # ------------------------------------------------------------------
+    #  REGLAS
+    # ------------------------------------------------------------------
+
+    def expr(self):
+        # "A or B or C" es un único or_expr(A, B, C), como en la gramática
+        sequences = [self.sequence()]
+        while self.peek() == "or":
+            self.i += 1
+            sequences.append(self.sequence())
+        if len(sequences) == 1:
+            return sequences[0]
+        return self.t.or_expr(sequences)
+
+    def sequence(self):
+        """
+        sequence : element ("followed by" element)*
+        element  : group | repeated_term
+        group    : "group" sequence "end group" repetition?
+
+        Las tres reglas se reconocen en un solo bucle: al abrir un grupo
+        se apilan los elementos de la secuencia exterior y al cerrarlo se
+        recuperan con el grupo ya traducido como siguiente elemento.
+        """
+        outer = []                      # elementos de las secuencias abiertas
+        elements = []
+        while True:
+            if self.peek() == "group":
+                self.i += 1
+                outer.append(elements)
+                elements = []
+                continue
+            elements.append(self.t.element([self.repeated_term()]))
+            # Tras un elemento: sigue la secuencia o se cierran grupos
+            while self.peek() != "followed by":
+                node = self.t.sequence(elements)
+                if not outer:
+                    return node
+                self.expect("end group")
+                children = [node]
+                rep = self.repetition()
+                if rep is not None:
+                    children.append(rep)
+                elements = outer.pop()
+                elements.append(self.t.element([self.t.group(children)]))
+            self.i += 1
+
+    def repeated_term(self):
+        children = []
+        rep = self.repetition()
+        if rep is not None:
+            children.append(rep)
+        children.append(self.term())
+        rep = self.repetition()
+        if rep is not None:
+            children.append(rep)
+        return self.t.repeated_term(children)
+
+    def term(self):
+        if self.peek() == "range":
+            self.i += 1
+            c1 = self.char_literal()
+            self.expect("to")
+            c2 = self.char_literal()
+            return self.t.t_range([c1, c2])
+        base = self.base_term()
+        if self.peek() == "except":
+            self.i += 1
+            return self.t.t_except([base, self.base_term()])
+        return self.t.term([base])
+
+    def base_term(self):
+        kind = self.peek()
+        if kind in BASE_TERMS:
+            self.i += 1
+            return getattr(self.t, BASE_TERMS[kind])([])
+        if kind == "LITERAL":
+            value = self.expect("LITERAL")
+            if len(value) == 3:
+                return self.t.t_char([value])
+            return self.t.t_string([value])
+        self.error()
+
+    def char_literal(self):
+        if self.peek() != "LITERAL" or len(self.tokens[self.i][1]) != 3:
+            self.error()
+        return self.expect("LITERAL")
+
+    def repetition(self):
+        """Cuantificador opcional: devuelve su nodo `Quantifier` o None si no hay."""
+        kind = self.peek()
+        if kind in SIMPLE_REPETITIONS:
+            self.i += 1
+            return getattr(self.t, SIMPLE_REPETITIONS[kind])([])
+        if kind == "INT":
+            n = self.expect("INT")
+            self.expect("times")
+            return self.t.r_exact([n])
+        if kind == "between":
+            self.i += 1
+            n1 = self.expect("INT")
+            self.expect("and")
+            n2 = self.expect("INT")
+            self.expect("times")
+            return self.t.r_range([n1, n2])
+        if kind == "at least":
+            self.i += 1
+            n = self.expect("INT")
+            self.expect("times")
+            return self.t.r_at_least([n])
+        if kind == "at most":
+            self.i += 1
+            n = self.expect("INT")
+            self.expect("times")
+            return self.t.r_at_most([n])
+        return None
@@ -3,48 +3,123 @@ Módulo `lark_parser.py`
 
 Centraliza:
 
-- La carga de la gramática `grammar.lark` usando Lark.
+- La carga de la gramática `grammar.lark` usando Lark (con las tablas
+  LALR cacheadas en disco para acelerar el arranque).
 - El normalizador de texto (pseudolenguaje → DSL interno).
 - El parseo del DSL normalizado a un árbol de sintaxis (AST).
-- La traducción del AST a regex usando `RegexTranslator`.
+- La traducción del AST a regex usando `RegexTranslator`, que construye
+  la IR tipada de `regex_ir.py`; la regex en texto se serializa al final.
+- La selección del motor de parseo: Lark o el parser escrito a mano de
+  `fast_parser.py` (`set_engine`).
 - Un helper de alto nivel `translate_to_regex(text)` que encapsula
   todo el pipeline y maneja los errores más comunes.
+- Una caché LRU por niveles delante del pipeline: por frase, por DSL
+  normalizado y por IR canónica (`configure_cache`, `clear_cache`,
+  `cache_stats`).
+- `translate_record(text)`: el pipeline con el detalle de cada fase
+  (DSL, validez, error y tiempos), usado por el modo `--batch`.
+- `translate(text)`: un `TranslationResult` con la regex y su `re.Pattern`
+  ya compilado (compilado una sola vez por regex, ver `utils.compile_regex`).
+- Una caché persistente opcional detrás de la LRU (`configure_disk_cache`,
+  `warm_disk_cache`), compartida entre procesos y reinicios.
 """
 
+import hashlib
+import os
+import time
+
 from lark import Lark, UnexpectedInput
 from translator import RegexTranslator
-from normalizer import Normalizer
+from fast_parser import FastParser, DSLSyntaxError
+from normalizer import Normalizer, source_span
+from regex_ir import drop_captures, to_regex
+from utils import (
+    optimize_regex, validate_regex, compile_regex,
+    configure_pattern_cache, pattern_cache_stats, SIMPLIFIER_VERSION,
+)
+from cache import LRUCache, MISSING
+from disk_cache import DiskCache
+import normalizer as normalizer_module
+import regex_ir
+import translator as translator_module
 
-<<<<<<< HEAD
-# Instancia global del normalizador
-=======
 # Instancia global del normalizador que se reutiliza en todo el proyecto.
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-normalizer = Normalizer()
+# El modo "tokens" tokeniza una sola vez y conserva las posiciones de la
+# frase original, lo que permite señalar dónde falla el parseo.
+normalizer = Normalizer(mode="tokens")
 
 # ----------------------------------------------------------------------
 # CARGA DE LA GRAMÁTICA
 # ----------------------------------------------------------------------
-try:
-    # Lark.open permite cargar el archivo grammar.lark relativo a este módulo.
+
+GRAMMAR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grammar.lark")
+
+# Las tablas LALR ya calculadas se guardan junto a los .pyc del proyecto
+CACHE_DIR = os.path.join(os.path.dirname(GRAMMAR_PATH), "__pycache__")
+
+
+def grammar_hash(path: str = GRAMMAR_PATH) -> str:
+    """SHA-256 (abreviado) del contenido de la gramática."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def grammar_cache_path(path: str = GRAMMAR_PATH) -> str:
+    """Ruta del artefacto con las tablas LALR para la versión actual de la gramática."""
+    return os.path.join(CACHE_DIR, f"grammar.{grammar_hash(path)}.lark-cache")
+
+
+def load_parser(use_cache: bool = True, transformer=None):
+    """
+    Construye el parser LALR de `grammar.lark`.
+
+    Con `use_cache=True` las tablas se leen de (o se escriben en) un
+    artefacto cuyo nombre incluye el hash de la gramática: si la gramática
+    cambia, el nombre cambia y las tablas se recalculan. Lark además
+    verifica el hash guardado dentro del archivo. Los artefactos de
+    versiones anteriores se eliminan. Cualquier fallo con la caché
+    (directorio de solo lectura, archivo corrupto, ...) hace que se
+    construya la gramática en vivo.
+
+    Si se pasa `transformer`, Lark lo aplica durante el parseo LALR y
+    `parse` devuelve directamente su resultado, sin construir el árbol.
+    """
     # - start="start": regla inicial de la gramática.
     # - parser="lalr": usa el parser LALR(1) (rápido y adecuado para gramáticas grandes).
-    parser = Lark.open("grammar.lark", rel_to=__file__, start="start", parser="lalr")
+    options = dict(rel_to=__file__, start="start", parser="lalr", transformer=transformer)
+    if use_cache:
+        try:
+            cache_path = grammar_cache_path()
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            for name in os.listdir(CACHE_DIR):
+                stale = os.path.join(CACHE_DIR, name)
+                if name.startswith("grammar.") and name.endswith(".lark-cache") and stale != cache_path:
+                    os.remove(stale)
+            return Lark.open("grammar.lark", cache=cache_path, **options)
+        except OSError:
+            pass
+    return Lark.open("grammar.lark", **options)
+
+
+# Instancia única del traductor: no guarda estado entre frases, así que
+# se comparte entre el parser fusionado y `translate_tree`.
+translator = RegexTranslator()
+
+try:
+    # Tablas LALR cacheadas en disco (ver `load_parser`)
+    _use_cache = os.environ.get("TRADUCTORREGEX_NO_GRAMMAR_CACHE") is None
+    # `parser` construye el árbol (necesario para --debug y --explain);
+    # `fused_parser` traduce durante el parseo, sin construir el árbol.
+    parser = load_parser(use_cache=_use_cache)
+    fused_parser = load_parser(use_cache=_use_cache, transformer=translator)
 except Exception as e:
     # Si hay algún problema (archivo no encontrado, error de sintaxis en la gramática, etc.),
     # lo reportamos en consola y dejamos `parser = None` para notificar en tiempo de ejecución.
     print("ERROR cargando grammar.lark:", e)
     parser = None
+    fused_parser = None
 
 
-<<<<<<< HEAD
-# ============================================================
-#  FUNCIONES INTERNAS (útiles para depuración y CLI)
-# ============================================================
-
-def normalize_text(text: str) -> str:
-    """Retorna el DSL normalizado sin intentar parsearlo."""
-=======
 # ----------------------------------------------------------------------
 # FUNCIONES AUXILIARES
 # ----------------------------------------------------------------------
@@ -57,17 +132,34 @@ def normalize_text(text: str) -> str:
     Esta función delega en la instancia global de `Normalizer`.
     Se usa tanto en el pipeline principal como en el modo explicación.
     """
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     return normalizer.normalize(text)
 
 
-def parse_normalized(normalized: str):
-<<<<<<< HEAD
-    """Parsea DSL normalizado y retorna el AST."""
-    if parser is None:
-        raise RuntimeError("ERROR: No se pudo cargar grammar.lark")
+def normalize_with_spans(text: str):
+    """
+    Igual que `normalize_text`, pero devuelve además el mapa de posiciones
+    DSL → frase original (ver `Normalizer.normalize_with_spans`).
+    """
+    return normalizer.normalize_with_spans(text)
 
-=======
+
+def describe_syntax_error(text: str, spans, error) -> str:
+    """
+    Construye el mensaje de error de sintaxis señalando la parte de la
+    frase original que corresponde al punto donde falló Lark.
+    """
+    message = "ERROR: La frase no coincide con el DSL."
+    pos = getattr(error, "pos_in_stream", None)
+    span = source_span(spans, pos if pos is not None and pos >= 0 else -1)
+    if span is None:
+        return message
+    start, end = span
+    if pos is None or pos < 0:
+        return message + f" La frase termina de forma incompleta tras '{text[start:end]}'."
+    return message + f" Revisa '{text[start:end]}' (posición {start})."
+
+
+def parse_normalized(normalized: str):
     """
     Parsea una cadena ya normalizada usando la gramática de Lark y devuelve el AST.
 
@@ -90,25 +182,10 @@ def parse_normalized(normalized: str):
     """
     if parser is None:
         raise RuntimeError("ERROR: No se pudo cargar grammar.lark")
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     return parser.parse(normalized)
 
 
 def translate_tree(tree):
-<<<<<<< HEAD
-    """Convierte el AST en una regex cruda."""
-    return RegexTranslator().transform(tree)
-
-
-# ============================================================
-#  API PRINCIPAL
-# ============================================================
-
-def translate_to_regex(text: str):
-    """
-    Función principal usada por el CLI y test.py.
-    Retorna solo la regex final (o error).
-=======
     """
     Traduce un AST de Lark a una expresión regular.
 
@@ -122,67 +199,534 @@ def translate_to_regex(text: str):
     str
         Expresión regular generada por `RegexTranslator`.
     """
-    return RegexTranslator().transform(tree)
+    return to_regex(translate_tree_ir(tree))
+
+
+def translate_tree_ir(tree):
+    """
+    Igual que `translate_tree`, pero devuelve el nodo raíz de la IR
+    (`regex_ir`) en lugar de la regex serializada.
+    """
+    return translator.transform(tree)
+
+
+# ----------------------------------------------------------------------
+# MOTORES DE PARSEO
+# ----------------------------------------------------------------------
+
+# "lark": parser LALR de Lark con el traductor aplicado en línea.
+# "fast": parser descendente recursivo de `fast_parser.py`.
+ENGINES = ("lark", "fast")
+engine = "lark"
+
+
+def set_engine(name: str):
+    """Selecciona el motor que usan `parse_and_translate` y `translate_to_regex`."""
+    global engine
+    if name not in ENGINES:
+        raise ValueError(f"Motor desconocido: {name}")
+    engine = name
+
+
+def parse_and_translate(normalized: str, engine_name: str | None = None) -> str:
+    """
+    Parsea el DSL normalizado y devuelve la regex en texto
+    (`to_regex(parse_to_ir(...))`). Ver `parse_to_ir`.
+    """
+    return to_regex(parse_to_ir(normalized, engine_name))
+
+
+def parse_to_ir(normalized: str, engine_name: str | None = None):
+    """
+    Parsea el DSL normalizado y lo traduce a la IR de regex en una sola
+    pasada, sin construir el `lark.Tree` intermedio.
+
+    Con el motor "lark", `RegexTranslator` se ejecuta dentro del parser
+    LALR; con "fast", el parser descendente recursivo llama a los mismos
+    métodos de `RegexTranslator`. Ambos equivalen a
+    `translate_tree_ir(parse_normalized(normalized))`.
+
+    Parámetros
+    ----------
+    normalized : str
+        Texto que ya está en el DSL que la gramática reconoce.
+    engine_name : str | None
+        Motor a usar; por defecto, el seleccionado con `set_engine`.
+
+    Lanza
+    -----
+    RuntimeError
+        Si el parser de Lark no pudo cargarse.
+    lark.UnexpectedInput / fast_parser.DSLSyntaxError
+        Si el texto no coincide con la gramática.
+    """
+    if (engine_name or engine) == "fast":
+        return FastParser(translator).parse(normalized)
+    if fused_parser is None:
+        raise RuntimeError("ERROR: No se pudo cargar grammar.lark")
+    return fused_parser.parse(normalized)
+
+
+# ----------------------------------------------------------------------
+# CACHÉ DEL PIPELINE
+# ----------------------------------------------------------------------
+
+# Primer nivel, por frase: resultados válidos y errores se guardan en
+# cachés separadas para que una ráfaga de frases inválidas no desaloje las
+# traducciones buenas.
+result_cache = LRUCache(maxsize=1024)
+error_cache = LRUCache(maxsize=256)
+
+# Segundo nivel, por DSL normalizado: muchas frases distintas ("digits",
+# "numbers", "the digits please"...) se normalizan al mismo DSL, que así
+# se parsea, traduce y simplifica una sola vez. Solo guarda regex válidas:
+# los mensajes de error citan la frase original y no se pueden compartir.
+dsl_cache = LRUCache(maxsize=1024)
+
+# Tercer nivel, por IR canónica: DSL distintos que producen la misma IR
+# ("lowercase letter" y "range 'a' to 'z'") comparten la simplificación y
+# la serialización. La clave es `regex_ir.canonical_hash` de la IR, con
+# los digests recordados por `translator.nodes`: solo se calculan los de
+# los nodos nuevos, y la clave sigue valiendo aunque la tabla se vacíe.
+ir_cache = LRUCache(maxsize=1024)
 
 
-def translate_to_regex(text: str):
+def configure_cache(maxsize=1024, ttl=None, error_maxsize=256, error_ttl=None,
+                    pattern_maxsize=1024, dsl_maxsize=1024, ir_maxsize=1024):
+    """
+    Reemplaza las cachés del pipeline por otras con los límites indicados.
+
+    Parámetros
+    ----------
+    maxsize, error_maxsize : int
+        Número máximo de resultados / errores almacenados (0 desactiva).
+    ttl, error_ttl : float | None
+        Tiempo de vida en segundos de cada entrada (None = sin caducidad).
+    pattern_maxsize : int
+        Número máximo de patrones compilados (`utils.compile_regex`).
+    dsl_maxsize, ir_maxsize : int
+        Número máximo de regex por DSL normalizado / por IR canónica
+        (0 desactiva el nivel).
+    """
+    global result_cache, error_cache, dsl_cache, ir_cache
+    result_cache = LRUCache(maxsize=maxsize, ttl=ttl)
+    error_cache = LRUCache(maxsize=error_maxsize, ttl=error_ttl)
+    dsl_cache = LRUCache(maxsize=dsl_maxsize, ttl=ttl)
+    ir_cache = LRUCache(maxsize=ir_maxsize, ttl=ttl)
+    configure_pattern_cache(pattern_maxsize)
+
+
+def clear_cache():
+    """
+    Vacía las cachés del pipeline. Debe llamarse tras modificar
+    `grammar.lark` o las reglas de `Normalizer` en caliente.
+    """
+    result_cache.clear()
+    error_cache.clear()
+    dsl_cache.clear()
+    ir_cache.clear()
+    translator.nodes.clear()
+
+
+def cache_stats():
+    """
+    Contadores de las cachés: {"results": {...}, "errors": {...},
+    "normalized": {...}, "ir": {...}, "patterns": {...}, "hit_rates": {...}}
+    y, si está activa, "disk": {...}. Ver `hit_rates`.
+    """
+    stats = {
+        "results": result_cache.stats(),
+        "errors": error_cache.stats(),
+        "normalized": dsl_cache.stats(),
+        "ir": ir_cache.stats(),
+        "patterns": pattern_cache_stats(),
+    }
+    if disk_cache is not None:
+        stats["disk"] = disk_cache.stats()
+    stats["hit_rates"] = hit_rates(stats)
+    return stats
+
+
+def hit_rates(stats=None) -> dict:
+    """
+    Tasa de aciertos de cada nivel, sobre las consultas que le llegan:
+
+    - "phrase": frase exacta (resultados o errores), sobre todas las llamadas.
+    - "disk": caché en disco, sobre los fallos de "phrase" (si está activa).
+    - "normalized": DSL normalizado, sobre los fallos de los niveles anteriores.
+    - "ir": IR canónica, sobre los fallos de "normalized" que se parsean bien.
+
+    None si el nivel aún no ha recibido consultas.
+    """
+    stats = stats or cache_stats()
+
+    def rate(hits, lookups):
+        return round(hits / lookups, 4) if lookups else None
+
+    results, errors, dsl = stats["results"], stats["errors"], stats["normalized"]
+    rates = {
+        "phrase": rate(results["hits"] + errors["hits"], results["hits"] + results["misses"]),
+        "normalized": rate(dsl["hits"], dsl["hits"] + dsl["misses"]),
+        "ir": rate(stats["ir"]["hits"], stats["ir"]["hits"] + stats["ir"]["misses"]),
+    }
+    if "disk" in stats:
+        disk = stats["disk"]
+        rates["disk"] = rate(disk["hits"], disk["hits"] + disk["misses"])
+    return rates
+
+
+# ----------------------------------------------------------------------
+# CACHÉ EN DISCO
+# ----------------------------------------------------------------------
+
+# Variable de entorno con la ruta de la caché en disco: si está definida,
+# se activa al importar el módulo (útil para workers que se reinician)
+DISK_CACHE_ENV = "TRADUCTORREGEX_DISK_CACHE"
+
+DEFAULT_DISK_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "traductorregex", "translations.sqlite3"
+)
+
+# `DiskCache` activa, o None (por defecto)
+disk_cache = None
+
+
+def cache_namespace() -> str:
+    """
+    Hash de todo lo que determina la traducción de una frase: el
+    contenido de `grammar.lark`, las tablas de reglas del `Normalizer`
+    en uso, `utils.SIMPLIFIER_VERSION` y el código del normalizador, del
+    traductor y de la IR. Las entradas de la caché en disco solo se
+    sirven si coincide.
+    """
+    digest = hashlib.sha256(grammar_hash().encode())
+    tables = (
+        normalizer.mode,
+        sorted(normalizer.STOPWORDS),
+        sorted(normalizer.SYNONYMS.items()),
+        sorted(normalizer.CONNECTORS.items()),
+        sorted(normalizer_module.NUMWORDS_SIMPLE.items()),
+        sorted(normalizer_module.TENS.items()),
+        sorted(normalizer_module.SCALES.items()),
+        sorted(normalizer_module.CLASS_TERMS),
+        sorted(normalizer_module.REPEAT_VERBS),
+        SIMPLIFIER_VERSION,
+    )
+    digest.update(repr(tables).encode())
+    for module in (normalizer_module, translator_module, regex_ir):
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def configure_disk_cache(path: str | None = DEFAULT_DISK_CACHE_PATH,
+                         max_entries: int = 100000):
+    """
+    Activa la caché en disco en `path` (None la desactiva).
+
+    `translate_to_regex` la consulta tras fallar en la caché en memoria y
+    guarda en ella cada frase nueva. Devuelve la `DiskCache` activa.
+    """
+    global disk_cache
+    if disk_cache is not None:
+        disk_cache.close()
+    disk_cache = None if path is None else DiskCache(path, cache_namespace(), max_entries)
+    return disk_cache
+
+
+def warm_disk_cache(phrases, simplify: bool = True, chunk: int = 512,
+                    capture: bool = True) -> dict:
+    """
+    Traduce `phrases` y guarda en la caché en disco las que no estuvieran,
+    en transacciones de `chunk` frases. Las líneas vacías se ignoran.
+    `simplify` y `capture` son las opciones de `translate_to_regex` con
+    las que se guardan.
+
+    Retorna {"phrases", "cached", "added", "errors"}: frases leídas, ya
+    presentes, añadidas y, de estas, cuántas son errores de traducción.
+    """
+    if disk_cache is None:
+        raise RuntimeError("La caché en disco no está activa (ver configure_disk_cache)")
+    summary = {"phrases": 0, "cached": 0, "added": 0, "errors": 0}
+    pending = []
+    added = set()
+    for line in phrases:
+        phrase = line.strip()
+        if not phrase:
+            continue
+        summary["phrases"] += 1
+        if phrase in added or disk_cache.contains(phrase, simplify, capture):
+            summary["cached"] += 1
+            continue
+        normalized, regex = _translate_with_dsl(phrase, simplify, capture)
+        pending.append((phrase, simplify, normalized, regex))
+        added.add(phrase)
+        summary["added"] += 1
+        summary["errors"] += regex.startswith("ERROR")
+        if len(pending) >= chunk:
+            disk_cache.put_many(pending, capture)
+            pending = []
+    disk_cache.put_many(pending, capture)
+    disk_cache.evict()
+    return summary
+
+
+if os.environ.get(DISK_CACHE_ENV):
+    configure_disk_cache(os.environ[DISK_CACHE_ENV])
+
+
+def translate_to_regex(text: str, simplify: bool = False, capture: bool = True):
     """
     Función de alto nivel que traduce una frase de entrada a una regex.
 
+    Los resultados se memorizan en `result_cache` / `error_cache`, con
+    la frase, `simplify` y `capture` como clave, y en la caché en disco si está
+    activa (`configure_disk_cache`). Si la frase no está, tras normalizarla
+    se consulta `dsl_cache` con el DSL: una frase nueva que se normaliza a
+    un DSL conocido no vuelve a parsearse, traducirse ni simplificarse. Y
+    tras parsear, `ir_cache` con la IR canónica evita simplificar y
+    serializar otra vez una IR ya vista.
+
     Pipeline:
       1. Verifica que la gramática haya cargado correctamente.
       2. Normaliza el texto de entrada.
-      3. Parsea el texto normalizado a un AST.
-      4. Traduce el AST a regex con `RegexTranslator`.
+      3. Parsea el texto normalizado y lo traduce con `RegexTranslator`
+         a la IR en la misma pasada (`parse_to_ir`).
+      4. Opcionalmente, simplifica la IR con `optimize_regex` (las mismas
+         reglas que `simplify_regex`, sin volver a leer la regex en texto).
+      5. Sin `capture`, convierte los grupos en grupos sin captura
+         (`drop_captures`) y serializa la IR a regex.
 
     Manejo de errores:
       - Si la gramática no se cargó → devuelve un mensaje de ERROR.
       - Si el texto no coincide con el DSL → "ERROR: La frase no coincide con el DSL."
+        seguido de la parte de la frase original donde falló el parseo.
       - Para cualquier otra excepción → "ERROR interno: <detalle>"
 
     Parámetros
     ----------
     text : str
         Frase original escrita por el usuario.
+    simplify : bool
+        Si es True, simplifica además la regex generada (`optimize_regex`).
+    capture : bool
+        Si es False, todos los grupos se emiten como `(?: ... )`: reconocen
+        lo mismo, pero `re` no guarda lo capturado en cada intento.
 
     Retorna
     -------
     str
         Regex generada o un mensaje de error que empieza por "ERROR".
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     """
-    if parser is None:
-        return "ERROR: No se pudo cargar la gramática."
+    key = (text, simplify, capture)
+    regex = result_cache.get(key)
+    if regex is MISSING:
+        regex = error_cache.get(key)
+    if regex is not MISSING:
+        return regex
+
+    stored = MISSING if disk_cache is None else disk_cache.get(text, simplify, capture)
+    if stored is not MISSING:
+        normalized, regex = stored
+        if normalized is not None and not regex.startswith("ERROR"):
+            dsl_cache.put((normalized, simplify, capture), regex)
+    else:
+        normalized, regex = _translate_with_dsl(text, simplify, capture, use_cache=True)
+        if disk_cache is not None:
+            disk_cache.put(text, simplify, normalized, regex, capture)
+    if regex.startswith("ERROR"):
+        error_cache.put(key, regex)
+    else:
+        result_cache.put(key, regex)
+    return regex
+
+
+def _translate_uncached(text: str, simplify: bool, capture: bool = True):
+    """Ejecuta el pipeline completo sin consultar la caché."""
+    return _translate_with_dsl(text, simplify, capture)[1]
+
+
+def _translate_with_dsl(text: str, simplify: bool, capture: bool = True,
+                        use_cache: bool = False):
+    """
+    Como `_translate_uncached`, pero devuelve (DSL normalizado o None, regex).
+    Con `use_cache`, consulta y alimenta `dsl_cache` tras normalizar e
+    `ir_cache` tras parsear.
+    """
+    if parser is None and engine == "lark":
+        return None, "ERROR: No se pudo cargar la gramática."
+    normalized = None
     try:
-<<<<<<< HEAD
-        # 1. Normalizar entrada natural → DSL
-        normalized = normalize_text(text)
+        # 1) Normalizar (conservando posiciones de la frase original)
+        normalized, spans = normalize_with_spans(text)
+        if use_cache:
+            regex = dsl_cache.get((normalized, simplify, capture))
+            if regex is not MISSING:
+                return normalized, regex
+        # 2-3) Parsear y traducir a la IR (internada) en una sola pasada
+        node = parse_to_ir(normalized)
+        ir_key = (translator.nodes.canonical_hash(node), simplify, capture)
+        regex = ir_cache.get(ir_key) if use_cache else MISSING
+        if regex is MISSING:
+            # 4) Simplificar (opcional)
+            if simplify:
+                node = optimize_regex(node)
+            # 5) Grupos sin captura (opcional) y serializar
+            if not capture:
+                node = drop_captures(node)
+            regex = to_regex(node)
+        if use_cache:
+            ir_cache.put(ir_key, regex)
+            dsl_cache.put((normalized, simplify, capture), regex)
+        return normalized, regex
+    except (UnexpectedInput, DSLSyntaxError) as e:
+        # Lark lanza UnexpectedInput (y el motor rápido DSLSyntaxError)
+        # cuando el texto normalizado no encaja con la gramática.
+        return normalized, describe_syntax_error(text, spans, e)
+    except Exception as e:
+        # Cualquier otro error interno (bug en transformer, etc.)
+        return normalized, f"ERROR interno: {e}"
 
-        # 2. Parsear DSL
-        tree = parse_normalized(normalized)
 
-        # 3. Traducir AST → regex cruda
-        regex = translate_tree(tree)
+class TranslationResult:
+    """
+    Resultado de `translate`: la regex y su patrón compilado.
 
-        return regex
+    - `regex`: la regex generada, o None si la frase no es válida.
+    - `error`: el mensaje "ERROR..." de `translate_to_regex`, o None.
+    - `pattern`: el `re.Pattern` compartido (el mismo objeto para la misma
+      regex y flags), o None si hubo error o la regex no compila.
+    """
 
-    except UnexpectedInput:
-        return f"ERROR: La frase no coincide con el DSL."
+    __slots__ = ("phrase", "regex", "error", "pattern")
 
+    def __init__(self, phrase, regex=None, error=None, pattern=None):
+        self.phrase = phrase
+        self.regex = regex
+        self.error = error
+        self.pattern = pattern
+
+    @property
+    def valid(self) -> bool:
+        """True si hay una regex y compila."""
+        return self.pattern is not None
+
+    def fullmatch(self, text: str):
+        """`pattern.fullmatch(text)`; ValueError si no hay patrón válido."""
+        if self.pattern is None:
+            raise ValueError(self.error or "ERROR: La regex generada no es válida.")
+        return self.pattern.fullmatch(text)
+
+    def matches(self, text: str) -> bool:
+        """True si `text` coincide completamente (False si no hay patrón)."""
+        return self.pattern is not None and self.pattern.fullmatch(text) is not None
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"TranslationResult({self.phrase!r}, error={self.error!r})"
+        return f"TranslationResult({self.phrase!r}, regex={self.regex!r}, valid={self.valid})"
+
+
+def translate(text: str, simplify: bool = True, flags: int = 0,
+              capture: bool = True) -> TranslationResult:
+    """
+    Traduce `text` y compila la regex. Usa las mismas cachés que
+    `translate_to_regex` y la de patrones de `utils.compile_regex`, así
+    que repetir una frase (o llegar a la misma regex desde otra frase)
+    no vuelve a traducir ni a compilar. Con `capture=False` los grupos
+    son sin captura (ver `translate_to_regex`).
+    """
+    regex = translate_to_regex(text, simplify, capture)
+    if regex.startswith("ERROR"):
+        return TranslationResult(text, error=regex)
+    try:
+        pattern = compile_regex(regex, flags)
+    except Exception:
+        pattern = None
+    return TranslationResult(text, regex=regex, pattern=pattern)
+
+
+def translate_record(text: str, simplify: bool = True, match: str | None = None,
+                     capture: bool = True, redos: bool = False) -> dict:
+    """
+    Ejecuta el pipeline sobre `text` (sin caché) y devuelve un registro
+    con el resultado de cada fase:
+
+        {"phrase": ..., "normalized": ..., "regex": ..., "valid": bool,
+         "error": str | None,
+         "timings": {"normalize_ms", "parse_ms", "simplify_ms", "serialize_ms",
+                     "translate_ms", "validate_ms", "total_ms"}}
+
+    "parse_ms" incluye la traducción a la IR (fusionada con el parseo) y
+    "translate_ms" es la suma de parseo, simplificación y serialización.
+
+    Con `match` (una cadena), el registro incluye además "match": si
+    `match` coincide completamente con la regex (con el patrón compilado
+    de `utils.compile_regex`, el mismo que usa la validación). Con
+    `capture=False` los grupos se emiten sin captura, dentro de la fase
+    de serialización. Con `redos=True` incluye "redos": el informe de
+    `redos.analyze_redos` sobre la IR final (None si la regex no es
+    válida), calculado dentro de la fase de validación.
+
+    Nunca lanza excepciones: cualquier fallo queda en "error" (con el
+    mismo texto que devolvería `translate_to_regex`) y "regex" es None.
+    """
+    record = {
+        "phrase": text,
+        "normalized": None,
+        "regex": None,
+        "valid": False,
+        "error": None,
+        "timings": {},
+    }
+    if match is not None:
+        record["match"] = False
+    if redos:
+        record["redos"] = None
+    timings = record["timings"]
+    start = time.perf_counter()
+    spans = []
+    try:
+        if parser is None and engine == "lark":
+            record["error"] = "ERROR: No se pudo cargar la gramática."
+            return record
+        normalized, spans = normalize_with_spans(text)
+        record["normalized"] = normalized
+        normalized_at = time.perf_counter()
+        timings["normalize_ms"] = _ms(normalized_at - start)
+
+        node = parse_to_ir(normalized)
+        parsed_at = time.perf_counter()
+        timings["parse_ms"] = _ms(parsed_at - normalized_at)
+        if simplify:
+            node = optimize_regex(node)
+        simplified_at = time.perf_counter()
+        timings["simplify_ms"] = _ms(simplified_at - parsed_at)
+        if not capture:
+            node = drop_captures(node)
+        regex = to_regex(node)
+        translated_at = time.perf_counter()
+        timings["serialize_ms"] = _ms(translated_at - simplified_at)
+        timings["translate_ms"] = _ms(translated_at - normalized_at)
+
+        record["regex"] = regex
+        record["valid"] = validate_regex(regex)
+        if match is not None and record["valid"]:
+            record["match"] = compile_regex(regex).fullmatch(match) is not None
+        if redos and record["valid"]:
+            from redos import analyze_redos
+
+            record["redos"] = analyze_redos(node)
+        timings["validate_ms"] = _ms(time.perf_counter() - translated_at)
+    except (UnexpectedInput, DSLSyntaxError) as e:
+        record["error"] = describe_syntax_error(text, spans, e)
     except Exception as e:
-=======
-        # 1) Normalizar
-        normalized = normalize_text(text)
-        # 2) Parsear a AST
-        tree = parse_normalized(normalized)
-        # 3) Traducir AST a regex
-        regex = translate_tree(tree)
-        return regex
-    except UnexpectedInput:
-        # Lark lanza UnexpectedInput cuando el texto normalizado
-        # no encaja con ninguna producción de la gramática.
-        return "ERROR: La frase no coincide con el DSL."
-    except Exception as e:
-        # Cualquier otro error interno (bug en transformer, etc.)
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-        return f"ERROR interno: {e}"
+        record["error"] = f"ERROR interno: {e}"
+    finally:
+        timings["total_ms"] = _ms(time.perf_counter() - start)
+    return record
+
+
+def _ms(seconds: float) -> float:
+    """Segundos → milisegundos redondeados a microsegundos."""
+    return round(seconds * 1000, 3)
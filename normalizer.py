@@ -1,31 +1,15 @@
 import re
 
 # ===========================================================
-<<<<<<< HEAD
-#   NÚMEROS EN INGLÉS → ENTEROS (ILIMITADOS)
-# ===========================================================
-
-=======
 #   NÚMEROS EN INGLÉS → ENTEROS (SIN LÍMITE DE TAMAÑO)
 # ===========================================================
 
 # Palabras básicas de número en inglés y su valor numérico
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 NUMWORDS_SIMPLE = {
     "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4,
     "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
     "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
     "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17,
-<<<<<<< HEAD
-    "eighteen": 18, "nineteen": 19
-}
-
-TENS = {
-    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
-    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90
-}
-
-=======
     "eighteen": 18, "nineteen": 19,
 }
 
@@ -36,40 +20,16 @@ TENS = {
 }
 
 # Escalas multiplicativas (hundred, thousand, ...)
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 SCALES = {
     "hundred": 100,
     "thousand": 1000,
     "million": 1000000,
-<<<<<<< HEAD
-    "billion": 1000000000
-=======
     "billion": 1000000000,
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 }
 
 
 def words_to_number(words):
     """
-<<<<<<< HEAD
-    Convierte una lista de palabras de número en inglés a un entero.
-    Ejemplo: ["one","hundred","twenty","three"] → 123
-    """
-    current = 0
-    total = 0
-
-    for w in words:
-
-        if w in NUMWORDS_SIMPLE:
-            current += NUMWORDS_SIMPLE[w]
-
-        elif w in TENS:
-            current += TENS[w]
-
-        elif w in SCALES:
-            if current == 0:
-                # Evitar "hundred" sin prefijo ("hundred" → 100)
-=======
     Convierte una secuencia de palabras de número en inglés a un entero.
 
     Parameters
@@ -100,19 +60,10 @@ def words_to_number(words):
             # Si aparece una escala sin parte previa (p. ej. "hundred"),
             # se interpreta como 1 * escala (100, 1000, etc.).
             if current == 0:
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
                 current = 1
             current *= SCALES[w]
             total += current
             current = 0
-<<<<<<< HEAD
-
-        elif w == "and":
-            continue
-
-        else:
-            return None  # palabra no numérica → abortar
-=======
             seen_numeric = True
 
         elif w == "and":
@@ -127,23 +78,12 @@ def words_to_number(words):
     # Si no se reconoció ninguna palabra como número, se considera fallo.
     if not seen_numeric:
         return None
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 
     return total + current
 
 
 def convert_numwords(text):
     """
-<<<<<<< HEAD
-    Busca secuencias numéricas en inglés y las reemplaza por enteros.
-    Ejemplo: "one hundred twenty three times" → "123 times"
-    """
-    tokens = text.split()
-    result = []
-    buffer = []
-
-    def flush_buffer():
-=======
     Reemplaza secuencias de palabras numéricas en inglés por su valor entero.
 
     Ejemplo:
@@ -169,7 +109,6 @@ def convert_numwords(text):
         Convierte el contenido del buffer a número (si es posible).
         Si la secuencia no es puramente numérica, se devuelve tal cual.
         """
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         if not buffer:
             return None
         number = words_to_number(buffer)
@@ -179,39 +118,24 @@ def convert_numwords(text):
     while i < len(tokens):
         w = tokens[i]
 
-<<<<<<< HEAD
-        # ¿Es parte de un número?
-        if w in NUMWORDS_SIMPLE or w in TENS or w in SCALES or w == "and":
-            buffer.append(w)
-        else:
-=======
         # Identificar si el token pertenece a un bloque numérico
         if w in NUMWORDS_SIMPLE or w in TENS or w in SCALES or w == "and":
             buffer.append(w)
         else:
             # Si veníamos acumulando un número, lo volcamos al resultado
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
             if buffer:
                 result.append(flush_buffer())
                 buffer = []
             result.append(w)
         i += 1
 
-<<<<<<< HEAD
-    # vaciar buffer final
-=======
     # Procesar cualquier resto numérico al final del texto
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     if buffer:
         result.append(flush_buffer())
 
     return " ".join(result)
 
 
-<<<<<<< HEAD
-# ===========================================================
-#   NORMALIZADOR PRINCIPAL
-=======
 def lowercase_outside_quotes(text: str) -> str:
     """
     Convierte a minúsculas solo la parte del texto que está fuera de comillas.
@@ -243,41 +167,196 @@ def lowercase_outside_quotes(text: str) -> str:
     return "".join(result)
 
 
+# ===========================================================
+#   EXPANSIÓN DE SINÓNIMOS EN UNA SOLA PASADA
+# ===========================================================
+
+def _trie_pattern(node: dict) -> str:
+    """
+    Serializa un trie de caracteres como regex con prefijos factorizados.
+
+    Un nodo terminal con hijos se vuelve opcional (`(?:...)?`); al ser el
+    cuantificador voraz, siempre se prueba primero la frase más larga.
+    """
+    branches = [
+        re.escape(ch) + _trie_pattern(child)
+        for ch, child in sorted(node.items())
+        if ch
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+    body = "(?:" + "|".join(branches) + ")"
+    return body + "?" if "" in node else body
+
+
+class PhraseExpander:
+    """
+    Reemplaza frases completas (sinónimos, conectores) en una sola pasada
+    de izquierda a derecha.
+
+    Las claves se insertan en un trie que se compila una única vez en un
+    solo patrón de `re`, de modo que el coste de `expand` depende de la
+    longitud del texto y no del número de reglas.
+
+    Semántica:
+      - Coincidencia más a la izquierda y, entre ellas, la más larga
+        ("hex digits" gana a "digits").
+      - Solo se aceptan coincidencias delimitadas por fronteras de palabra
+        ("digits" no coincide dentro de "hexdigits").
+      - El texto entre comillas se copia sin cambios.
+    """
+
+    def __init__(self, replacements):
+        """
+        Parameters
+        ----------
+        replacements : dict[str, str]
+            Mapa frase → reemplazo. Las claves no deben contener comillas.
+        """
+        self.replacements = dict(replacements)
+
+        trie = {}
+        for src in self.replacements:
+            node = trie
+            for ch in src:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        # Los literales entre comillas se consumen primero para no tocarlos
+        self.pattern = re.compile(
+            r"""'[^']*(?:'|$)|"[^"]*(?:"|$)|\b(?:"""
+            + _trie_pattern(trie)
+            + r")\b"
+        )
+
+    def _replace(self, match: re.Match) -> str:
+        found = match.group(0)
+        return self.replacements.get(found, found)
+
+    def expand(self, text: str) -> str:
+        """Devuelve `text` con todas las frases conocidas reemplazadas."""
+        return self.pattern.sub(self._replace, text)
+
+
+# ===========================================================
+#   TOKENIZACIÓN CON POSICIONES (MODO "tokens")
+# ===========================================================
+
+# Una palabra es una secuencia sin espacios; un literal entre comillas
+# (aunque contenga espacios o no esté cerrado) forma parte de la palabra.
+_TOKEN_RE = re.compile(r"""(?:[^\s'"]+|'[^']*(?:'|$)|"[^"]*(?:"|$))+""")
+
+# Clases del DSL que admiten las reescrituras estructurales
+CLASS_TERMS = {
+    ("digit",), ("letter",), ("lowercase", "letter"), ("uppercase", "letter"),
+    ("any", "character"), ("space",), ("vowel",), ("consonant",),
+    ("alphanumeric",), ("word", "character"), ("whitespace",),
+    ("non", "whitespace"), ("hex", "digit"),
+}
+
+# Verbos que expresan repetición ("that appear", "repeated", ...)
+REPEAT_VERBS = {"appear", "appeared", "repeat", "repeated"}
+
+ONE_OR_MORE = ("one", "or", "more")
+
+# "0 or more" / "1 or more" escritos con dígitos → cuantificador del DSL
+DIGIT_QUANTIFIERS = {"0": "zero", "1": "one"}
+
+
+def tokenize(text: str):
+    """
+    Divide `text` en palabras conservando su posición en la frase original.
+
+    Returns
+    -------
+    list[tuple[str, int, int]]
+        Tuplas (palabra, inicio, fin). Las palabras ya vienen en minúsculas
+        salvo el contenido entre comillas.
+    """
+    tokens = []
+    for m in _TOKEN_RE.finditer(text):
+        word = m.group(0)
+        if "'" in word or '"' in word:
+            word = lowercase_outside_quotes(word)
+        else:
+            word = word.lower()
+        tokens.append((word, m.start(), m.end()))
+    return tokens
+
+
+def _word_table(replacements):
+    """
+    Agrupa un mapa frase → reemplazo por primera palabra, con las frases
+    más largas primero, para expandir sobre listas de tokens.
+    """
+    table = {}
+    for src, tgt in replacements.items():
+        key = tuple(src.split())
+        table.setdefault(key[0], []).append((key, tuple(tgt.split())))
+    for entries in table.values():
+        entries.sort(key=lambda e: -len(e[0]))
+    return table
+
+
+def _class_length(words, i: int) -> int:
+    """
+    Longitud (en palabras) de la clase del DSL que empieza en `words[i]`,
+    o 0 si no hay ninguna.
+    """
+    if tuple(words[i:i + 2]) in CLASS_TERMS:
+        return 2
+    if tuple(words[i:i + 1]) in CLASS_TERMS:
+        return 1
+    return 0
+
+
+def _ends_with_class(words) -> bool:
+    """Indica si la lista de palabras termina en una clase del DSL."""
+    return tuple(words[-2:]) in CLASS_TERMS or tuple(words[-1:]) in CLASS_TERMS
+
+
+def _count_length(words, i: int) -> int:
+    """
+    Longitud del contador que empieza en `words[i]` ("N times" o
+    "between N and M times"), o 0 si no hay ninguno.
+    """
+    if i + 1 < len(words) and words[i].isdigit() and words[i + 1] == "times":
+        return 2
+    if (
+        i + 4 < len(words)
+        and words[i] == "between"
+        and words[i + 1].isdigit()
+        and words[i + 2] == "and"
+        and words[i + 3].isdigit()
+        and words[i + 4] == "times"
+    ):
+        return 5
+    return 0
+
+
 # ===========================================================
 #   NORMALIZADOR PRINCIPAL (PSEUDOLENGUAJE → DSL)
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 # ===========================================================
 
 class Normalizer:
     """
-<<<<<<< HEAD
-    NLP-lite estructural final — completamente compatible
-    con grammar.lark y translator.py
-=======
     Encapsula todas las transformaciones de texto:
     - Limpieza de palabras irrelevantes.
     - Expansión de sinónimos.
     - Normalización de conectores y frases de repetición.
     - Conversión de números en inglés a dígitos.
     - Reescrituras estructurales para ajustarse a `grammar.lark`.
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     """
 
     # Palabras frecuentes que no aportan estructura al DSL
     STOPWORDS = {
-<<<<<<< HEAD
-        "the","a","an","this","that","which","who","whom",
-        "pattern","sequence","find","match","should","be",
-        "like","consisting","made","up","into","of",
-        "string","strings","regex","regular","expression","expressions",
-        "please"
-=======
         "the", "a", "an", "this", "that", "which", "who", "whom",
         "pattern", "sequence", "find", "match", "should", "be",
         "like", "consisting", "made", "up", "into", "of",
         "string", "strings", "regex", "regular", "expression", "expressions",
         "please",
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     }
 
     # Frases equivalentes a combinaciones ya soportadas en el DSL
@@ -288,21 +367,6 @@ class Normalizer:
         "letters": "letter one or more",
         "characters": "any character one or more",
 
-<<<<<<< HEAD
-        # mayúsculas/minúsculas
-        "lowercase letters": "lowercase letter one or more",
-        "uppercase letters": "uppercase letter one or more",
-
-        # espacios
-        "spaces": "space one or more",
-        "space characters": "space one or more",
-
-        # whitespace explícito
-        "whitespace": "whitespace one or more",
-        "whitespaces": "whitespace one or more",
-
-        # nuevas clases semánticas
-=======
         "lowercase letters": "lowercase letter one or more",
         "uppercase letters": "uppercase letter one or more",
 
@@ -312,7 +376,6 @@ class Normalizer:
         "whitespace": "whitespace",
         "whitespaces": "whitespace one or more",
 
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         "vowels": "vowel one or more",
         "consonants": "consonant one or more",
 
@@ -321,29 +384,63 @@ class Normalizer:
 
         "non whitespaces": "non whitespace one or more",
 
-<<<<<<< HEAD
-        # word characters
-=======
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         "word characters": "word character one or more",
         "non whitespace characters": "non whitespace one or more",
     }
 
+    # Conectores y contadores verbales que se reescriben junto a los sinónimos
+    CONNECTORS = {
+        "once": "1 times",
+        "twice": "2 times",
+        "thrice": "3 times",
+        "then": "followed by",
+        "next": "followed by",
+        "optionally": "optional",
+    }
+
+    # Expansor compartido por todas las instancias (se construye al cargar la clase)
+    EXPANDER = PhraseExpander({**SYNONYMS, **CONNECTORS})
+
+    # Misma tabla indexada por palabras, para el modo "tokens"
+    WORD_EXPANSIONS = _word_table({**SYNONYMS, **CONNECTORS})
+
+    MODES = ("text", "tokens")
+
+    def __init__(self, mode: str = "text"):
+        """
+        Parameters
+        ----------
+        mode : str
+            "text" reescribe la cadena completa paso a paso (modo clásico);
+            "tokens" tokeniza una sola vez y aplica las mismas reglas sobre
+            la lista de palabras (ver `normalize_with_spans`).
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de normalización desconocido: {mode}")
+        self.mode = mode
+
     def normalize(self, text):
+        """
+        Normaliza la frase según el modo configurado y devuelve el DSL.
+        """
+        if self.mode == "tokens":
+            return self.normalize_with_spans(text)[0]
+        return self.normalize_text(text)
+
+    def normalize_text(self, text):
         """
         Aplica la cadena completa de normalización sobre la frase de entrada.
 
         Orden aproximado de pasos:
           1. Minúsculas fuera de comillas.
           2. Eliminación de stopwords.
-          3. Manejo de "once"/"twice"/"thrice".
-          4. Expansión de sinónimos.
-          5. Normalización de conectores y opcionales.
-          6. Reglas de repetición verbal.
-          7. Conversión de números en inglés a dígitos.
-          8. Ajustes específicos para expresiones como "zero or more".
-          9. Reescrituras estructurales para las construcciones del DSL.
-         10. Limpieza final de espacios.
+          3. Expansión de sinónimos, conectores y "once"/"twice"/"thrice"
+             en una sola pasada (ver `PhraseExpander`).
+          4. Reglas de repetición verbal.
+          5. Conversión de números en inglés a dígitos.
+          6. Ajustes específicos para expresiones como "zero or more".
+          7. Reescrituras estructurales para las construcciones del DSL.
+          8. Limpieza final de espacios.
         """
         # Mantener literales y rangos exactamente como se escriben
         text = lowercase_outside_quotes(text)
@@ -352,34 +449,9 @@ class Normalizer:
         words = [w for w in text.split() if w not in self.STOPWORDS]
         text = " ".join(words)
 
-<<<<<<< HEAD
-        # ---------------- ONCE / TWICE / THRICE ----------------
-=======
-        # Normalización de "once", "twice", "thrice" a contadores explícitos
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-        text = re.sub(r"\bonce\b", "1 times", text)
-        text = re.sub(r"\btwice\b", "2 times", text)
-        text = re.sub(r"\bthrice\b", "3 times", text)
-
-<<<<<<< HEAD
-        # ---------------- SYNONYMS -----------------
-        # (orden de inserción respeta claves más largas primero donde aplica)
-        for src, tgt in self.SYNONYMS.items():
-            text = text.replace(src, tgt)
-
-        # ---------------- CONNECTORS ----------------
-=======
-        # Expansión de sinónimos según el diccionario anterior
-        for src, tgt in self.SYNONYMS.items():
-            text = text.replace(src, tgt)
-
-        # Unificación de conectores que implican secuencia
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-        text = text.replace(" then ", " followed by ")
-        text = text.replace(" next ", " followed by ")
-
-        # Manejo de frases opcionales básicas
-        text = text.replace(" optionally ", " optional ")
+        # Sinónimos, conectores ("then", "next", "optionally") y
+        # contadores ("once", "twice", "thrice") en una sola pasada
+        text = self.EXPANDER.expand(text)
 
         # Frases verbales que implican repetición
         text = re.sub(r"appear (\d+) times", r"\1 times", text)
@@ -387,12 +459,6 @@ class Normalizer:
         text = re.sub(r"appear(ed)?", "one or more", text)
         text = re.sub(r"repeat(ed)?", "one or more", text)
 
-<<<<<<< HEAD
-        # ---------------- NÚMEROS EN INGLÉS → ENTEROS --------------
-        text = convert_numwords(text)
-
-        # ---------------- SANITY CLEANUP ---------------------------
-=======
         # Conversión de palabras de número a dígitos
         text = convert_numwords(text)
 
@@ -400,7 +466,6 @@ class Normalizer:
         text = re.sub(r"\b0 or more\b", "zero or more", text)
 
         # Corrección de variantes como "1 or more" → "one or more"
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         text = text.replace("1 or more", "one or more")
 
         # Normalización de la forma "between X and Y times"
@@ -410,34 +475,6 @@ class Normalizer:
             text,
         )
 
-<<<<<<< HEAD
-        # ----------- FIXES ESTRUCTURALES ---------------------------
-        # Lista de tokens de clase soportados
-        cls = r"(digit|letter|lowercase letter|uppercase letter|any character|space|vowel|consonant|alphanumeric|word character|whitespace|non whitespace|hex digit)"
-
-        #  FIX 1 — "3 digit one or more" → "digit 3 times"
-        text = re.sub(
-            rf"\b(\d+)\s+{cls}\s+one or more\b",
-            r"\2 \1 times",
-            text
-        )
-
-        #  FIX 2 — "digit one or more N times" → "digit N times"
-        text = re.sub(
-            rf"{cls} one or more (\d+) times",
-            r"\1 \2 times",
-            text
-        )
-
-        #  FIX 3 — "digit one or more between X and Y times"
-        text = re.sub(
-            rf"{cls} one or more between (\d+) and (\d+) times",
-            r"\1 between \2 and \3 times",
-            text
-        )
-
-        #  FIX 4 — redundancia de "one or more"
-=======
         # Patrón de clases soportadas por el DSL (para reescrituras posteriores)
         cls = (
             r"(digit|letter|lowercase letter|uppercase letter|any character|"
@@ -446,20 +483,13 @@ class Normalizer:
         )
 
         # Evitar duplicidad de "one or more one or more"
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         text = text.replace("one or more one or more", "one or more")
 
         # "3 digit one or more" → "digit 3 times"
         text = re.sub(
-<<<<<<< HEAD
-            rf"{cls} one or more twice",
-            r"\1 2 times",
-            text
-=======
             rf"\b(\d+)\s+{cls}\s+one or more\b",
             r"\2 \1 times",
             text,
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         )
 
         # "digit one or more N times" → "digit N times"
@@ -493,16 +523,6 @@ class Normalizer:
             text,
         )
 
-<<<<<<< HEAD
-        #  FIX 8 — "X one or more between A and B times" → "X between A and B times"
-        text = re.sub(
-            rf"{cls} one or more between (\d+) and (\d+) times",
-            r"\1 between \2 and \3 times",
-            text
-        )
-
-        # ---------------- LIMPIEZA FINAL ---------------------------
-=======
         # "group ... end group one or more N times" → "group ... end group N times"
         text = re.sub(
             r"(group .*? end group) one or more (\d+) times",
@@ -511,7 +531,163 @@ class Normalizer:
         )
 
         # Limpieza final de espacios repetidos y bordes
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         text = re.sub(r"\s+", " ", text).strip()
 
         return text
+
+    def normalize_with_spans(self, text):
+        """
+        Variante de `normalize_text` que tokeniza la frase una sola vez y
+        aplica las reglas como operaciones sobre la lista de palabras.
+
+        Pasos:
+          1. Tokenización con posiciones (minúsculas fuera de comillas).
+          2. Eliminación de stopwords.
+          3. Expansión de sinónimos y conectores (frase más larga primero).
+          4. Conversión de números en inglés a dígitos, y "0 or more" /
+             "1 or more" → "zero or more" / "one or more".
+          5. Verbos de repetición ("appear 3 times" → "3 times",
+             "repeated" → "one or more").
+          6. Reescrituras estructurales ("3 digit one or more",
+             "digit one or more 3 times", "end group one or more 3 times", ...).
+
+        Returns
+        -------
+        tuple[str, list[tuple[int, int, int, int]]]
+            El DSL normalizado y su mapa de posiciones: una tupla
+            (inicio_dsl, fin_dsl, inicio_original, fin_original) por palabra.
+        """
+        # 1-2) Tokenización y stopwords
+        tokens = [t for t in tokenize(text) if t[0] not in self.STOPWORDS]
+
+        # 3) Sinónimos y conectores
+        expansions = self.WORD_EXPANSIONS
+        expanded = []
+        i = 0
+        while i < len(tokens):
+            for key, repl in expansions.get(tokens[i][0], ()):
+                end = i + len(key)
+                if tuple(t[0] for t in tokens[i:end]) == key:
+                    start_pos, end_pos = tokens[i][1], tokens[end - 1][2]
+                    expanded.extend((w, start_pos, end_pos) for w in repl)
+                    i = end
+                    break
+            else:
+                expanded.append(tokens[i])
+                i += 1
+
+        # 4) Números en inglés → dígitos
+        tokens = []
+        buffer = []
+
+        def flush():
+            number = words_to_number([t[0] for t in buffer])
+            if number is None:
+                tokens.extend(buffer)
+            else:
+                tokens.append((str(number), buffer[0][1], buffer[-1][2]))
+            buffer.clear()
+
+        for j, tok in enumerate(expanded):
+            w = tok[0]
+            # "and" solo continúa un número tras una escala ("one hundred and five");
+            # "one or more" / "zero or more" no son números
+            if (
+                w in NUMWORDS_SIMPLE or w in TENS or w in SCALES
+                or (w == "and" and buffer and buffer[-1][0] in SCALES)
+            ) and tuple(t[0] for t in expanded[j + 1:j + 3]) != ("or", "more"):
+                buffer.append(tok)
+                continue
+            if buffer:
+                flush()
+            tokens.append(tok)
+        if buffer:
+            flush()
+
+        # "0 or more" → "zero or more"; "1 or more" → "one or more"
+        for j, tok in enumerate(tokens):
+            if tok[0] in DIGIT_QUANTIFIERS and tuple(t[0] for t in tokens[j + 1:j + 3]) == ("or", "more"):
+                tokens[j] = (DIGIT_QUANTIFIERS[tok[0]],) + tok[1:]
+
+        words = [t[0] for t in tokens]
+
+        # 5-6) Verbos de repetición y reescrituras estructurales
+        out = []
+
+        def emit_one_or_more(src_start, src_end):
+            # "one or more one or more" → "one or more";
+            # "except digit one or more" → "except digit"
+            if tuple(t[0] for t in out[-3:]) == ONE_OR_MORE:
+                return
+            if [t[0] for t in out[-2:]] == ["except", "digit"]:
+                return
+            out.extend((r, src_start, src_end) for r in ONE_OR_MORE)
+
+        i = 0
+        while i < len(tokens):
+            w = words[i]
+
+            if w in REPEAT_VERBS:
+                # "appear 3 times" → "3 times"; "repeated" → "one or more"
+                if not _count_length(words, i + 1):
+                    emit_one_or_more(tokens[i][1], tokens[i][2])
+                i += 1
+                continue
+
+            if tuple(words[i:i + 3]) == ONE_OR_MORE:
+                emit_one_or_more(tokens[i][1], tokens[i + 2][2])
+                i += 3
+                continue
+
+            if _count_length(words, i) and tuple(t[0] for t in out[-3:]) == ONE_OR_MORE:
+                # "X one or more N times" → "X N times" (X clase o "end group")
+                prev = [t[0] for t in out[-5:-3]]
+                if _ends_with_class(prev) or prev == ["end", "group"]:
+                    del out[-3:]
+
+            if w.isdigit():
+                # "3 digit one or more" → "digit 3 times"
+                n = _class_length(words, i + 1)
+                if n and tuple(words[i + 1 + n:i + 4 + n]) == ONE_OR_MORE:
+                    out.extend(tokens[i + 1:i + 1 + n])
+                    out.append(tokens[i])
+                    out.append(("times",) + tokens[i][1:])
+                    i += n + 4
+                    continue
+
+            out.append(tokens[i])
+            i += 1
+
+        # Emisión del DSL y del mapa de posiciones
+        spans = []
+        pos = 0
+        for w, src_start, src_end in out:
+            spans.append((pos, pos + len(w), src_start, src_end))
+            pos += len(w) + 1
+        return " ".join(t[0] for t in out), spans
+
+
+def source_span(spans, dsl_pos: int):
+    """
+    Traduce una posición del DSL normalizado a la porción de la frase
+    original de la que proviene.
+
+    Parameters
+    ----------
+    spans : list[tuple[int, int, int, int]]
+        Mapa devuelto por `Normalizer.normalize_with_spans`.
+    dsl_pos : int
+        Posición en el DSL; si es negativa o está fuera del texto se usa
+        la última palabra.
+
+    Returns
+    -------
+    tuple[int, int] | None
+        (inicio, fin) en la frase original, o None si el mapa está vacío.
+    """
+    if not spans:
+        return None
+    for dsl_start, dsl_end, src_start, src_end in spans:
+        if dsl_pos < dsl_end:
+            return src_start, src_end
+    return spans[-1][2], spans[-1][3]
@@ -0,0 +1,382 @@
+"""
+Módulo `phrase_generator.py`
+
+Generador aleatorio de frases para fuzzing y pruebas de carga.
+
+El vocabulario sale de la propia gramática (las reglas ya cargadas de
+`grammar.lark`: términos base, cuantificadores, rangos, grupos y
+conectores) y de las tablas del `Normalizer` (sinónimos, conectores,
+palabras vacías y números en inglés), así que un término nuevo en la
+gramática aparece sin tocar este módulo. La estructura se controla con:
+
+- `max_elements`: elementos por secuencia ("followed by").
+- `max_depth`: anidamiento máximo de "group ... end group".
+- `or_fanout`: alternativas máximas de un "or".
+- `quantifier_mix`: peso de cada cuantificador (`r_exact`, `r_range`...).
+- `natural`: probabilidad de usar formas naturales (sinónimos, "then",
+  números en palabras, palabras vacías) en lugar del DSL canónico.
+- `near_valid`: probabilidad de estropear la frase (quitar, duplicar o
+  intercambiar palabras...) para obtener casi-válidas.
+
+Con la misma semilla se genera siempre la misma secuencia. Uso:
+
+    python phrase_generator.py -n 100000 --seed 1 > frases.txt
+    python cli.py --batch frases.txt > regex.jsonl
+"""
+
+import argparse
+import random
+import sys
+
+from lark.lexer import PatternStr
+
+import lark_parser
+from normalizer import Normalizer, NUMWORDS_SIMPLE, TENS, SCALES
+
+# Marcadores de los terminales variables de la gramática
+INT = "INT"
+CHAR = "CHAR_LITERAL"
+STRING = "STRING_LITERAL"
+
+# Caracteres de los literales generados (sin comillas ni espacios)
+LITERAL_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789"
+LITERAL_ALPHABET_SORTED = "".join(sorted(LITERAL_ALPHABET))
+
+
+class GrammarTables:
+    """
+    Vocabulario del DSL extraído de las reglas compiladas por Lark.
+
+    Cada plantilla es una lista de textos fijos y marcadores (`INT`,
+    `CHAR`, `STRING`) para los terminales que el generador rellena.
+    """
+
+    def __init__(self, lark):
+        patterns = {t.name: t.pattern for t in lark.terminals}
+        rules = {}
+        for rule in lark.rules:
+            rules.setdefault(rule.origin.name, []).append(
+                (rule.alias, [self._symbol(s.name, patterns) for s in rule.expansion])
+            )
+
+        def template(origin, alias):
+            return next(exp for a, exp in rules[origin] if a == alias)
+
+        # Términos base: palabras clave de una sola pieza y literales
+        self.base_terms = [exp[0] for alias, exp in rules["base_term"]
+                           if len(exp) == 1 and exp[0] not in (CHAR, STRING)]
+        self.literals = [exp[0] for alias, exp in rules["base_term"]
+                         if len(exp) == 1 and exp[0] in (CHAR, STRING)]
+        self.repetitions = {alias: exp for alias, exp in rules["repetition"]}
+        self.range = template("term", "t_range")
+        if self.range == ["range_expr"]:
+            self.range = rules["range_expr"][0][1]
+        self.except_keyword = template("term", "t_except")[1]
+        # "A or B or C": Lark expande ("or" sequence)+ en una regla auxiliar
+        plus = next(exp for name, alts in rules.items() if name.startswith("__expr")
+                    for _, exp in alts if len(exp) == 2)
+        self.or_keyword = plus[0]
+        group = max((exp for _, exp in rules["group"]), key=len)
+        self.group_open, self.group_close = group[0], group[2]
+        star = next(exp for name, alts in rules.items() if name.startswith("__sequence")
+                    for _, exp in alts if len(exp) == 2)
+        self.sequence_keyword = star[0]
+
+    @staticmethod
+    def _symbol(name, patterns):
+        """Texto fijo de un terminal, su marcador si es variable, o la regla."""
+        pattern = patterns.get(name)
+        if pattern is None:
+            return name
+        if isinstance(pattern, PatternStr):
+            return pattern.value
+        return name
+
+
+def number_to_words(n: int) -> str:
+    """Número en inglés que entiende `normalizer.words_to_number` (0 ≤ n < 10⁹)."""
+    if n < 20:
+        return _SIMPLE_WORDS[n]
+    if n < 100:
+        tens, rest = divmod(n, 10)
+        return _TENS_WORDS[tens * 10] + (f" {_SIMPLE_WORDS[rest]}" if rest else "")
+    for scale in (1000000, 1000, 100):
+        if n >= scale:
+            high, rest = divmod(n, scale)
+            words = f"{number_to_words(high)} {_SCALE_WORDS[scale]}"
+            return words + (f" {number_to_words(rest)}" if rest else "")
+    raise ValueError(n)
+
+
+_SIMPLE_WORDS = {v: k for k, v in NUMWORDS_SIMPLE.items()}
+_TENS_WORDS = {v: k for k, v in TENS.items()}
+_SCALE_WORDS = {v: k for k, v in SCALES.items()}
+
+
+def _inverse(table):
+    """{forma DSL: [formas naturales]} de una tabla natural → DSL."""
+    inverse = {}
+    for natural, dsl in table.items():
+        if natural != dsl:
+            inverse.setdefault(dsl, []).append(natural)
+    return inverse
+
+
+class PhraseGenerator:
+    """
+    Genera frases aleatorias válidas (y casi-válidas) para el traductor.
+
+    Parameters
+    ----------
+    seed : int | None
+        Semilla; con la misma semilla y parámetros la secuencia se repite.
+    max_elements : int
+        Elementos máximos de cada secuencia.
+    max_depth : int
+        Anidamiento máximo de grupos (0 = sin grupos).
+    or_fanout : int
+        Alternativas máximas de un "or" (1 = sin "or").
+    group_probability, or_probability : float
+        Probabilidad de que un elemento sea un grupo / de que la frase
+        tenga alternativas.
+    quantifier_probability : float
+        Probabilidad de que un término lleve cuantificador detrás (delante,
+        una décima parte de esa).
+    quantifier_mix : dict | None
+        Peso de cada cuantificador por su alias en la gramática
+        (`r_exact`, `r_range`, `r_one_or_more`...); por defecto, iguales.
+    stacked_quantifiers : bool
+        Permite cuantificador delante y detrás del mismo término ("at least
+        2 times digit at most 4 times"). La gramática lo acepta, pero la
+        regex resultante (`[0-9]{2,}{0,4}`) no compila; útil para fuzzing.
+    max_count : int
+        Mayor número usado en "N times", "between N and M"...
+    natural : float
+        Probabilidad de cada sustitución por una forma natural.
+    near_valid : float
+        Probabilidad de que la frase se estropee con `mutate`.
+    """
+
+    def __init__(self, seed=None, max_elements: int = 4, max_depth: int = 2,
+                 or_fanout: int = 3, group_probability: float = 0.2,
+                 or_probability: float = 0.2, quantifier_probability: float = 0.6,
+                 quantifier_mix=None, stacked_quantifiers: bool = False,
+                 max_count: int = 12, natural: float = 0.5,
+                 near_valid: float = 0.0, tables: GrammarTables | None = None):
+        if lark_parser.parser is None and tables is None:
+            raise RuntimeError("ERROR: No se pudo cargar grammar.lark")
+        self.tables = tables or GrammarTables(lark_parser.parser)
+        self.rng = random.Random(seed)
+        self.max_elements = max_elements
+        self.max_depth = max_depth
+        self.or_fanout = or_fanout
+        self.group_probability = group_probability
+        self.or_probability = or_probability
+        self.quantifier_probability = quantifier_probability
+        self.stacked_quantifiers = stacked_quantifiers
+        self.max_count = max_count
+        self.natural = natural
+        self.near_valid = near_valid
+
+        mix = quantifier_mix or dict.fromkeys(self.tables.repetitions, 1)
+        unknown = set(mix) - set(self.tables.repetitions)
+        if unknown:
+            raise ValueError(f"Cuantificadores desconocidos: {', '.join(sorted(unknown))}")
+        self._quantifiers = [self.tables.repetitions[a] for a in mix]
+        self._weights = list(mix.values())
+
+        self._synonyms = _inverse(Normalizer.SYNONYMS)
+        self._connectors = _inverse(Normalizer.CONNECTORS)
+        self._stopwords = sorted(Normalizer.STOPWORDS)
+
+    # ------------------------------------------------------------------
+    #  API
+    # ------------------------------------------------------------------
+
+    def phrase(self) -> str:
+        """Una frase (natural o canónica según `natural`; casi-válida según `near_valid`)."""
+        words = self._expr()
+        if self.near_valid and self.rng.random() < self.near_valid:
+            return self.mutate(" ".join(words))
+        return " ".join(words)
+
+    def phrases(self, n: int):
+        """Genera `n` frases."""
+        phrase = self.phrase
+        for _ in range(n):
+            yield phrase()
+
+    def mutate(self, phrase: str) -> str:
+        """
+        Estropea `phrase` con una edición pequeña: quitar, duplicar o
+        intercambiar palabras, pegar dos palabras o cortar la frase. El
+        resultado suele ser inválido, pero no siempre.
+        """
+        rng = self.rng
+        words = phrase.split()
+        i = rng.randrange(len(words))
+        op = rng.randrange(5)
+        if op == 0 and len(words) > 1:
+            del words[i]
+        elif op == 1:
+            words.insert(i, words[i])
+        elif op == 2 and len(words) > 1:
+            j = min(i + 1, len(words) - 1)
+            words[i - (i == j)], words[j] = words[j], words[i - (i == j)]
+        elif op == 3 and i + 1 < len(words):
+            words[i:i + 2] = [words[i] + words[i + 1]]
+        else:
+            words = words[:max(1, i)]
+        return " ".join(words)
+
+    # ------------------------------------------------------------------
+    #  REGLAS (misma estructura que grammar.lark)
+    # ------------------------------------------------------------------
+
+    def _expr(self):
+        rng = self.rng
+        words = self._sequence(0)
+        if self.or_fanout > 1 and rng.random() < self.or_probability:
+            for _ in range(rng.randint(1, self.or_fanout - 1)):
+                words.append(self.tables.or_keyword)
+                words.extend(self._sequence(0))
+        if self.natural and rng.random() < self.natural / 4:
+            words.insert(0, rng.choice(self._stopwords))
+        return words
+
+    def _sequence(self, depth):
+        rng = self.rng
+        words = self._element(depth)
+        for _ in range(rng.randint(1, self.max_elements) - 1):
+            words.append(self._natural_form(self.tables.sequence_keyword))
+            words.extend(self._element(depth))
+        return words
+
+    def _element(self, depth):
+        if depth < self.max_depth and self.rng.random() < self.group_probability:
+            words = [self.tables.group_open]
+            words.extend(self._sequence(depth + 1))
+            words.append(self.tables.group_close)
+            if self.rng.random() < self.quantifier_probability:
+                words.extend(self._repetition())
+            return words
+        return self._repeated_term()
+
+    def _repeated_term(self):
+        rng = self.rng
+        words = []
+        before = rng.random() < self.quantifier_probability / 10
+        if before:
+            words.extend(self._repetition())
+        term = self._term()
+        after = None
+        if (self.stacked_quantifiers or not before) and rng.random() < self.quantifier_probability:
+            after = self._repetition()
+        # "digit one or more" → "digits" (sinónimo del Normalizer)
+        if after is not None and len(term) == 1 and self.natural:
+            plural = self._synonyms.get(f"{term[0]} {' '.join(after)}")
+            if plural and rng.random() < self.natural:
+                words.append(rng.choice(plural))
+                return words
+        words.extend(term)
+        if after is not None:
+            words.extend(after)
+        return words
+
+    def _term(self):
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.08:
+            return [self._base_term(), self.tables.except_keyword, self._base_term()]
+        if roll < 0.16:
+            return self._fill(self.tables.range)
+        return [self._base_term()]
+
+    def _base_term(self):
+        rng = self.rng
+        if self.tables.literals and rng.random() < 0.15:
+            return self._literal(rng.choice(self.tables.literals))
+        return rng.choice(self.tables.base_terms)
+
+    def _repetition(self):
+        template = self.rng.choices(self._quantifiers, self._weights)[0]
+        words = self._fill(template)
+        if not self.natural:
+            return words
+        # "2 times" → "twice" antes de pasar los números a palabras
+        whole = self._natural_form(" ".join(words))
+        if whole not in words and " " not in whole:
+            return [whole]
+        return [self._natural_form(self._number_word(w)) for w in words]
+
+    def _fill(self, template):
+        """
+        Rellena los marcadores de una plantilla. Los INT y los CHAR van en
+        orden creciente, para que "between N and M" y "range 'a' to 'z'"
+        den regex válidas.
+        """
+        rng = self.rng
+        words = []
+        low = 0
+        low_char = 0
+        for piece in template:
+            if piece == INT:
+                low = rng.randint(low, self.max_count)
+                words.append(str(low))
+            elif piece == CHAR:
+                low_char = rng.randrange(low_char, len(LITERAL_ALPHABET_SORTED))
+                words.append(f"'{LITERAL_ALPHABET_SORTED[low_char]}'")
+            elif piece == STRING:
+                words.append(self._literal(piece))
+            else:
+                words.append(piece)
+        return words
+
+    def _number_word(self, word: str) -> str:
+        """Un número en cifras → en palabras, con probabilidad `natural`."""
+        if word.isdigit() and self.rng.random() < self.natural:
+            return number_to_words(int(word))
+        return word
+
+    def _literal(self, kind) -> str:
+        rng = self.rng
+        if kind == CHAR:
+            return f"'{rng.choice(LITERAL_ALPHABET)}'"
+        return "'" + "".join(rng.choices(LITERAL_ALPHABET, k=rng.randint(2, 6))) + "'"
+
+    def _natural_form(self, dsl: str) -> str:
+        """"followed by" → "then", "optional" → "optionally"... con probabilidad `natural`."""
+        forms = self._connectors.get(dsl)
+        if forms and self.rng.random() < self.natural:
+            return self.rng.choice(forms)
+        return dsl
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Genera frases aleatorias del DSL (una por línea)."
+    )
+    parser.add_argument("-n", "--count", type=int, default=1000, help="Frases a generar.")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla (salida reproducible).")
+    parser.add_argument("--elements", type=int, default=4, help="Elementos máximos por secuencia.")
+    parser.add_argument("--depth", type=int, default=2, help="Anidamiento máximo de grupos.")
+    parser.add_argument("--or-fanout", type=int, default=3, help="Alternativas máximas de un 'or'.")
+    parser.add_argument("--natural", type=float, default=0.5,
+                        help="Probabilidad de formas naturales (0 = DSL canónico).")
+    parser.add_argument("--near-valid", type=float, default=0.0,
+                        help="Fracción de frases estropeadas a propósito.")
+    args = parser.parse_args(argv)
+
+    generator = PhraseGenerator(
+        seed=args.seed, max_elements=args.elements, max_depth=args.depth,
+        or_fanout=args.or_fanout, natural=args.natural, near_valid=args.near_valid,
+    )
+    out = sys.stdout
+    for phrase in generator.phrases(args.count):
+        out.write(phrase)
+        out.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Módulo `profiler.py`
+
+Perfilado del pipeline por fases (`python cli.py --profile`):
+
+- `profile_phrase(text)`: traduce una frase midiendo por separado cada
+  fase (normalizar, parsear, traducir, simplificar, serializar, validar)
+  con su tiempo y, opcionalmente, la memoria que reserva.
+- `format_profile(profile)`: tabla legible de ese resultado.
+- `TimingHistogram`: agrega los tiempos de muchas frases (modo `--batch`)
+  en percentiles con memoria constante.
+- `cprofile_to(path)`: vuelca un perfil de cProfile del bloque que envuelve.
+"""
+
+import cProfile
+import math
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import lark_parser
+from fast_parser import FastParser, DSLSyntaxError
+from lark import UnexpectedInput
+from regex_ir import Node, to_regex
+from utils import optimize_regex, validate_regex
+
+# Percentiles que informa `TimingHistogram.summary`
+PERCENTILES = (50, 90, 99)
+
+
+def count_nodes(node) -> int:
+    """Número de nodos de la IR bajo `node` (incluido)."""
+    total = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        total += 1
+        for name in ("child", "items", "branches"):
+            value = getattr(current, name, None)
+            if isinstance(value, Node):
+                stack.append(value)
+            elif value is not None:
+                stack.extend(value)
+    return total
+
+
+def _stages(text: str, simplify: bool, engine: str):
+    """
+    Generador con las fases del pipeline: cada `yield` separa una fase de
+    la siguiente, de modo que quien lo recorre mide entre dos pasos.
+    Devuelve (con StopIteration) el resultado final.
+    """
+    result = {"normalized": None, "regex": None, "valid": False,
+              "ir_nodes": None, "simplified_nodes": None}
+    normalized, spans = lark_parser.normalize_with_spans(text)
+    result["normalized"] = normalized
+    yield "normalize"
+    try:
+        if engine == "fast":
+            # El parser escrito a mano traduce mientras parsea
+            node = FastParser(lark_parser.translator).parse(normalized)
+            yield "parse"
+        else:
+            tree = lark_parser.parse_normalized(normalized)
+            yield "parse"
+            node = lark_parser.translate_tree_ir(tree)
+            yield "translate"
+    except (UnexpectedInput, DSLSyntaxError) as e:
+        raise _SyntaxError(lark_parser.describe_syntax_error(text, spans, e))
+    result["ir_nodes"] = count_nodes(node)
+    if simplify:
+        node = optimize_regex(node)
+        result["simplified_nodes"] = count_nodes(node)
+        yield "simplify"
+    regex = to_regex(node)
+    result["regex"] = regex
+    yield "serialize"
+    result["valid"] = validate_regex(regex)
+    yield "validate"
+    return result
+
+
+class _SyntaxError(Exception):
+    """Error de sintaxis ya traducido al mensaje de `translate_to_regex`."""
+
+
+def _run(text: str, simplify: bool, engine: str, memory: bool, measures: dict):
+    """
+    Recorre `_stages` midiendo tiempo (o memoria, con `memory=True`) por
+    fase en `measures`; si una fase falla, quedan las anteriores.
+    """
+    stages = _stages(text, simplify, engine)
+    if memory:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    while True:
+        try:
+            name = next(stages)
+        except StopIteration as done:
+            return done.value
+        now = time.perf_counter()
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            measures[name] = {"alloc_kb": round((current - before) / 1024, 1),
+                              "peak_kb": round((peak - before) / 1024, 1)}
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            now = time.perf_counter()
+        else:
+            measures[name] = {"ms": round((now - start) * 1000, 3)}
+        start = now
+
+
+def profile_phrase(text: str, simplify: bool = True, memory: bool = True,
+                   engine: str | None = None) -> dict:
+    """
+    Traduce `text` (sin caché) midiendo cada fase del pipeline:
+
+        {"phrase", "normalized", "regex", "valid", "error",
+         "stages": {"normalize": {"ms", "alloc_kb", "peak_kb"}, ...},
+         "total_ms", "ir_nodes", "simplified_nodes"}
+
+    - Con el motor "lark" el parseo y la traducción se miden por separado
+      (árbol + `RegexTranslator`); el pipeline normal los fusiona, así que
+      su suma es una cota superior. Con "fast" no hay fase "translate".
+    - `alloc_kb` es la memoria que queda reservada al terminar la fase y
+      `peak_kb` el máximo reservado durante ella. Se miden en una segunda
+      pasada con `tracemalloc`, para no inflar los tiempos.
+    - "ir_nodes" / "simplified_nodes": tamaño de la IR antes y después de
+      `optimize_regex` (una sola pasada estructural, sin punto fijo).
+
+    Nunca lanza excepciones: los errores quedan en "error".
+    """
+    engine = engine or lark_parser.engine
+    profile = {"phrase": text, "normalized": None, "regex": None, "valid": False,
+               "error": None, "stages": {}, "total_ms": 0.0,
+               "ir_nodes": None, "simplified_nodes": None}
+    try:
+        profile.update(_run(text, simplify, engine, False, profile["stages"]))
+    except _SyntaxError as e:
+        profile["error"] = str(e)
+    except Exception as e:
+        profile["error"] = f"ERROR interno: {e}"
+        memory = False
+    if memory:
+        _measure_memory(text, simplify, engine, profile["stages"])
+    profile["total_ms"] = round(sum(s["ms"] for s in profile["stages"].values()), 3)
+    return profile
+
+
+def _measure_memory(text: str, simplify: bool, engine: str, stages: dict) -> None:
+    """Segunda pasada con `tracemalloc`: añade "alloc_kb" / "peak_kb" a `stages`."""
+    allocations = {}
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        _run(text, simplify, engine, True, allocations)
+    except _SyntaxError:
+        pass
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    for name, values in allocations.items():
+        stages[name].update(values)
+
+
+def format_profile(profile: dict) -> str:
+    """Tabla de texto con el tiempo y la memoria de cada fase de `profile`."""
+    lines = [f"{'fase':<10} {'tiempo':>10} {'reservado':>11} {'pico':>10}"]
+    for name, stage in profile["stages"].items():
+        alloc = f"{stage['alloc_kb']:.1f} KiB" if "alloc_kb" in stage else "-"
+        peak = f"{stage['peak_kb']:.1f} KiB" if "peak_kb" in stage else "-"
+        lines.append(f"{name:<10} {stage['ms']:>7.3f} ms {alloc:>11} {peak:>10}")
+    lines.append(f"{'total':<10} {profile['total_ms']:>7.3f} ms")
+    if profile["ir_nodes"] is not None:
+        nodes = f"Nodos de la IR: {profile['ir_nodes']}"
+        if profile["simplified_nodes"] is not None:
+            nodes += f" → {profile['simplified_nodes']} tras simplificar"
+        lines.append(nodes)
+    return "\n".join(lines)
+
+
+class TimingHistogram:
+    """
+    Histograma de tiempos (ms) por clave con cubetas logarítmicas: los
+    percentiles tienen un error relativo de ~1% y la memoria no depende
+    del número de muestras.
+    """
+
+    # Razón entre cubetas consecutivas y resolución mínima (1 µs)
+    RATIO = 1.02
+    FLOOR_MS = 0.001
+
+    def __init__(self):
+        self._buckets = {}   # clave → {cubeta: muestras}
+        self._counts = {}
+        self._max = {}
+
+    def add(self, timings: dict) -> None:
+        """Añade una muestra por clave de `timings` (p. ej. `record["timings"]`)."""
+        log_ratio = math.log(self.RATIO)
+        for key, ms in timings.items():
+            bucket = int(math.log(max(ms, self.FLOOR_MS) / self.FLOOR_MS) / log_ratio)
+            counts = self._buckets.setdefault(key, {})
+            counts[bucket] = counts.get(bucket, 0) + 1
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._max[key] = max(self._max.get(key, 0.0), ms)
+
+    def percentile(self, key: str, p: float) -> float:
+        """Percentil `p` (0-100) de `key`, en ms."""
+        counts = self._buckets[key]
+        rank = math.ceil(self._counts[key] * p / 100) or 1
+        seen = 0
+        for bucket in sorted(counts):
+            seen += counts[bucket]
+            if seen >= rank:
+                # Punto medio geométrico de la cubeta
+                return min(self.FLOOR_MS * self.RATIO ** (bucket + 0.5), self._max[key])
+        return self._max[key]
+
+    def summary(self) -> dict:
+        """{clave: {"count", "p50", "p90", "p99", "max"}} con tiempos en ms."""
+        return {
+            key: {"count": self._counts[key],
+                  **{f"p{p}": round(self.percentile(key, p), 3) for p in PERCENTILES},
+                  "max": round(self._max[key], 3)}
+            for key in self._buckets
+        }
+
+
+def format_summary(summary: dict) -> str:
+    """Tabla de texto con los percentiles de `TimingHistogram.summary`."""
+    headers = ["fase", "n"] + [f"p{p}" for p in PERCENTILES] + ["max"]
+    lines = [f"{headers[0]:<14}" + "".join(f"{h:>10}" for h in headers[1:])]
+    for key, stats in summary.items():
+        values = [f"{stats[f'p{p}']:.3f}" for p in PERCENTILES] + [f"{stats['max']:.3f}"]
+        lines.append(f"{key:<14}{stats['count']:>10}" + "".join(f"{v:>10}" for v in values))
+    return "\n".join(lines) + "\n(tiempos en ms)"
+
+
+@contextmanager
+def cprofile_to(path: str | None):
+    """Perfila con cProfile el bloque `with` y vuelca las estadísticas en `path`."""
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,609 @@
+"""
+Módulo `redos.py`
+
+Análisis estático del riesgo de retroceso catastrófico (ReDoS) de las
+regex que genera el traductor.
+
+`re` prueba las formas de repartir la entrada entre los cuantificadores
+una a una. Si la misma cadena se puede repartir de muchas formas, una
+línea que casi coincide (`"aaaaaaaaaaaaaaaaaaaaaa!"` para
+`([A-Za-z]+)+[0-9]`) hace que `re` las pruebe todas antes de fallar.
+`analyze_redos` busca en la IR (sin ejecutar la regex) las tres
+estructuras que lo provocan:
+
+- "nested_quantifiers": una repetición que, sola o junto a partes
+  obligatorias que acepta, cubre cada vuelta de otra repetición (`(a+)+`,
+  `(\\s*[a-z]+)*`, `([0-9]*[0-9])+`).
+- "ambiguous_alternation": una alternativa, dentro de una repetición,
+  con dos ramas que aceptan la misma cadena (`(a|[a-z])+`) o con una
+  rama que se puede formar encadenando otras (`(a|aa)+`).
+- "overlapping_quantifiers": dos repeticiones sin límite seguidas (o
+  separadas solo por partes opcionales) en las que el final de la
+  primera y el principio de la segunda comparten caracteres
+  (`[a-z]+[a-z0-9]+`). Riesgo polinómico.
+
+Los dos primeros son exponenciales bajo un cuantificador sin límite y
+polinómicos de grado k bajo uno de k vueltas. El riesgo es "high" si hay
+alguno exponencial o de grado mayor que `MAX_POLYNOMIAL` (`(a+){7}`),
+"medium" si solo hay riesgo polinómico de grado bajo y "none" si no se
+encuentra nada. Es un análisis heurístico: que no haya hallazgos no
+demuestra que la regex sea segura.
+
+`safe_rewrite` reescribe los cuantificadores anidados que se pueden
+fundir sin cambiar el lenguaje: `(C+)+`, `(C*)+`, `(C+)*`... pasan a
+`(C)+` o `(C)*`. Los dos recorridos de la IR son iterativos.
+"""
+
+import re
+
+from cache import LRUCache, MISSING
+from regex_ir import (
+    Node, CharClass, Literal, Concat, Alt, Group, Quantifier, Repeat, parse_regex, to_regex,
+)
+
+# Niveles de riesgo, de menor a mayor
+RISK_LEVELS = ("none", "medium", "high")
+
+# Longitud máxima de la "forma" (una clase por posición) que se guarda de
+# cada subárbol de longitud fija
+MAX_SHAPE = 32
+
+# Repeticiones / alternativas que se recuerdan por subárbol (el análisis
+# solo necesita encontrar alguna, no todas)
+MAX_CANDIDATES = 8
+
+# Vueltas máximas de una repetición acotada cuyo anidamiento se considera
+# riesgo "medium": con k vueltas hay del orden de n^k repartos, así que a
+# partir de 3 el tiempo ya es inasumible para líneas de pocos miles de
+# caracteres y se informa como "high"
+MAX_POLYNOMIAL = 2
+
+# Hallazgos que se informan como máximo
+MAX_FINDINGS = 16
+
+# Caracteres con los que se decide si dos átomos se solapan: ASCII,
+# Latin-1 y Latin extendido, más una muestra de otros alfabetos, espacios
+# y dígitos Unicode. Se añaden los caracteres que aparecen en la regex.
+_BASE_UNIVERSE = "".join(map(chr, range(0x250))) + (
+    "\u0391\u03b1\u0416\u0436\u05d0\u0627\u0660\u0966\u2003\u2028\u3000"
+    "\u3042\u4e00\uac00\uff10\U0001d7ce"
+)
+
+_BASE_CHARS = frozenset(_BASE_UNIVERSE)
+
+# Máscaras de cada átomo sobre `_BASE_UNIVERSE`
+_base_masks = LRUCache(maxsize=4096)
+
+# Unidades de un literal: un carácter o un escape "\x"
+_LITERAL_UNIT_RE = re.compile(r"\\.|.", re.DOTALL)
+
+
+def analyze_redos(regex) -> dict:
+    """
+    Riesgo de retroceso catastrófico de `regex` (texto o nodo de la IR):
+
+        {"risk": "none" | "medium" | "high",
+         "findings": [{"kind", "risk", "fragment", "message"}, ...],
+         "rewrite": str | None}
+
+    Cada hallazgo indica el subpatrón responsable ("fragment", en texto).
+    "rewrite" es la regex de `safe_rewrite` si esta cambia algo, o None.
+
+    Raises
+    ------
+    ValueError
+        Si `regex` es texto que `regex_ir.parse_regex` no sabe leer.
+    """
+    node = parse_regex(regex) if isinstance(regex, str) else regex
+    text = regex if isinstance(regex, str) else to_regex(node)
+    findings = _Analyzer(text).run(node)
+    risk = max((f["risk"] for f in findings), key=RISK_LEVELS.index, default="none")
+    rewrite = None
+    if any(f["kind"] == "nested_quantifiers" for f in findings):
+        rewritten = _rewrite(node)
+        if rewritten is not node:
+            rewrite = to_regex(rewritten)
+    return {"risk": risk, "findings": findings, "rewrite": rewrite}
+
+
+def safe_rewrite(regex: str) -> str:
+    """
+    `regex` con los cuantificadores anidados fundidos en uno solo
+    (`([A-Za-z]+)+[0-9]` → `([A-Za-z])+[0-9]`). Acepta exactamente las
+    mismas cadenas; solo cambia lo que captura cada grupo. Devuelve la
+    regex sin cambios si no hay nada que fundir o no se puede leer.
+    """
+    try:
+        node = parse_regex(regex)
+    except ValueError:
+        return regex
+    rewritten = _rewrite(node)
+    return regex if rewritten is node else to_regex(rewritten)
+
+
+# ----------------------------------------------------------------------
+#  ANÁLISIS
+# ----------------------------------------------------------------------
+
+class _Info:
+    """
+    Propiedades de un subárbol, calculadas de abajo arriba:
+
+    - `nullable`: acepta la cadena vacía.
+    - `first` / `last`: caracteres con los que puede empezar / terminar
+      (máscara de bits sobre el universo de caracteres).
+    - `shape`: si siempre consume el mismo número de caracteres, la
+      máscara de cada posición; si no, None.
+    - `exposed`: repeticiones que pueden ocupar, solas, toda la cadena del
+      subárbol (el resto es opcional); `exposed_alts`, lo mismo para
+      alternativas.
+    - `leading` / `trailing`: repeticiones sin límite que pueden empezar /
+      terminar la cadena del subárbol.
+    - `ambiguous`: alternativas del subárbol con dos ramas que aceptan
+      una misma cadena.
+    - `atoms`: máscaras de los átomos obligatorios del subárbol, los que
+      aparecen en cualquier cadena suya (en una alternativa, los de todas
+      las ramas; None si hay más de `MAX_SHAPE` distintas).
+    """
+
+    __slots__ = ("nullable", "first", "last", "shape", "atoms", "exposed", "exposed_alts",
+                 "leading", "trailing", "ambiguous")
+
+    def __init__(self, nullable, first, last, shape, atoms, exposed=(), exposed_alts=(),
+                 leading=(), trailing=(), ambiguous=()):
+        self.nullable = nullable
+        self.first = first
+        self.last = last
+        self.shape = shape
+        self.atoms = atoms
+        self.exposed = exposed
+        self.exposed_alts = exposed_alts
+        self.leading = leading
+        self.trailing = trailing
+        self.ambiguous = ambiguous
+
+
+def _union(*groups) -> tuple:
+    """Concatena tuplas de nodos sin repetir ninguno, hasta `MAX_CANDIDATES`."""
+    seen = []
+    for group in groups:
+        for node in group:
+            if len(seen) >= MAX_CANDIDATES:
+                return tuple(seen)
+            if not any(node is other for other in seen):
+                seen.append(node)
+    return tuple(seen)
+
+
+def _is_modifier(node: Node) -> bool:
+    """`Repeat` que representa el modificador perezoso / posesivo de otro."""
+    return type(node) is Repeat and type(node.child) is Repeat
+
+
+def _unbounded(node: Repeat) -> bool:
+    return node.quantifier.max is None
+
+
+def _variable(node: Repeat) -> bool:
+    """Repetición con un número variable de vueltas (`+`, `*`, `{2,5}`...)."""
+    quantifier = node.quantifier
+    return quantifier.max is None or quantifier.max > quantifier.min
+
+
+class _Analyzer:
+    """Recorrido de la IR que calcula un `_Info` por nodo y anota los hallazgos."""
+
+    def __init__(self, text: str):
+        self.extra = "".join(sorted(set(text) - _BASE_CHARS))
+        self.masks = {}         # átomo → máscara de los caracteres que acepta
+        self.info = {}          # id(nodo) → _Info
+        self.findings = []
+        self.reported = set()   # (tipo, fragmento) ya anotados
+
+    def run(self, root: Node) -> list:
+        info = self.info
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in info:
+                continue
+            kind = type(node)
+            children = ()
+            if kind is Concat:
+                children = node.items
+            elif kind is Alt:
+                children = node.branches
+            elif kind is Group or kind is Repeat:
+                children = (node.child,)
+            if ready or not children:
+                info[id(node)] = self._visit(node, [info[id(c)] for c in children])
+                continue
+            stack.append((node, True))
+            stack.extend((child, False) for child in children if id(child) not in info)
+        return self.findings
+
+    def _mask(self, atom: str) -> int:
+        """
+        Máscara de los caracteres que acepta `atom`: los bits bajos son los
+        de `_BASE_UNIVERSE` (compartidos entre análisis, en `_base_masks`)
+        y los altos, los caracteres de la regex que no están en él.
+        """
+        mask = self.masks.get(atom)
+        if mask is None:
+            try:
+                accepts = re.compile(atom).fullmatch
+            except re.error:
+                accepts = None
+            if accepts is None:
+                mask = (1 << (len(_BASE_UNIVERSE) + len(self.extra))) - 1   # se solapa con todo
+            else:
+                mask = _base_masks.get(atom)
+                if mask is MISSING:
+                    mask = _accepted(accepts, _BASE_UNIVERSE)
+                    _base_masks.put(atom, mask)
+                mask |= _accepted(accepts, self.extra) << len(_BASE_UNIVERSE)
+            self.masks[atom] = mask
+        return mask
+
+    # -- propiedades de cada tipo de nodo -------------------------------------
+
+    def _visit(self, node: Node, children: list) -> _Info:
+        kind = type(node)
+        if kind is CharClass:
+            mask = self._mask(to_regex(node))
+            return _Info(False, mask, mask, (mask,), frozenset((mask,)))
+        if kind is Literal:
+            masks = [self._mask(unit if unit[0] == "\\" else re.escape(unit))
+                     for unit in _LITERAL_UNIT_RE.findall(node.text)]
+            if not masks:
+                return _Info(True, 0, 0, (), frozenset())
+            return _Info(False, masks[0], masks[-1],
+                         tuple(masks) if len(masks) <= MAX_SHAPE else None,
+                         _atoms(frozenset(masks)))
+        if kind is Group or _is_modifier(node):
+            return children[0]
+        if kind is Repeat:
+            return self._repeat(node, children[0])
+        if kind is Concat:
+            return self._concat(node, children)
+        if kind is Alt:
+            return self._alt(node, children)
+        raise TypeError(f"Nodo de IR desconocido: {node!r}")
+
+    def _repeat(self, node: Repeat, child: _Info) -> _Info:
+        quantifier = node.quantifier
+        shape = None
+        if (quantifier.max == quantifier.min and child.shape is not None
+                and len(child.shape) * quantifier.min <= MAX_SHAPE):
+            shape = child.shape * quantifier.min
+        result = _Info(quantifier.min == 0 or child.nullable, child.first, child.last, shape,
+                       frozenset() if quantifier.min == 0 else child.atoms, child.exposed, child.exposed_alts, child.leading, child.trailing,
+                       child.ambiguous)
+        if quantifier.max == 1:
+            return result
+        self._check_repeat(node, child)
+        if _variable(node):
+            result.exposed = _union((node,), child.exposed)
+        if _unbounded(node):
+            result.leading = _union((node,), child.leading)
+            result.trailing = _union((node,), child.trailing)
+        return result
+
+    def _concat(self, node: Concat, items: list) -> _Info:
+        required = [i for i, item in enumerate(items) if not item.nullable]
+        first = last = 0
+        for item in items:
+            first |= item.first
+            if not item.nullable:
+                break
+        for item in reversed(items):
+            last |= item.last
+            if not item.nullable:
+                break
+        shape = ()
+        for item in items:
+            if item.shape is None or len(shape) + len(item.shape) > MAX_SHAPE:
+                shape = None
+                break
+            shape += item.shape
+        if not required:
+            exposed = _union(*(item.exposed for item in items),
+                             self._absorbing(node, items, required))
+            exposed_alts = _union(*(item.exposed_alts for item in items))
+        elif len(required) == 1:
+            exposed = _union(items[required[0]].exposed, self._absorbing(node, items, required))
+            exposed_alts = items[required[0]].exposed_alts
+        else:
+            exposed, exposed_alts = self._absorbing(node, items, required), ()
+        head = items[:required[0] + 1] if required else items
+        tail = items[required[-1]:] if required else items
+        self._check_overlaps(node, items)
+        return _Info(
+            not required, first, last, shape, _atoms(*(item.atoms for item in items)),
+            exposed, exposed_alts,
+            _union(*(item.leading for item in head)),
+            _union(*(item.trailing for item in tail)),
+            _union(*(item.ambiguous for item in items)),
+        )
+
+    def _absorbing(self, node: Concat, items: list, required: list) -> tuple:
+        """
+        Repeticiones variables de un solo carácter (también `?`) que
+        aceptan todos los caracteres del resto de partes obligatorias de
+        la concatenación (`[0-9]*[0-9]`, `[a-z]\\w?`), o, si no hay partes
+        obligatorias, algún carácter de otra de esas repeticiones
+        (`[s-z]?\\S?`): la cadena se puede repartir de varias formas entre
+        ellas, así que cuentan como expuestas.
+        """
+        candidates = []             # (posición, repetición, máscara)
+        for i, item in enumerate(items):
+            inner = node.items[i]
+            while type(inner) is Group:
+                inner = inner.child
+            repeats = item.exposed
+            if type(inner) is Repeat and inner.quantifier.max == 1 and _variable(inner):
+                repeats = (inner,) + repeats
+            for inner in repeats:
+                shape = self.info[id(inner.child)].shape
+                if _variable(inner) and shape is not None and len(shape) == 1:
+                    candidates.append((i, inner, shape[0]))
+        found = ()
+        for i, inner, mask in candidates:
+            if required:
+                absorbs = all(j == i or (items[j].atoms is not None
+                                         and all(mask & m for m in items[j].atoms))
+                              for j in required)
+            else:
+                absorbs = any(j != i and mask & other for j, _, other in candidates)
+            if absorbs:
+                found = _union(found, (inner,))
+        return found
+
+    def _alt(self, node: Alt, branches: list) -> _Info:
+        first = last = 0
+        for branch in branches:
+            first |= branch.first
+            last |= branch.last
+        shape = branches[0].shape
+        if shape is not None and all(b.shape is not None and len(b.shape) == len(shape)
+                                     for b in branches):
+            shape = tuple(_or(column) for column in zip(*(b.shape for b in branches)))
+        else:
+            shape = None
+        ambiguous = _union(*(b.ambiguous for b in branches))
+        if _same_string(branches):
+            ambiguous = _union((node,), ambiguous)
+        nullable = any(b.nullable for b in branches)
+        return _Info(
+            nullable, first, last, shape,
+            frozenset() if nullable else _atoms(*(b.atoms for b in branches)),
+            _union(*(b.exposed for b in branches)),
+            _union((node,), *(b.exposed_alts for b in branches)),
+            _union(*(b.leading for b in branches)),
+            _union(*(b.trailing for b in branches)),
+            ambiguous,
+        )
+
+    # -- hallazgos ----------------------------------------------------------
+
+    def _report(self, kind: str, risk: str, fragment: Node, message: str, *nodes) -> None:
+        """Anota un hallazgo; `message` se completa con el texto de `nodes`."""
+        if len(self.findings) >= MAX_FINDINGS:
+            return
+        text = to_regex(fragment)
+        if (kind, text) not in self.reported:
+            self.reported.add((kind, text))
+            self.findings.append({"kind": kind, "risk": risk, "fragment": text,
+                                  "message": message.format(*map(to_regex, nodes))})
+
+    def _check_repeat(self, node: Repeat, child: _Info) -> None:
+        """Cuantificadores anidados y alternativas ambiguas dentro de `node`."""
+        risk = "high" if _unbounded(node) or node.quantifier.max > MAX_POLYNOMIAL else "medium"
+        if child.exposed:
+            self._report(
+                "nested_quantifiers", risk, node,
+                "'{}' está dentro de '{}' y la misma cadena se puede repartir de muchas "
+                "formas entre las vueltas de las dos repeticiones",
+                child.exposed[0], node.quantifier,
+            )
+        if child.ambiguous:
+            self._report(
+                "ambiguous_alternation", risk, node,
+                "dos ramas de '{}' aceptan una misma cadena y se repiten con '{}'",
+                child.ambiguous[0], node.quantifier,
+            )
+            return
+        for alt in child.exposed_alts:
+            if self._splittable(alt):
+                self._report(
+                    "ambiguous_alternation", risk, node,
+                    "una rama de '{}' se forma encadenando otras y se repiten con '{}'",
+                    alt, node.quantifier,
+                )
+                return
+
+    def _check_overlaps(self, node: Concat, items: list) -> None:
+        """Repeticiones sin límite contiguas que se disputan los mismos caracteres."""
+        info = self.info
+        for i, item in enumerate(items):
+            for j in range(i + 1, len(items) if item.trailing else i + 1):
+                for left in item.trailing:
+                    for right in items[j].leading:
+                        if info[id(left)].last & info[id(right)].first:
+                            self._report(
+                                "overlapping_quantifiers", "medium",
+                                Concat(node.items[i:j + 1]),
+                                "'{}' y '{}' aceptan los mismos caracteres: cada reparto "
+                                "entre las dos se prueba por separado",
+                                left, right,
+                            )
+                            return
+                if not items[j].nullable:
+                    break
+
+    def _splittable(self, alt: Alt) -> bool:
+        """
+        Alguna rama de longitud fija se forma encadenando otras ramas más
+        cortas de la misma alternativa (`a|aa`): repetida, la alternativa
+        acepta esa cadena de dos formas.
+        """
+        shapes = [self.info[id(b)].shape for b in alt.branches]
+        words, classes = _split_shapes(shape for shape in shapes if shape)
+        lengths = sorted({len(word) for word in words})
+        for target in [*words, *classes]:
+            reachable = [True] + [False] * len(target)
+            for start in range(len(target)):
+                if not reachable[start]:
+                    continue
+                rest = target[start:]
+                for length in lengths:
+                    if length >= len(target) or length > len(rest):
+                        break
+                    piece = rest[:length]
+                    if (piece in words if _is_word(piece)
+                            else any(_overlaps(piece, word) for word in words)):
+                        reachable[start + length] = True
+                for piece in classes:
+                    if len(piece) < len(target) and _overlaps(piece, rest[:len(piece)]):
+                        reachable[start + len(piece)] = True
+            if reachable[-1]:
+                return True
+        return False
+
+
+def _accepted(accepts, chars: str) -> int:
+    """Máscara de los caracteres de `chars` que acepta `accepts`."""
+    mask = 0
+    for bit, ch in enumerate(chars):
+        if accepts(ch):
+            mask |= 1 << bit
+    return mask
+
+
+def _atoms(*groups):
+    """Unión de conjuntos de máscaras; None si alguno es None o pasa de `MAX_SHAPE`."""
+    if any(group is None for group in groups):
+        return None
+    atoms = frozenset().union(*groups)
+    return atoms if len(atoms) <= MAX_SHAPE else None
+
+
+def _or(masks) -> int:
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+
+def _is_word(shape: tuple) -> bool:
+    """Forma de una cadena concreta: un solo carácter posible en cada posición."""
+    return all(mask & (mask - 1) == 0 for mask in shape)
+
+
+def _overlaps(shape: tuple, other: tuple) -> bool:
+    """Dos formas de la misma longitud aceptan alguna cadena en común."""
+    return len(shape) == len(other) and all(a & b for a, b in zip(shape, other))
+
+
+def _split_shapes(shapes) -> tuple:
+    """
+    Separa las formas en cadenas concretas (un conjunto: se comparan por
+    igualdad) y formas con clases (una lista: se comparan de una en una).
+    """
+    words, classes = set(), []
+    for shape in shapes:
+        if _is_word(shape):
+            words.add(shape)
+        else:
+            classes.append(shape)
+    return words, classes
+
+
+def _same_string(branches: list) -> bool:
+    """Dos ramas aceptan una misma cadena: las dos la vacía, o la misma forma."""
+    if sum(1 for b in branches if b.nullable) > 1:
+        return True
+    words, classes = set(), []
+    for branch in branches:
+        shape = branch.shape
+        if not shape:
+            continue
+        if any(_overlaps(shape, other) for other in classes):
+            return True
+        if _is_word(shape):
+            if shape in words:
+                return True
+            words.add(shape)
+        else:
+            if any(_overlaps(shape, word) for word in words):
+                return True
+            classes.append(shape)
+    return False
+
+
+# ----------------------------------------------------------------------
+#  REESCRITURA
+# ----------------------------------------------------------------------
+
+def _merged_quantifier(min: int) -> Quantifier:
+    if min < 2:
+        return Quantifier(min, None, "*+"[min])
+    return Quantifier(min, None, "{%d,}" % min)
+
+
+def _merge_nested(node: Repeat) -> Node:
+    """
+    `(C{a,})+`-like → `(C){a·b,}` si las dos repeticiones no tienen
+    límite, la interior empieza en 0 o 1 y ninguna es perezosa ni
+    posesiva. En otro caso devuelve `node`.
+    """
+    outer = node.quantifier
+    if outer.max is not None or _is_modifier(node):
+        return node
+    groups = []
+    inner = node.child
+    while type(inner) is Group:
+        groups.append(inner)
+        inner = inner.child
+    if (type(inner) is not Repeat or _is_modifier(inner)
+            or inner.quantifier.max is not None or inner.quantifier.min > 1):
+        return node
+    child = inner.child
+    for group in reversed(groups):
+        child = Group(child, group.capturing)
+    return Repeat(child, _merged_quantifier(outer.min * inner.quantifier.min))
+
+
+def _rewrite(root: Node) -> Node:
+    """Copia de `root` con `_merge_nested` aplicado de abajo arriba (iterativo)."""
+    done = {}                           # id(nodo) → nodo reescrito
+    stack = [(root, False)]
+    while stack:
+        node, ready = stack.pop()
+        if id(node) in done:
+            continue
+        kind = type(node)
+        children = ()
+        if kind is Concat:
+            children = node.items
+        elif kind is Alt:
+            children = node.branches
+        elif kind is Group or kind is Repeat:
+            children = (node.child,)
+        if children and not ready:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children if id(child) not in done)
+            continue
+        new = [done[id(child)] for child in children]
+        result = node
+        if any(a is not b for a, b in zip(new, children)):
+            if kind is Concat:
+                result = Concat(new)
+            elif kind is Alt:
+                result = Alt(new)
+            elif kind is Group:
+                result = Group(new[0], node.capturing)
+            else:
+                result = Repeat(new[0], node.quantifier)
+        done[id(node)] = _merge_nested(result) if kind is Repeat else result
+    return done[id(root)]
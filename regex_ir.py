@@ -0,0 +1,572 @@
+"""
+Módulo `regex_ir.py`
+
+Representación intermedia (IR) tipada de las expresiones regulares que
+genera `RegexTranslator`.
+
+En lugar de concatenar fragmentos de texto en cada regla, el traductor
+construye un árbol de nodos pequeños (con `__slots__`):
+
+- `CharClass` → clase de caracteres: `[0-9]`, `[^a]`, `\\s`, `.`
+- `Literal`   → texto literal: `hello`
+- `Concat`    → concatenación de nodos
+- `Alt`       → alternativa `A|B|...` (sin paréntesis)
+- `Repeat`    → nodo con cuantificador (`Quantifier`)
+- `Group`     → paréntesis de captura `( ... )` o sin captura `(?: ... )`
+
+La regex en texto se obtiene al final con `to_regex(node)`, en una sola
+pasada. El optimizador, el explicador o un estimador de coste pueden
+trabajar directamente sobre la estructura. `parse_regex(text)` hace el
+camino inverso para regex ya serializadas, y `drop_captures(node)`
+convierte todos los grupos en grupos sin captura.
+
+Los nodos no se modifican nunca una vez creados, así que subárboles
+idénticos pueden ser el mismo objeto: `NodeTable` los interna
+(hash-consing) y `canonical_hash(node)` da un hash estable de la
+estructura, independiente de la frase de la que salió, que el pipeline
+usa como clave de su caché por IR.
+"""
+
+import hashlib
+import re
+
+
+class Node:
+    """Clase base de todos los nodos de la IR."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class CharClass(Node):
+    """
+    Clase de caracteres.
+
+    Attributes
+    ----------
+    body : str
+        Contenido de la clase sin corchetes ("0-9", "AEIOUaeiou") o el
+        atajo completo cuando `bracketed` es False ("\\s", "\\w", ".").
+    negated : bool
+        True para clases negadas `[^...]`.
+    bracketed : bool
+        False para atajos que se escriben sin corchetes.
+    """
+
+    __slots__ = ("body", "negated", "bracketed")
+
+    def __init__(self, body: str, negated: bool = False, bracketed: bool = True):
+        self.body = body
+        self.negated = negated
+        self.bracketed = bracketed
+
+
+class Literal(Node):
+    """Texto literal (se emite tal cual, igual que antes de la IR)."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class Concat(Node):
+    """Concatenación de varios nodos."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = list(items)
+
+
+class Alt(Node):
+    """Alternativa entre varias ramas; se serializa sin paréntesis."""
+
+    __slots__ = ("branches",)
+
+    def __init__(self, branches):
+        self.branches = list(branches)
+
+
+class Group(Node):
+    """Grupo de captura `( ... )`, o sin captura `(?: ... )` si `capturing` es False."""
+
+    __slots__ = ("child", "capturing")
+
+    def __init__(self, child: Node, capturing: bool = True):
+        self.child = child
+        self.capturing = capturing
+
+
+class Quantifier(Node):
+    """
+    Cuantificador: número mínimo y máximo de repeticiones (`max` None =
+    sin límite) y el texto con el que se escribe ("+", "{2,5}", ...).
+    """
+
+    __slots__ = ("min", "max", "text")
+
+    def __init__(self, min: int, max: int | None, text: str):
+        self.min = min
+        self.max = max
+        self.text = text
+
+
+class Repeat(Node):
+    """Nodo `child` repetido según `quantifier`."""
+
+    __slots__ = ("child", "quantifier")
+
+    def __init__(self, child: Node, quantifier: Quantifier):
+        self.child = child
+        self.quantifier = quantifier
+
+
+class NodeTable:
+    """
+    Tabla de hash-consing: devuelve siempre el mismo objeto para nodos
+    con la misma estructura, de modo que un subárbol repetido ocupa
+    memoria una sola vez y la identidad (`is`) equivale a igualdad
+    estructural entre nodos de la tabla.
+
+    Los constructores (`concat`, `group`...) esperan hijos ya internados:
+    la clave usa su identidad, con lo que buscar un nodo cuesta lo mismo
+    sea cual sea el tamaño del subárbol. Además canonicalizan lo que no
+    cambia la regex: las concatenaciones y alternativas anidadas se
+    aplanan y una concatenación de un solo elemento es ese elemento.
+
+    Parameters
+    ----------
+    seed : iterable de Node
+        Nodos hoja que se registran de partida (las constantes del
+        traductor), para que `range 'a' to 'z'` y `lowercase letter`
+        compartan nodo.
+    maxsize : int
+        Al superar este número de nodos la tabla se vacía (y se vuelve a
+        sembrar): solo se pierde la compartición con nodos anteriores.
+        Con 0 no se guarda nada: cada llamada crea un nodo nuevo.
+    """
+
+    def __init__(self, seed=(), maxsize: int = 65536):
+        self.maxsize = maxsize
+        self._seed = tuple(seed)
+        self._nodes = {}
+        self._hashes = {}
+        self.clear()
+
+    def clear(self) -> None:
+        self._nodes = {}
+        self._hashes = {}
+        for node in self._seed:
+            self._nodes.setdefault(_leaf_key(node), node)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _store(self, key, node):
+        """Registra `node` (nuevo) bajo `key`, vaciando la tabla si está llena."""
+        if self.maxsize <= 0:
+            return node
+        if len(self._nodes) >= self.maxsize:
+            self.clear()
+        self._nodes[key] = node
+        return node
+
+    def char_class(self, body: str, negated: bool = False, bracketed: bool = True) -> CharClass:
+        key = (CharClass, body, negated, bracketed)
+        node = self._nodes.get(key)
+        return node if node is not None else self._store(key, CharClass(body, negated, bracketed))
+
+    def literal(self, text: str) -> Literal:
+        key = (Literal, text)
+        node = self._nodes.get(key)
+        return node if node is not None else self._store(key, Literal(text))
+
+    def quantifier(self, min: int, max: int | None, text: str) -> Quantifier:
+        key = (Quantifier, min, max, text)
+        node = self._nodes.get(key)
+        return node if node is not None else self._store(key, Quantifier(min, max, text))
+
+    def concat(self, items) -> Node:
+        items = _flatten(Concat, items, "items")
+        if len(items) == 1:
+            return items[0]
+        key = (Concat, *map(id, items))
+        node = self._nodes.get(key)
+        return node if node is not None else self._store(key, Concat(items))
+
+    def alt(self, branches) -> Node:
+        branches = _flatten(Alt, branches, "branches")
+        key = (Alt, *map(id, branches))
+        node = self._nodes.get(key)
+        return node if node is not None else self._store(key, Alt(branches))
+
+    def group(self, child: Node, capturing: bool = True) -> Group:
+        key = (Group, id(child), capturing)
+        node = self._nodes.get(key)
+        return node if node is not None else self._store(key, Group(child, capturing))
+
+    def repeat(self, child: Node, quantifier: Quantifier) -> Repeat:
+        key = (Repeat, id(child), id(quantifier))
+        node = self._nodes.get(key)
+        return node if node is not None else self._store(key, Repeat(child, quantifier))
+
+    def canonical_hash(self, node: Node) -> str:
+        """
+        `canonical_hash(node)` recordando el digest de cada nodo visto:
+        en un árbol recién internado solo se calculan los de sus nodos
+        nuevos. Se olvidan al vaciar la tabla (o al superar `maxsize`).
+        """
+        if self.maxsize <= 0:
+            return canonical_hash(node)
+        if len(self._hashes) >= self.maxsize:
+            self._hashes = {}
+        return canonical_hash(node, self._hashes)
+
+    def canonicalize(self, node: Node) -> Node:
+        """
+        Versión internada de un árbol cualquiera (p. ej. el de
+        `parse_regex`). Recorrido iterativo en postorden: cada subárbol se
+        interna después que sus hijos.
+        """
+        done = {}                       # id(nodo original) → nodo internado
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if id(current) in done:
+                continue
+            children = child_nodes(current)
+            if children and not expanded:
+                stack.append((current, True))
+                stack.extend((child, False) for child in children)
+                continue
+            kind = type(current)
+            if kind is CharClass:
+                result = self.char_class(current.body, current.negated, current.bracketed)
+            elif kind is Literal:
+                result = self.literal(current.text)
+            elif kind is Quantifier:
+                result = self.quantifier(current.min, current.max, current.text)
+            elif kind is Concat:
+                result = self.concat([done[id(item)] for item in current.items])
+            elif kind is Alt:
+                result = self.alt([done[id(branch)] for branch in current.branches])
+            elif kind is Group:
+                result = self.group(done[id(current.child)], current.capturing)
+            elif kind is Repeat:
+                result = self.repeat(done[id(current.child)], done[id(current.quantifier)])
+            else:
+                raise TypeError(f"Nodo de IR desconocido: {current!r}")
+            done[id(current)] = result
+        return done[id(node)]
+
+
+def _leaf_key(node: Node):
+    """Clave de `NodeTable` para una hoja (clase, literal o cuantificador)."""
+    kind = type(node)
+    if kind is CharClass:
+        return (CharClass, node.body, node.negated, node.bracketed)
+    if kind is Literal:
+        return (Literal, node.text)
+    if kind is Quantifier:
+        return (Quantifier, node.min, node.max, node.text)
+    raise TypeError(f"Solo se pueden sembrar hojas: {node!r}")
+
+
+def _flatten(kind, nodes, field: str) -> list:
+    """Sustituye cada nodo de tipo `kind` por sus hijos (`field`)."""
+    nodes = list(nodes)
+    if not any(type(n) is kind for n in nodes):
+        return nodes
+    flat = []
+    for n in nodes:
+        if type(n) is kind:
+            flat.extend(getattr(n, field))
+        else:
+            flat.append(n)
+    return flat
+
+
+def child_nodes(node: Node):
+    """Hijos directos de `node` (incluido el cuantificador de un `Repeat`)."""
+    kind = type(node)
+    if kind is Concat:
+        return node.items
+    if kind is Alt:
+        return node.branches
+    if kind is Group:
+        return (node.child,)
+    if kind is Repeat:
+        return (node.child, node.quantifier)
+    return ()
+
+
+def drop_captures(node: Node) -> Node:
+    """
+    Copia de `node` en la que todos los grupos son sin captura `(?: ... )`.
+
+    La regex reconoce exactamente lo mismo, pero `re` ya no guarda las
+    posiciones de cada grupo en cada intento de coincidencia. Los
+    subárboles sin grupos de captura se reutilizan tal cual (no se
+    copian), y el recorrido es iterativo como el de `canonicalize`.
+    """
+    done = {}                           # id(nodo original) → nodo sin capturas
+    stack = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if id(current) in done:
+            continue
+        children = child_nodes(current)
+        if children and not expanded:
+            stack.append((current, True))
+            stack.extend((child, False) for child in children)
+            continue
+        kind = type(current)
+        new = [done[id(child)] for child in children]
+        changed = any(a is not b for a, b in zip(new, children))
+        result = current
+        if kind is Group:
+            if changed or current.capturing:
+                result = Group(new[0], capturing=False)
+        elif changed:
+            if kind is Concat:
+                result = Concat(new)
+            elif kind is Alt:
+                result = Alt(new)
+            elif kind is Repeat:
+                result = Repeat(new[0], new[1])
+        done[id(current)] = result
+    return done[id(node)]
+
+
+def canonical_hash(node: Node, memo: dict | None = None) -> str:
+    """
+    Hash (BLAKE2b, 32 caracteres hex) de la estructura de `node`: dos
+    árboles con la misma estructura tienen el mismo hash aunque vengan de
+    frases distintas, en cualquier proceso. Se calcula una vez por nodo
+    distinto, así que en un árbol internado cuesta lo que sus nodos únicos.
+    Las concatenaciones y alternativas anidadas cuentan como aplanadas,
+    igual que en `NodeTable`.
+
+    `memo` (id(nodo) → (nodo, digest, hijos aplanados)) conserva los
+    digests entre llamadas: con el de `NodeTable.canonical_hash` solo se
+    recorren los nodos que no se habían visto. Guarda una referencia a
+    cada nodo, así que su `id` no se puede reutilizar mientras siga ahí.
+    """
+    digests = {}                        # id(nodo) → digest
+    flat = {}                           # id(Concat/Alt) → digests de sus hijos, aplanados
+    stack = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if id(current) in digests:
+            continue
+        if memo is not None:
+            entry = memo.get(id(current))
+            if entry is not None:
+                digests[id(current)] = entry[1]
+                if entry[2] is not None:
+                    flat[id(current)] = entry[2]
+                continue
+        children = child_nodes(current)
+        if children and not expanded:
+            stack.append((current, True))
+            stack.extend((child, False) for child in children)
+            continue
+        kind = type(current)
+        if kind is Concat or kind is Alt:
+            parts = []
+            for child in children:
+                if type(child) is kind:
+                    parts.extend(flat[id(child)])
+                else:
+                    parts.append(digests[id(child)])
+            flat[id(current)] = parts
+            if kind is Concat and len(parts) == 1:
+                digests[id(current)] = parts[0]
+                if memo is not None:
+                    memo[id(current)] = (current, parts[0], parts)
+                continue
+            data = b"".join(parts)
+        elif children:
+            data = b"".join(digests[id(child)] for child in children)
+            if kind is Group and not current.capturing:
+                data = b"?:" + data
+        else:
+            data = repr(tuple(getattr(current, name) for name in current.__slots__)).encode()
+        digests[id(current)] = hashlib.blake2b(
+            kind.__name__.encode() + b":" + data, digest_size=16
+        ).digest()
+        if memo is not None:
+            memo[id(current)] = (current, digests[id(current)], flat.get(id(current)))
+    return digests[id(node)].hex()
+
+
+def to_regex(node: Node) -> str:
+    """
+    Serializa un árbol de la IR a regex en una sola pasada: los fragmentos
+    se acumulan en una lista y se unen una única vez al final.
+
+    El recorrido usa una pila de nodos y textos pendientes (sin recursión),
+    de modo que no hay límite de profundidad para los grupos anidados.
+    """
+    parts = []
+    out = parts.append
+    stack = [node]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node = pop()
+        kind = type(node)
+        if kind is str:
+            out(node)
+        elif kind is CharClass:
+            if not node.bracketed:
+                out(node.body)
+            elif node.negated:
+                out("[^" + node.body + "]")
+            else:
+                out("[" + node.body + "]")
+        elif kind is Literal:
+            out(node.text)
+        elif kind is Concat:
+            stack.extend(reversed(node.items))
+        elif kind is Alt:
+            branches = node.branches
+            for i in range(len(branches) - 1, -1, -1):
+                push(branches[i])
+                if i:
+                    push("|")
+        elif kind is Group:
+            out("(" if node.capturing else "(?:")
+            push(")")
+            push(node.child)
+        elif kind is Repeat:
+            push(node.quantifier.text)
+            push(node.child)
+        elif kind is Quantifier:
+            out(node.text)
+        else:
+            raise TypeError(f"Nodo de IR desconocido: {node!r}")
+    return "".join(parts)
+
+
+# ----------------------------------------------------------------------
+#  LECTURA DE UNA REGEX EN TEXTO
+# ----------------------------------------------------------------------
+
+# Atajos de clase que se representan como `CharClass` sin corchetes
+_SHORTHANDS = frozenset("dDsSwW")
+
+# Tokens de una regex; "run" agrupa caracteres literales consecutivos
+_REGEX_TOKEN_RE = re.compile(r"""
+    (?P<cls>\[\^?\]?(?:\\.|[^\]\\])*\])
+  | (?P<esc>\\.)
+  | (?P<quant>[?+*]|\{(?:\d+(?:,\d*)?|,\d+)\})
+  | (?P<noncapturing>\(\?:)
+  | (?P<unsupported>\(\?)
+  | (?P<open>\()
+  | (?P<close>\))
+  | (?P<alt>\|)
+  | (?P<dot>\.)
+  | (?P<run>[^\\\[()|?+*{.]+|\{)
+  | (?P<error>[\s\S])
+""", re.VERBOSE)
+
+_SIMPLE_QUANTIFIERS = {
+    "?": Quantifier(0, 1, "?"),
+    "+": Quantifier(1, None, "+"),
+    "*": Quantifier(0, None, "*"),
+}
+
+
+def parse_regex(regex: str) -> Node:
+    """
+    Convierte una regex en texto (la sintaxis que genera el traductor) en
+    un árbol de la IR, de modo que `to_regex(parse_regex(r)) == r`.
+
+    Los caracteres literales consecutivos forman un único `Literal`, y los
+    modificadores perezoso / posesivo ("+?", "{2}+") se representan, como
+    en el traductor, con un `Repeat` cuyo hijo es otro `Repeat`. El
+    recorrido es iterativo (una pila de grupos abiertos), sin recursión.
+
+    Lanza
+    -----
+    ValueError
+        Si la regex es inválida o usa construcciones que la IR no
+        representa (grupos `(?...)` distintos de `(?:...)`).
+    """
+    stack = []              # (ramas, elementos, posición, captura) de cada grupo abierto
+    branches, items = [], []
+    for m in _REGEX_TOKEN_RE.finditer(regex):
+        kind = m.lastgroup
+        text = m.group()
+        if kind == "run":
+            items.append(Literal(text))
+        elif kind == "cls":
+            negated = text[1] == "^"
+            items.append(CharClass(text[2 if negated else 1:-1], negated=negated))
+        elif kind == "quant":
+            if not items:
+                raise ValueError(f"Cuantificador sin término en la posición {m.start()}")
+            quantifier = _SIMPLE_QUANTIFIERS.get(text) or _braces_quantifier(text)
+            last = items[-1]
+            if type(last) is Literal and len(last.text) > 1 and last.text[0] != "\\":
+                # El cuantificador solo afecta al último carácter del literal
+                items[-1] = Literal(last.text[:-1])
+                items.append(Repeat(Literal(last.text[-1]), quantifier))
+            else:
+                items[-1] = Repeat(last, quantifier)
+        elif kind == "esc":
+            if text[1] in _SHORTHANDS:
+                items.append(CharClass(text, bracketed=False))
+            else:
+                items.append(Literal(text))
+        elif kind == "dot":
+            items.append(CharClass(".", bracketed=False))
+        elif kind == "open":
+            stack.append((branches, items, m.start(), True))
+            branches, items = [], []
+        elif kind == "close":
+            if not stack:
+                raise ValueError(f"Paréntesis sin abrir en la posición {m.start()}")
+            child = _alternation(branches, items)
+            branches, items, _, capturing = stack.pop()
+            items.append(Group(child, capturing))
+        elif kind == "alt":
+            branches.append(_sequence(items))
+            items = []
+        elif kind == "noncapturing":
+            stack.append((branches, items, m.start(), False))
+            branches, items = [], []
+        elif kind == "unsupported":
+            raise ValueError(f"Grupo no soportado en la posición {m.start()}")
+        elif text == "[":
+            raise ValueError(f"Clase de caracteres sin cerrar en la posición {m.start()}")
+        else:
+            raise ValueError(f"Barra invertida al final de la regex (posición {m.start()})")
+    if stack:
+        raise ValueError(f"Falta ')' para el grupo de la posición {stack[-1][2]}")
+    return _alternation(branches, items)
+
+
+def _sequence(items) -> Node:
+    return items[0] if len(items) == 1 else Concat(items)
+
+
+def _alternation(branches, items) -> Node:
+    if not branches:
+        return _sequence(items)
+    return Alt(branches + [_sequence(items)])
+
+
+def _braces_quantifier(text: str) -> Quantifier:
+    """Cuantificador a partir de `{n}`, `{n,}`, `{n,m}` o `{,m}`."""
+    inner = text[1:-1]
+    if "," not in inner:
+        n = int(inner)
+        return Quantifier(n, n, text)
+    low, high = inner.split(",")
+    return Quantifier(int(low or 0), int(high) if high else None, text)
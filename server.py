@@ -0,0 +1,173 @@
+"""
+Módulo `server.py`
+
+Servidor persistente de traducción (`python cli.py --serve SOCKET`).
+
+Mantiene cargados la gramática, el normalizador y las cachés, y atiende
+peticiones por un socket Unix, de modo que cada traducción no paga el
+arranque del intérprete ni la importación de Lark.
+
+Protocolo (JSON lines): cada petición es un objeto JSON en una línea y
+cada respuesta otro objeto JSON en una línea. Una misma conexión puede
+enviar varias peticiones seguidas.
+
+    {"op": "translate", "phrase": "...", "simplify": true, "capture": true}
+        → {"ok": true, "regex": "...", "valid": true, "error": null}
+    {"op": "test", "phrase": "...", "text": "..."}
+        → {"ok": true, "regex": "...", "valid": true, "error": null, "match": true}
+    {"op": "explain", "phrase": "..."}
+        → {"ok": true, "regex": "...", ..., "explanation": "..."}
+    {"op": "stats"}      → {"ok": true, "cache": {...}}
+    {"op": "ping"}       → {"ok": true}
+    {"op": "shutdown"}   → {"ok": true} y el servidor termina
+
+`simplify` y `capture` son opcionales (por defecto true) en "translate",
+"test" y "explain"; con `"capture": false` los grupos se emiten sin
+captura, `(?:...)`. Una petición mal formada recibe {"ok": false, "error": "..."} sin cerrar
+la conexión. Cada cliente se atiende en su propio hilo.
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+
+from lark_parser import translate_to_regex, cache_stats
+from explain import explain_phrase_and_regex
+from utils import validate_regex, compile_regex
+
+# Tamaño máximo de una petición (bytes); evita que un cliente agote la memoria
+MAX_REQUEST = 1 << 20
+
+
+def default_socket_path() -> str:
+    """Ruta por defecto del socket: $TRADUCTORREGEX_SOCKET o /tmp por usuario."""
+    return os.environ.get("TRADUCTORREGEX_SOCKET") or f"/tmp/traductorregex-{os.getuid()}.sock"
+
+
+def handle_request(request: dict) -> dict:
+    """
+    Atiende una petición ya decodificada y devuelve la respuesta.
+
+    No lanza excepciones por peticiones inválidas: devuelve
+    {"ok": false, "error": ...}.
+    """
+    if not isinstance(request, dict):
+        return {"ok": False, "error": "La petición debe ser un objeto JSON."}
+    op = request.get("op", "translate")
+
+    if op in ("ping", "shutdown"):
+        # El cierre en sí lo hace `_Handler` tras enviar la respuesta
+        return {"ok": True}
+    if op == "stats":
+        return {"ok": True, "cache": cache_stats()}
+    if op not in ("translate", "test", "explain"):
+        return {"ok": False, "error": f"Operación desconocida: {op}"}
+
+    phrase = request.get("phrase")
+    if not isinstance(phrase, str):
+        return {"ok": False, "error": "Falta 'phrase' (texto)."}
+
+    regex = translate_to_regex(
+        phrase,
+        simplify=bool(request.get("simplify", True)),
+        capture=bool(request.get("capture", True)),
+    )
+    if regex.startswith("ERROR"):
+        return {"ok": True, "regex": None, "valid": False, "error": regex}
+    response = {"ok": True, "regex": regex, "valid": validate_regex(regex), "error": None}
+
+    if op == "test":
+        text = request.get("text")
+        if not isinstance(text, str):
+            return {"ok": False, "error": "Falta 'text' (texto) para 'test'."}
+        response["match"] = response["valid"] and compile_regex(regex).fullmatch(text) is not None
+    elif op == "explain":
+        response["explanation"] = explain_phrase_and_regex(phrase, regex)
+    return response
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Lee peticiones JSON línea a línea y responde a cada una."""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_REQUEST + 1)
+            if not line:
+                return
+            if len(line) > MAX_REQUEST:
+                self._send({"ok": False, "error": "Petición demasiado grande."})
+                return
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self._send({"ok": False, "error": "JSON inválido."})
+                continue
+            try:
+                response = handle_request(request)
+            except Exception as e:
+                response = {"ok": False, "error": f"ERROR interno: {e}"}
+            self._send(response)
+            if isinstance(request, dict) and request.get("op") == "shutdown":
+                # shutdown() espera a que termine serve_forever: otro hilo
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+    def _send(self, response: dict) -> None:
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class TranslationServer(socketserver.ThreadingUnixStreamServer):
+    """Servidor con un hilo por conexión; los hilos no bloquean el cierre."""
+
+    daemon_threads = True
+
+
+def is_alive(path: str) -> bool:
+    """True si hay un servidor aceptando conexiones en `path`."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+            return True
+        except OSError:
+            return False
+
+
+def serve(path: str, ready=None) -> None:
+    """
+    Atiende peticiones en el socket `path` hasta recibir "shutdown",
+    SIGTERM o SIGINT. Un socket huérfano de un servidor anterior se
+    elimina; si ya hay un servidor vivo en esa ruta, lanza RuntimeError.
+
+    `ready` (opcional) se llama cuando el socket ya acepta conexiones.
+    """
+    if os.path.exists(path):
+        if is_alive(path):
+            raise RuntimeError(f"Ya hay un servidor escuchando en {path}")
+        os.unlink(path)
+
+    server = TranslationServer(path, _Handler)
+    previous = {}
+    if threading.current_thread() is threading.main_thread():
+        def stop(signum, frame):
+            threading.Thread(target=server.shutdown, daemon=True).start()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous[signum] = signal.signal(signum, stop)
+    try:
+        os.chmod(path, 0o600)
+        if ready is not None:
+            ready()
+        server.serve_forever()
+    finally:
+        server.server_close()
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -1,113 +1,3 @@
-<<<<<<< HEAD
-import argparse
-from lark_parser import translate_to_regex, normalize_text
-from utils import validate_regex, simplify_regex
-
-
-def test_case(phrase, expected=None, verbose=False):
-    regex = translate_to_regex(phrase)
-    ok = True
-    msg = ""
-
-    if regex.startswith("ERROR"):
-        ok = False
-        msg = regex
-
-    elif not validate_regex(regex):
-        ok = False
-        msg = "Regex inválida generada."
-
-    elif expected is not None and simplify_regex(regex) != simplify_regex(expected):
-        ok = False
-        msg = f"Esperado: {expected}, obtenido: {regex}"
-
-    if ok:
-        print(f"✓ PASSED  →  '{phrase}'   =>   {regex}")
-    else:
-        print(f"✗ FAILED  →  '{phrase}'")
-        print("   Motivo:", msg)
-
-    if verbose:
-        print("   Normalizado:", normalize_text(phrase))
-        print("   Regex final:", regex)
-        print()
-
-
-
-# ============================================================
-# PRUEBAS DEFINIDAS
-# ============================================================
-
-BASIC_TESTS = [
-    ("digits that appear three times", "[0-9]{3}"),
-    ("a lowercase letter optionally followed by three digits", "[a-z]?[0-9]{3}"),
-    ("letters then digits", "[a-zA-Z]+[0-9]+"),
-    ("any character except digits", "[^0-9]"),
-    ("uppercase letters that repeat twice next lowercase letters", "[A-Z]{2}[a-z]+"),
-    ("'hello' then digits that appear between 2 and 5 times", "hello[0-9]{2,5}"),
-    ("digit or letter followed by space optional", "([0-9]|[a-zA-Z])\\s?")
-]
-
-RANGE_TESTS = [
-    ("range 'a' to 'f'", "[a-f]"),
-    ("range 'm' to 'z' one or more", "[m-z]+"),
-]
-
-GROUP_TESTS = [
-    ("group digit followed by digit end group 3 times", "([0-9][0-9]){3}"),
-    ("group 'a' followed by digit end group or 'hello'", "(a[0-9]|hello)")
-]
-
-ERROR_TESTS = [
-    ("digit followedby letter", None),
-    ("3 times digit", None),
-    ("range 'z' to 'a'", None),  # rango invertido → debe fallar semánticamente
-]
-
-VOWEL_TESTS = [
-    ("vowel", "[AEIOUaeiou]"),
-    ("vowels", "[AEIOUaeiou]+"),
-    ("vowel followed by consonant", "[AEIOUaeiou][BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz]"),
-]
-
-HEX_TESTS = [
-    ("hex digit", "[0-9A-Fa-f]"),
-    ("hex digits", "[0-9A-Fa-f]+"),
-]
-
-WORD_TESTS = [
-    ("word character one or more", r"\w+"),
-]
-
-ALNUM_TESTS = [
-    ("alphanumeric 3 times", "[A-Za-z0-9]{3}"),
-]
-
-NONSPACE_TESTS = [
-    ("non whitespace one or more", r"\S+"),
-]
-
-
-# ============================================================
-# MAIN
-# ============================================================
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--verbose", action="store_true")
-    args = parser.parse_args()
-
-    print("\n=== PRUEBAS BÁSICAS ===")
-    for phrase, expected in BASIC_TESTS:
-        test_case(phrase, expected, args.verbose)
-
-    print("\n=== PRUEBAS DE RANGO ===")
-    for phrase, expected in RANGE_TESTS:
-        test_case(phrase, expected, args.verbose)
-
-    print("\n=== PRUEBAS DE GRUPOS ===")
-    for phrase, expected in GROUP_TESTS:
-=======
 """
 Módulo `test.py`
 
@@ -225,6 +115,8 @@ CLASS_TESTS = [
     ("hex digit one or more", "[0-9A-Fa-f]+"),
     ("word character one or more", r"\w+"),
     ("non whitespace one or more", r"\S+"),
+    ("digit or letter or space", r"[0-9A-Za-z\s]"),
+    ("vowel or consonant one or more", "([AEIOUaeiou]|[BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz]+)"),
 ]
 
 # Pruebas centradas en distintos cuantificadores
@@ -236,6 +128,8 @@ QUANTIFIER_TESTS = [
     ("digit between 2 and 5 times", "[0-9]{2,5}"),
     ("digit at least 2 times", "[0-9]{2,}"),
     ("digit at most 4 times", "[0-9]{0,4}"),
+    ("digit 1 or more", "[0-9]+"),
+    ("digit 0 or more", "[0-9]*"),
 ]
 
 # Pruebas para números en inglés “ilimitados” (más allá del 10)
@@ -245,6 +139,24 @@ ENGLISH_NUMBER_TESTS = [
     ("digit one hundred and five times", "[0-9]{105}"),
     ("digit two thousand and eight times", "[0-9]{2008}"),
     ("hex digit three hundred forty one times", "[0-9A-Fa-f]{341}"),
+    ("digit between two and five times", "[0-9]{2,5}"),
+]
+
+# Sinónimos de varias palabras y literales que no deben expandirse
+SYNONYM_TESTS = [
+    ("space characters", r"\s+"),
+    ("non whitespace characters", r"\S+"),
+    ("hex digits then letters", "[0-9A-Fa-f]+[A-Za-z]+"),
+    ("'digits' followed by digit", "digits[0-9]"),
+]
+
+# Frases que los dos modos del normalizador deben dejar igual
+NORMALIZER_MODE_TESTS = [
+    "digit 1 or more",
+    "letters 0 or more",
+    "digit 0 or more followed by letter 1 or more",
+    "group digit end group 1 or more 3 times",
+    "3 digits then optionally letters",
 ]
 
 # Frases que deberían fallar (el parser debe rechazarlas)
@@ -252,6 +164,1079 @@ ERROR_TESTS = [
     ("digit followedby letter", None),  # falta el espacio en "followed by"
 ]
 
+# Simplificador: regex cruda → regex simplificada
+SIMPLIFY_TESTS = [
+    ("([0-9])+", "[0-9]+"),
+    ("(a|c|b)", "[abc]"),
+    ("([0-9]|[1-9])", "[0-9]"),
+    (r"([0-9]|[a-zA-Z]|\s)", r"[0-9A-Za-z\s]"),
+    (r"(\.|a|_|[b-d])", r"[a-d\._]"),
+    ("([0-9]+|c|d)", "([0-9]+|[cd])"),    # solo ramas vecinas: no cambia el orden
+    ("(c|[0-9]+|d)", "(c|[0-9]+|d)"),
+    ("(.|a)", "(.|a)"),                  # "." dentro de una clase sería literal
+    ("(hello|help|helm|world)", "(hel(?:[mp]|lo)|world)"),
+    ("(hello|hel)", "(hel(?:lo)?)"),
+    ("(hel|hello)", "(hel(?:|lo))"),    # "hel" se sigue probando antes
+    ("(walking|talking)", "([tw]alking)"),
+    ("(ab|A)", "(ab|A)"),                # con re.I las dos ramas coinciden con "ab"
+    ("(ax|Ab|abc)", "(ax|Ab|abc)"),
+    ("(sa|\u017fb|sc)", "(sa|\u017fb|sc)"),  # re.I iguala "ſ" (U+017F) a "s"
+    ("(a.c|abd)", "(a.c|abd)"),          # "." no es texto fijo
+    ("(?:ab|ac)d", "(?:a[bc])d"),
+    ("([^a]|b)", "([^a]|b)"),
+    ("[0-9][0-9][0-9]", "[0-9]{3}"),
+    ("[0-9]{2}[0-9]{3}", "[0-9]{5}"),
+    ("[0-9][0-9]*", "[0-9]+"),          # el optimizador textual daba [0-9]{2}*
+    ("[a-z]{2}[a-z]*", "[a-z]{2,}"),
+    ("(ab)(ab)+", "(ab){2,}"),
+    ("((a|b)c)(x)", "([ab]c)x"),         # grupos anidados
+    ("x{1}?", "x{1}?"),                  # modificador perezoso: no se toca
+    ("[zaq]", "[aqz]"),
+    ("hello", "hello"),
+]
+
+
+def check_simplify(verbose: bool = False) -> bool:
+    """Comprueba `simplify_regex` sobre regex escritas a mano."""
+    ok = True
+    for raw, expected in SIMPLIFY_TESTS:
+        regex = simplify_regex(raw)
+        passed = regex == expected and validate_regex(regex)
+        ok = ok and passed
+        if verbose or not passed:
+            print()
+            print("Regex:", raw)
+            print("Simplificada:", regex)
+            print("Esperado:", expected)
+            print("Resultado:", "OK" if passed else "FALLÓ")
+    return ok
+
+
+def check_normalizer_modes(verbose: bool = False) -> bool:
+    """
+    El modo "tokens" (el del pipeline) da el mismo DSL que el modo
+    "text" (`Normalizer.normalize_text`) y su mapa de posiciones cubre el
+    DSL palabra a palabra.
+    """
+    from normalizer import Normalizer
+
+    tokens, text = Normalizer(mode="tokens"), Normalizer(mode="text")
+    ok = True
+    for phrase in NORMALIZER_MODE_TESTS:
+        dsl, spans = tokens.normalize_with_spans(phrase)
+        expected = text.normalize_text(phrase)
+        words = [dsl[start:end] for start, end, _, _ in spans]
+        passed = dsl == expected and words == dsl.split()
+        ok = ok and passed
+        if verbose or not passed:
+            print()
+            print("Frase:", phrase)
+            print("Modo tokens:", dsl, spans)
+            print("Modo texto: ", expected)
+            print("Resultado:", "OK" if passed else "FALLÓ – los modos no coinciden")
+    return ok
+
+
+def check_factoring(verbose: bool = False, trials: int = 300) -> bool:
+    """
+    La factorización de alternativas literales no cambia qué ni cómo
+    coincide: para alternativas aleatorias, la regex simplificada da el
+    mismo tramo con match, search y fullmatch (también seguida de un
+    contexto que obliga a retroceder), con y sin `re.IGNORECASE`, y no
+    añade grupos de captura.
+    """
+    import itertools
+    import random
+    import re
+
+    rng = random.Random(0)
+    texts = ["".join(p) for n in range(6) for p in itertools.product("abc", repeat=n)]
+    failures = []
+    for _ in range(trials):
+        words = ["".join(rng.choices("abcA", k=rng.randint(0, 4))) for _ in range(rng.randint(2, 7))]
+        raw = "(" + "|".join(words) + ")"
+        simplified = simplify_regex(raw)
+        for context, flags in itertools.product(("", "c", "b?c", "a*"), (0, re.I)):
+            before, after = re.compile(raw + context, flags), re.compile(simplified + context, flags)
+            if after.groups > 1:
+                failures.append((raw, simplified))
+            for text, method in itertools.product(texts, ("match", "search", "fullmatch")):
+                m1, m2 = getattr(before, method)(text), getattr(after, method)(text)
+                if (m1 and m1.span()) != (m2 and m2.span()):
+                    failures.append((raw, simplified, context, flags, text, method))
+    ok = not failures
+    if verbose or not ok:
+        print()
+        for failure in failures[:5]:
+            print("Fallo:", failure)
+        print("Resultado:", "OK" if ok else "FALLÓ – la factorización cambia las coincidencias")
+    return ok
+
+
+def check_cache(verbose: bool = False) -> bool:
+    """
+    Comprueba que la caché del pipeline registre aciertos, guarde los
+    errores por separado y comparta el resultado entre frases que se
+    normalizan al mismo DSL (segundo nivel). El nivel de la IR canónica
+    sigue acertando tras vaciar la tabla de hash-consing.
+    """
+    import lark_parser
+    from lark_parser import clear_cache, cache_stats, configure_cache
+
+    clear_cache()
+    translate_to_regex("digit one or more")
+    translate_to_regex("digit one or more")
+    translate_to_regex("digit followedby letter")
+    stats = cache_stats()
+
+    configure_cache()
+    variants = ["digits", "numbers", "the digits please", "digits pattern", "digits"]
+    regexes = {translate_to_regex(p) for p in variants}
+    # Otro DSL con la misma IR: acierta en el nivel de la IR canónica
+    same_ir = translate_to_regex("range '0' to '9' one or more")
+    levels = cache_stats()
+    # Sin tabla ni niveles anteriores la IR nueva es otro objeto, con el mismo hash
+    ir_hits = levels["ir"]["hits"]
+    lark_parser.result_cache.clear()
+    lark_parser.dsl_cache.clear()
+    lark_parser.translator.nodes.clear()
+    after_reset = (translate_to_regex("digits"), cache_stats()["ir"]["hits"] - ir_hits)
+    configure_cache()
+
+    ok = (
+        stats["results"]["hits"] == 1
+        and stats["results"]["size"] == 1
+        and stats["errors"]["size"] == 1
+        and stats["normalized"]["size"] == 1    # el error no pasa al nivel del DSL
+        and regexes == {"[0-9]+"} and same_ir == "[0-9]+"
+        and levels["normalized"]["misses"] == 2 and levels["normalized"]["hits"] == 3
+        and levels["ir"]["misses"] == 1 and levels["ir"]["hits"] == 1
+        and levels["hit_rates"] == {"phrase": 0.1667, "normalized": 0.6, "ir": 0.5}
+        and after_reset == ("[0-9]+", 1)
+    )
+    if verbose or not ok:
+        print()
+        print("Estadísticas:", stats)
+        print("Niveles:", levels, "| tras vaciar la tabla:", after_reset)
+        print("Resultado:", "OK" if ok else "FALLÓ – contadores inesperados")
+    return ok
+
+
+def check_batch(verbose: bool = False) -> bool:
+    """
+    Comprueba el modo por lotes: un registro JSONL por línea no vacía y
+    los errores se registran sin detener el lote.
+    """
+    import io
+    import json
+    from batch import translate_stream
+
+    source = io.StringIO("letters then digits\n\ndigit followedby letter\nvowels\n")
+    out = io.StringIO()
+    summary = translate_stream(source, out)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    ok = (
+        summary == {"phrases": 3, "errors": 1, "invalid": 0}
+        and [r["line"] for r in records] == [1, 3, 4]
+        and records[0]["regex"] == "[A-Za-z]+[0-9]+"
+        and records[0]["normalized"] == "letter one or more followed by digit one or more"
+        and records[0]["valid"]
+        and records[1]["regex"] is None
+        and records[1]["error"].startswith("ERROR")
+        and records[2]["regex"] == "[AEIOUaeiou]+"
+        and all("total_ms" in r["timings"] for r in records)
+    )
+    if verbose or not ok:
+        print()
+        print("Resumen:", summary)
+        print(out.getvalue())
+        print("Resultado:", "OK" if ok else "FALLÓ – registros inesperados")
+    return ok
+
+
+def check_parallel(verbose: bool = False) -> bool:
+    """
+    Comprueba `translate_many` con varios procesos: mismo resultado y orden
+    que en serie, y un proceso que muere solo afecta a su frase.
+    """
+    import multiprocessing
+    import os
+    import batch
+
+    phrases = [p for p, _ in BASIC_TESTS + QUANTIFIER_TESTS + ERROR_TESTS] * 40
+    serial = batch.translate_many(phrases)
+    parallel = batch.translate_many(phrases, jobs=3)
+    ok = parallel == serial
+
+    # La simulación de la caída depende de que los procesos hereden el
+    # parche por fork (no disponible en todas las plataformas)
+    if multiprocessing.get_start_method() == "fork":
+        original = batch.translate_record
+
+        def crashing(phrase, simplify=True, match=None, capture=True, redos=False):
+            if phrase == "CRASH":
+                os._exit(1)
+            return original(phrase, simplify, match, capture, redos)
+
+        batch.translate_record = crashing
+        try:
+            pairs = enumerate(phrases[:50] + ["CRASH"] + phrases[:50], start=1)
+            records = list(batch.ParallelTranslator(2, simplify=False, chunksize=8).run(pairs))
+        finally:
+            batch.translate_record = original
+        ok = ok and (
+            [r["line"] for r in records] == list(range(1, 102))
+            and records[50]["error"] == batch.WORKER_CRASH_ERROR
+            and [r["regex"] or r["error"] for r in records[51:]] == serial[:50]
+        )
+
+    if verbose or not ok:
+        print()
+        print(f"Frases: {len(phrases)}")
+        print("Resultado:", "OK" if ok else "FALLÓ – resultados distintos en paralelo")
+    return ok
+
+
+def check_server(verbose: bool = False) -> bool:
+    """
+    Levanta el servidor en un hilo y comprueba traducción, prueba,
+    errores por petición, clientes concurrentes y cierre limpio.
+    """
+    import os
+    import tempfile
+    import threading
+    import client
+    import server
+
+    path = os.path.join(tempfile.mkdtemp(), "test.sock")
+    ready = threading.Event()
+    thread = threading.Thread(target=server.serve, args=(path, ready.set), daemon=True)
+    thread.start()
+    ready.wait(10)
+
+    def ask(**payload):
+        return client.request(payload, path, spawn=False)
+
+    results = []
+
+    def worker(n):
+        results.append(ask(op="translate", phrase=f"digit {n} times")["regex"])
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(2, 10)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    translated = ask(op="translate", phrase="letters then digits")
+    tested = ask(op="test", phrase="digits", text="123")
+    modes = [ask(op="translate", phrase="'x' or 'yz'")["regex"],
+             ask(op="translate", phrase="'x' or 'yz'", capture=False)["regex"]]
+    failed = ask(op="translate", phrase="digit followedby letter")
+    bogus = ask(op="bogus")
+    stopped = ask(op="shutdown")
+    thread.join(10)
+
+    ok = (
+        translated["regex"] == "[A-Za-z]+[0-9]+"
+        and tested["match"] is True
+        and modes == ["(x|yz)", "(?:x|yz)"]
+        and failed["ok"] and failed["regex"] is None and failed["error"].startswith("ERROR")
+        and not bogus["ok"]
+        and sorted(results) == sorted(f"[0-9]{{{n}}}" for n in range(2, 10))
+        and stopped["ok"]
+        and not thread.is_alive()
+        and not os.path.exists(path)
+    )
+    if verbose or not ok:
+        print()
+        print("Respuestas:", translated, tested, modes, failed, bogus, sep="\n  ")
+        print("Resultado:", "OK" if ok else "FALLÓ – respuestas inesperadas del servidor")
+    return ok
+
+
+def check_async(verbose: bool = False) -> bool:
+    """
+    `translate_async`: resultados iguales a `translate_to_regex`, frases
+    idénticas en vuelo coalescidas, peticiones simultáneas en un solo lote
+    y las de otro modo de captura, aunque sean de la misma frase, aparte.
+    """
+    import asyncio
+    from async_api import AsyncTranslator, translate_async
+
+    phrases = ["digit {} times".format(n) for n in range(2, 7)] * 10
+
+    async def scenario():
+        translator = AsyncTranslator(window=0.01)
+        results = await asyncio.gather(*(translator.translate(p) for p in phrases))
+        single = await translate_async("letters then digits")
+        error = await translate_async("digit followedby letter")
+        modes = await asyncio.gather(
+            translate_async("'x' or 'yz'", True),
+            translate_async("'x' or 'yz'", True, capture=False),
+        )
+        return results, translator.stats(), single, error, modes
+
+    results, stats, single, error, modes = asyncio.run(scenario())
+    ok = (
+        results == [translate_to_regex(p) for p in phrases]
+        and stats == {"requests": 50, "coalesced": 45, "batches": 1, "inflight": 0}
+        and single == translate_to_regex("letters then digits")
+        and error.startswith("ERROR")
+        and modes == ["(x|yz)", "(?:x|yz)"]
+    )
+    if verbose or not ok:
+        print()
+        print("Estadísticas:", stats, "| con y sin captura:", modes)
+        print("Resultado:", "OK" if ok else "FALLÓ – resultados o lotes inesperados")
+    return ok
+
+
+def check_profile(verbose: bool = False) -> bool:
+    """
+    `profile_phrase` mide cada fase y da la misma regex que el pipeline;
+    `TimingHistogram` calcula percentiles con ~1% de error.
+    """
+    import io
+    from batch import translate_stream
+    from profiler import profile_phrase, TimingHistogram
+
+    phrase = "letters then digits that appear three times"
+    profile = profile_phrase(phrase)
+    failed = profile_phrase("digit followedby letter", memory=False)
+
+    histogram = TimingHistogram()
+    for ms in range(1, 101):
+        histogram.add({"total_ms": float(ms)})
+    summary = histogram.summary()["total_ms"]
+
+    batch = translate_stream(["digits\n", "vowels\n"], io.StringIO(), profile=True)
+
+    ok = (
+        profile["regex"] == translate_to_regex(phrase, simplify=True)
+        and profile["error"] is None
+        and list(profile["stages"]) == ["normalize", "parse", "translate",
+                                        "simplify", "serialize", "validate"]
+        and all({"ms", "alloc_kb", "peak_kb"} <= set(s) for s in profile["stages"].values())
+        and profile["ir_nodes"] >= profile["simplified_nodes"] > 0
+        and failed["error"].startswith("ERROR")
+        and list(failed["stages"]) == ["normalize"]
+        and summary["count"] == 100 and summary["max"] == 100.0
+        and abs(summary["p50"] - 50) <= 1 and abs(summary["p99"] - 99) <= 1.5
+        and batch["profile"]["total_ms"]["count"] == 2
+    )
+    if verbose or not ok:
+        print()
+        print("Perfil:", profile)
+        print("Percentiles:", summary)
+        print("Resultado:", "OK" if ok else "FALLÓ – perfil inesperado")
+    return ok
+
+
+def check_bench_suite(verbose: bool = False) -> bool:
+    """
+    La suite de rendimiento mide todas las fases y `compare` detecta las
+    regresiones que superan el umbral (y solo esas).
+    """
+    import copy
+    from bench_suite import run_suite, compare, STAGES
+
+    current = run_suite(size=20, rounds=1)
+    keys = {f"{c}/{s}" for c in ("tests", "synthetic") for s in STAGES}
+
+    baseline = copy.deepcopy(current)
+    slower = copy.deepcopy(current)
+    slower["results"]["synthetic/parse"]["throughput"] /= 2
+    slower["results"]["tests/normalize"]["throughput"] *= 0.9   # dentro del umbral
+    heavier = copy.deepcopy(current)
+    heavier["results"]["tests/simplify"]["peak_kib"] *= 1.5
+
+    regressions = compare(slower, baseline, threshold=0.25)
+    ok = (
+        set(current["results"]) == keys
+        and all(m["throughput"] > 0 and m["p99_us"] >= m["p50_us"] > 0
+                for m in current["results"].values())
+        and compare(current, baseline) == []
+        and [(k, m) for k, m, *_ in regressions] == [("synthetic/parse", "throughput")]
+        and [(k, m) for k, m, *_ in compare(heavier, baseline)] == [("tests/simplify", "peak_kib")]
+    )
+    if verbose or not ok:
+        print()
+        print("Regresiones:", regressions)
+        print("Resultado:", "OK" if ok else "FALLÓ – comparación con la línea base")
+    return ok
+
+
+def check_generator(verbose: bool = False) -> bool:
+    """
+    `PhraseGenerator`: salida reproducible con semilla, frases válidas con
+    regex compilables, y los parámetros de estructura se respetan.
+    """
+    from phrase_generator import PhraseGenerator
+
+    phrases = list(PhraseGenerator(seed=7, max_depth=3, or_fanout=4).phrases(500))
+    again = list(PhraseGenerator(seed=7, max_depth=3, or_fanout=4).phrases(500))
+    regexes = [translate_to_regex(p) for p in phrases]
+    invalid = [p for p, r in zip(phrases, regexes) if r.startswith("ERROR") or not validate_regex(r)]
+
+    flat = " ".join(PhraseGenerator(seed=1, max_depth=0, or_fanout=1, natural=0).phrases(300))
+    optional = " ".join(PhraseGenerator(
+        seed=1, natural=0, quantifier_mix={"r_optional": 1}, group_probability=0,
+    ).phrases(300))
+    broken = list(PhraseGenerator(seed=1, near_valid=1.0).phrases(300))
+    broken_errors = sum(translate_to_regex(p).startswith("ERROR") for p in broken)
+
+    ok = (
+        phrases == again
+        and not invalid
+        and "group" not in flat
+        and flat.count(" or ") == flat.count(" or more")
+        and "times" not in optional and "one or more" not in optional and "optional" in optional
+        and broken_errors > len(broken) // 2
+    )
+    if verbose or not ok:
+        print()
+        print("Inválidas:", invalid[:5])
+        print(f"Casi-válidas rechazadas: {broken_errors}/{len(broken)}")
+        print("Resultado:", "OK" if ok else "FALLÓ – frases generadas inesperadas")
+    return ok
+
+
+def check_patterns(verbose: bool = False) -> bool:
+    """
+    Caché de patrones compilados: cada regex se compila una sola vez (más
+    allá de las 512 entradas de `re`) y el mismo `re.Pattern` llega a la
+    validación, a `translate` y a los registros con "match".
+    """
+    import io
+    import re
+    import utils
+    from batch import translate_stream
+    from lark_parser import translate, configure_cache
+
+    configure_cache(pattern_maxsize=2000)
+    try:
+        result = translate("digits")
+        same = translate("numbers")            # otra frase, misma regex
+        failed = translate("digit followedby letter")
+
+        regexes = [f"a{{{n}}}" for n in range(600)]
+        first = [utils.compile_regex(r) for r in regexes]
+        second = [utils.compile_regex(r) for r in regexes]
+        misses = utils.pattern_cache_stats()["misses"]
+
+        errors = 0
+        for _ in range(2):
+            try:
+                utils.compile_regex("a(")
+            except re.error:
+                errors += 1
+        invalid_stats = utils.pattern_cache_stats()
+
+        out = io.StringIO()
+        summary = translate_stream(["digits\n", "letters\n"], out, match="42")
+        records = [r for r in out.getvalue().splitlines()]
+    finally:
+        configure_cache()
+
+    ok = (
+        result.valid and result.regex == "[0-9]+" and result.matches("123")
+        and not result.matches("12a")
+        and same.pattern is result.pattern
+        and failed.error.startswith("ERROR") and failed.pattern is None and not failed.valid
+        and all(a is b for a, b in zip(first, second))
+        and misses == 1 + len(regexes)            # "[0-9]+" y las 600 de prueba
+        and errors == 2 and invalid_stats["misses"] == misses + 1
+        and summary["matches"] == 1
+        and '"match": true' in records[0] and '"match": false' in records[1]
+    )
+    if verbose or not ok:
+        print()
+        print("Resultado de translate:", result, same, failed, sep="\n  ")
+        print("Fallos de la caché:", misses, invalid_stats)
+        print("Resultado:", "OK" if ok else "FALLÓ – patrones compilados más de una vez")
+    return ok
+
+
+def _disk_cache_writer(path: str, namespace: str, worker: int) -> int:
+    """Proceso de `check_disk_cache`: 50 escrituras sueltas; devuelve sus errores."""
+    from disk_cache import DiskCache
+
+    cache = DiskCache(path, namespace)
+    for i in range(50):
+        cache.put(f"frase {worker}-{i}", True, None, f"r{worker}-{i}")
+    return cache.errors
+
+
+def check_disk_cache(verbose: bool = False) -> bool:
+    """
+    Caché en disco: sobrevive a vaciar la caché en memoria (como un
+    proceso nuevo), no sirve entradas de otra versión del traductor,
+    desaloja por tamaño, admite escrituras simultáneas de varios procesos,
+    separa las entradas con y sin grupos de captura, vacía los archivos
+    anteriores a esa columna y no rompe la traducción si el archivo no se
+    puede abrir.
+    """
+    import multiprocessing
+    import os
+    import sqlite3
+    import tempfile
+    import lark_parser
+    from cache import MISSING
+    from disk_cache import DiskCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        lark_parser.configure_disk_cache(path)
+        try:
+            regex = lark_parser.translate_to_regex("letters then digits", True)
+            lark_parser.clear_cache()
+            again = lark_parser.translate_to_regex("letters then digits", True)
+            disk = lark_parser.cache_stats()["disk"]
+            warm = lark_parser.warm_disk_cache(["digits\n", "\n", "digits\n", "bogus ??\n"])
+            rewarm = lark_parser.warm_disk_cache(["digits", "bogus ??"])
+            modes = [lark_parser.translate_to_regex("'x' or 'yz'", True, capture)
+                     for capture in (True, False)]
+            lark_parser.clear_cache()
+            modes += [lark_parser.translate_to_regex("'x' or 'yz'", True, capture)
+                      for capture in (True, False)]
+        finally:
+            lark_parser.configure_disk_cache(None)
+        namespace = lark_parser.cache_namespace()
+        stored = DiskCache(path, namespace).get("letters then digits", True)
+        stale = DiskCache(path, "otra-version").get("letters then digits", True)
+
+        small = DiskCache(os.path.join(tmp, "small.sqlite3"), "v", max_entries=3)
+        for i in range(5):
+            small.put(f"p{i}", False, None, f"r{i}")
+        small.evict()
+        kept = [small.get(f"p{i}", False) is not MISSING for i in range(5)]
+
+        shared = os.path.join(tmp, "shared.sqlite3")
+        DiskCache(shared, "v").clear()   # crea el esquema antes de lanzar los procesos
+        with multiprocessing.get_context("fork").Pool(4) as pool:
+            errors = pool.starmap(_disk_cache_writer, [(shared, "v", w) for w in range(4)])
+        concurrent = DiskCache(shared, "v")
+        written = len(concurrent)
+        sample = concurrent.get("frase 3-49", True)
+
+        old = os.path.join(tmp, "old.sqlite3")
+        with sqlite3.connect(old) as conn:
+            conn.execute("CREATE TABLE translations (namespace TEXT, phrase TEXT, simplify INTEGER, "
+                         "normalized TEXT, regex TEXT, last_used REAL)")
+            conn.execute("INSERT INTO translations VALUES ('v', 'p', 1, NULL, 'r', 0)")
+        conn.close()
+        migrated = DiskCache(old, "v")
+        migrated.put("q", True, None, "s", capture=False)
+        after_migration = (migrated.get("p", True), migrated.get("q", True, False),
+                           migrated.get("q", True), migrated.errors)
+
+        # Un archivo normal en el lugar del directorio: la caché no se puede abrir
+        blocker = os.path.join(tmp, "no-es-directorio")
+        open(blocker, "w").close()
+        lark_parser.configure_disk_cache(os.path.join(blocker, "cache.sqlite3"))
+        try:
+            lark_parser.clear_cache()
+            unusable = (lark_parser.translate_to_regex("digits", True),
+                        lark_parser.warm_disk_cache(["digits"]),
+                        lark_parser.cache_stats()["disk"]["errors"] > 0)
+        finally:
+            lark_parser.configure_disk_cache(None)
+
+    ok = (
+        regex == again == "[A-Za-z]+[0-9]+"
+        and disk["hits"] == 1 and disk["misses"] == 1 and disk["size"] == 1
+        and warm == {"phrases": 3, "cached": 1, "added": 2, "errors": 1}
+        and rewarm == {"phrases": 2, "cached": 2, "added": 0, "errors": 0}
+        and stored == ("letter one or more followed by digit one or more", "[A-Za-z]+[0-9]+")
+        and stale is MISSING
+        and kept == [False, False, True, True, True]
+        and errors == [0, 0, 0, 0] and written == 200 and sample == (None, "r3-49")
+        and modes == ["(x|yz)", "(?:x|yz)"] * 2
+        and after_migration == (MISSING, (None, "s"), MISSING, 0)
+        and unusable == ("[0-9]+", {"phrases": 1, "cached": 0, "added": 1, "errors": 0}, True)
+    )
+    if verbose or not ok:
+        print()
+        print("Regex:", regex, again, "| disco:", disk)
+        print("Precarga:", warm, rewarm)
+        print("Entrada guardada:", stored, "| otra versión:", stale)
+        print("Desalojo (quedan):", kept)
+        print("Escrituras concurrentes:", errors, written, sample)
+        print("Con y sin captura:", modes, "| archivo antiguo:", after_migration)
+        print("Ruta inutilizable:", unusable)
+        print("Resultado:", "OK" if ok else "FALLÓ – caché en disco")
+    return ok
+
+
+def _engine_result(normalized: str, engine: str):
+    """Regex producida por un motor, o "ERROR" si rechaza la frase."""
+    from lark_parser import parse_and_translate
+
+    try:
+        return parse_and_translate(normalized, engine)
+    except Exception:
+        return "ERROR"
+
+
+def generated_dsl_corpus(size: int = 2000, seed: int = 0):
+    """
+    Corpus aleatorio (reproducible) de frases DSL: secuencias de palabras
+    clave, literales y números. La mayoría son inválidas a propósito, para
+    comparar también qué frases rechaza cada motor.
+    """
+    import random
+    from fast_parser import KEYWORDS
+
+    rng = random.Random(seed)
+    vocabulary = KEYWORDS + ["'a'", "'hello'", "''", "3", "12"]
+    structured = [
+        "group {0} followed by {1} end group {2}",
+        "{0} or {1} or {2}",
+        "{0} followed by {1} followed by {2}",
+        "range 'a' to 'z' {2}",
+        "{0} except {1}",
+    ]
+    terms = ["digit", "letter", "'x'", "hex digit", "any character", "'abc'"]
+    reps = ["one or more", "3 times", "between 2 and 4 times", "optional", "at most 2 times", ""]
+
+    corpus = []
+    for _ in range(size // 2):
+        corpus.append(" ".join(rng.choices(vocabulary, k=rng.randint(1, 7))))
+        corpus.append(rng.choice(structured).format(
+            rng.choice(terms) + " " + rng.choice(reps),
+            rng.choice(terms),
+            rng.choice(reps),
+        ).strip())
+    return corpus
+
+
+def check_engines(verbose: bool = False) -> bool:
+    """
+    Prueba diferencial: los motores "lark" y "fast" deben producir la misma
+    regex (o rechazar la misma frase) para todos los casos de este archivo
+    y para un corpus generado.
+    """
+    from lark_parser import normalize_text
+
+    phrases = [
+        normalize_text(p)
+        for group in (
+            BASIC_TESTS, RANGE_TESTS, CLASS_TESTS, QUANTIFIER_TESTS,
+            ENGLISH_NUMBER_TESTS, SYNONYM_TESTS, ERROR_TESTS,
+        )
+        for p, _ in group
+    ]
+    phrases += generated_dsl_corpus()
+
+    mismatches = [
+        (dsl, _engine_result(dsl, "lark"), _engine_result(dsl, "fast"))
+        for dsl in phrases
+        if _engine_result(dsl, "lark") != _engine_result(dsl, "fast")
+    ]
+    ok = not mismatches
+    if verbose or not ok:
+        print()
+        print(f"Frases comparadas: {len(phrases)}")
+        for dsl, lark_r, fast_r in mismatches[:10]:
+            print(f"  '{dsl}': lark={lark_r} fast={fast_r}")
+        print("Resultado:", "OK" if ok else f"FALLÓ – {len(mismatches)} diferencias")
+    return ok
+
+
+
+def check_ir(verbose: bool = False) -> bool:
+    """
+    Comprueba que el traductor construye la IR tipada (cuantificadores
+    como nodos `Repeat`, `or` como `Group(Alt)`) y que `to_regex` la
+    serializa igual que la ruta de texto.
+    """
+    from lark_parser import parse_to_ir
+    from regex_ir import Alt, CharClass, Group, Repeat, to_regex
+
+    rep = parse_to_ir("one or more digit optional")
+    alt = parse_to_ir("digit or letter except 'a'")
+    ok = (
+        isinstance(rep, Repeat)
+        and isinstance(rep.child, Repeat)
+        and (rep.child.quantifier.min, rep.child.quantifier.max) == (1, None)
+        and (rep.quantifier.min, rep.quantifier.max) == (0, 1)
+        and to_regex(rep) == "[0-9]+?"
+        and isinstance(alt, Group)
+        and isinstance(alt.child, Alt)
+        and isinstance(alt.child.branches[1], CharClass)
+        and alt.child.branches[1].negated
+        and to_regex(alt) == "([0-9]|[^a])"
+    )
+    if verbose or not ok:
+        print()
+        print("IR:", rep, alt, sep="\n  ")
+        print("Resultado:", "OK" if ok else "FALLÓ – estructura inesperada")
+    return ok
+
+
+def check_hashcons(verbose: bool = False) -> bool:
+    """
+    Hash-consing de la IR: los subárboles repetidos son el mismo objeto
+    (con los dos motores), `canonical_hash` no depende de la frase ni de
+    cómo se construyó el árbol y el optimizador da lo mismo sobre un árbol
+    compartido que sobre uno sin compartir.
+    """
+    from fast_parser import FastParser
+    from lark_parser import parse_to_ir, translator
+    from regex_ir import NodeTable, canonical_hash, parse_regex, to_regex
+    from translator import RegexTranslator
+    from utils import optimize_regex
+
+    sub = "group digit followed by letter end group"
+    dsl = " followed by ".join([f"{sub} one or more"] * 3)
+    shared = parse_to_ir(dsl)
+    fast = FastParser(translator).parse(dsl)
+    plain = FastParser(RegexTranslator(nodes=NodeTable(maxsize=0))).parse(dsl)
+
+    lower = parse_to_ir("lowercase letter")
+    ranged = parse_to_ir("range 'a' to 'z'")
+    nested = parse_regex("(ab|c)d")
+    table = NodeTable()
+    canonical = table.canonicalize(nested)
+    memo = NodeTable()
+    remembered = [memo.canonical_hash(shared), memo.canonical_hash(shared)]
+    memo.clear()
+    remembered.append(memo.canonical_hash(plain))
+
+    ok = (
+        all(item is shared.items[0] for item in shared.items)
+        and fast is shared
+        and plain is not shared and plain.items[0] is not plain.items[1]
+        and canonical_hash(plain) == canonical_hash(shared)
+        and to_regex(optimize_regex(plain)) == to_regex(optimize_regex(shared)) == "([0-9][a-zA-Z])+" * 3
+        and lower is ranged and canonical_hash(lower) == canonical_hash(parse_regex("[a-z]"))
+        and canonical_hash(shared) != canonical_hash(parse_to_ir("digit"))
+        and table.canonicalize(parse_regex("(ab|c)d")) is canonical
+        and to_regex(canonical) == "(ab|c)d"
+        and remembered == [canonical_hash(shared)] * 3
+    )
+    if verbose or not ok:
+        print()
+        print("Compartido:", shared, "\n  sin compartir:", plain)
+        print("Hashes:", canonical_hash(shared), canonical_hash(plain))
+        print("Resultado:", "OK" if ok else "FALLÓ – subárboles no compartidos")
+    return ok
+
+
+def check_deep(verbose: bool = False, limit: float = 5.0, max_mib: float = 64.0) -> bool:
+    """
+    Entradas que antes agotaban la pila: 10.000 alternativas en una sola
+    cadena "or" y 5.000 grupos anidados. Con los dos motores, con el árbol
+    de Lark y con el explicador, cada traducción debe terminar en menos de
+    `limit` segundos, y la del motor rápido sin pasar de `max_mib` MiB de
+    memoria.
+    """
+    import time
+    import tracemalloc
+    import lark_parser
+    from utils import compile_regex
+    from explain import explain_tree, pretty_tree
+    from regex_ir import to_regex
+
+    words = [f"w{i}" for i in range(10000)]
+    alternatives = "(" + "|".join(words) + ")"
+    cases = [
+        (" or ".join(f"'{w}'" for w in words), alternatives, simplify_regex(alternatives)),
+        ("group " * 5000 + "digit" + " end group" * 5000,
+         "(" * 5000 + "[0-9]" + ")" * 5000, "[0-9]"),
+        ("group 'a' followed by " * 5000 + "'b'" + " end group" * 5000,
+         "(a" * 5000 + "b" + ")" * 5000, "(a" * 5000 + "b" + ")" * 5000),
+    ]
+    ok = (
+        lark_parser.translate_to_regex("'a' or 'b' or 'c'", simplify=True) == "[abc]"
+        and all(compile_regex(cases[0][2]).fullmatch(w) for w in words)
+    )
+    failures = []
+    previous = lark_parser.engine
+    try:
+        for phrase, raw, simplified in cases:
+            for engine in lark_parser.ENGINES:
+                lark_parser.set_engine(engine)
+                lark_parser.clear_cache()
+                start = time.perf_counter()
+                results = (lark_parser.translate_to_regex(phrase),
+                           lark_parser.translate_to_regex(phrase, simplify=True))
+                elapsed = time.perf_counter() - start
+                if results != (raw, simplified) or elapsed > limit:
+                    failures.append((engine, phrase[:40], elapsed, results[0][:60]))
+
+            lark_parser.clear_cache()
+            tracemalloc.start()
+            lark_parser.translate_to_regex(phrase, simplify=True)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            if peak > max_mib:
+                failures.append(("memoria", phrase[:40], peak))
+
+            start = time.perf_counter()
+            tree = lark_parser.parse_normalized(lark_parser.normalize_text(phrase))
+            explained, _ = explain_tree(tree)
+            pretty_tree(tree)
+            translated = to_regex(lark_parser.translate_tree_ir(tree))
+            elapsed = time.perf_counter() - start
+            if explained != raw or translated != raw or elapsed > limit:
+                failures.append(("árbol", phrase[:40], elapsed, translated[:60]))
+    finally:
+        lark_parser.set_engine(previous)
+        lark_parser.clear_cache()
+
+    ok = ok and not failures
+    if verbose or not ok:
+        print()
+        for failure in failures:
+            print("Fallo:", failure)
+        print("Resultado:", "OK" if ok else "FALLÓ – entradas profundas")
+    return ok
+
+
+def check_capture(verbose: bool = False) -> bool:
+    """
+    Modo sin captura (`capture=False`): las regex no tienen ningún grupo
+    de captura y aceptan exactamente lo mismo que las de siempre; las
+    cachés no mezclan los dos modos; el modo por lotes (también en
+    paralelo) respeta la opción; y las reglas textuales del
+    simplificador entienden `(?:...)`.
+    """
+    import io
+    import json
+    import lark_parser
+    from batch import translate_many, translate_stream
+    from regex_ir import drop_captures, parse_regex, to_regex
+    from utils import compile_regex, noncapturing_regex, simplify_regex_legacy
+
+    phrases = [
+        ("group letter followed by digit end group one or more", ["a1", "a1b2", "a", ""]),
+        ("'ab' or 'cd' or digit one or more", ["ab", "cd", "123", "abcd", ""]),
+        ("letter one or more followed by group ' ' followed by letter one or more end group zero or more",
+         ["hola", "hola mundo", "hola  mundo", "hola "]),
+        ("group group vowel then consonant end group 2 times then digit end group one or more",
+         ["abeb1", "abeb1ikok2", "ab1", ""]),
+        ("'hello' or 'help' or 'world'", ["hello", "help", "world", "hel"]),
+    ]
+    failures = []
+    lark_parser.clear_cache()
+    for phrase, samples in phrases:
+        for simplify in (False, True):
+            capturing = lark_parser.translate_to_regex(phrase, simplify)
+            plain = lark_parser.translate_to_regex(phrase, simplify, capture=False)
+            result = lark_parser.translate(phrase, simplify, capture=False)
+            accepts = [compile_regex(r).fullmatch(t) is not None
+                       for r in (capturing, plain) for t in samples]
+            half = len(samples)
+            if (compile_regex(plain).groups != 0 or compile_regex(capturing).groups == 0
+                    or accepts[:half] != accepts[half:] or result.regex != plain
+                    or noncapturing_regex(capturing) != plain):
+                failures.append((phrase[:40], simplify, capturing, plain, accepts))
+
+    # `drop_captures` reutiliza los subárboles que no tienen grupos
+    node = parse_regex("[a-z]+([0-9]|x)")
+    dropped = drop_captures(node)
+    shared = dropped.items[0] is node.items[0] and to_regex(dropped) == "[a-z]+(?:[0-9]|x)"
+
+    source = "group digit end group 2 times\n'x' or 'yz'\n"
+    out = io.StringIO()
+    translate_stream(io.StringIO(source), out, capture=False)
+    records = [json.loads(line)["regex"] for line in out.getvalue().splitlines()]
+    many = translate_many(source.splitlines(), jobs=2, simplify=True, capture=False)
+
+    legacy = [simplify_regex_legacy(r) for r in
+              ("(?:[a-z])+", "(?:a)", "(?:a|b|c)", "(?:ab)(?:ab)*", "(?:ab)(?:ab)+",
+               "(?:[0-9]|[1-9])")]
+
+    ok = (
+        not failures
+        and shared
+        and records == ["[0-9]{2}", "(?:x|yz)"] and many == records
+        and legacy == ["[a-z]+", "a", "[abc]", "(?:ab)+", "(?:ab){2,}", "[0-9]"]
+    )
+    if verbose or not ok:
+        print()
+        for failure in failures:
+            print("Fallo:", failure)
+        print("Lotes:", records, many)
+        print("Reglas textuales:", legacy)
+        print("Resultado:", "OK" if ok else "FALLÓ – modo sin captura")
+    return ok
+
+
+def check_dfa(verbose: bool = False, trials: int = 200, limit: float = 2.0) -> bool:
+    """
+    Motor DFA (`dfa.py`) frente a `re`, con las regex de las tablas de
+    pruebas y cadenas aleatorias: `fullmatch` acepta lo mismo y `search`
+    empieza en el mismo sitio (con la coincidencia más larga desde ahí).
+    Además: una caché de estados diminuta no cambia el resultado, las
+    entradas hostiles para `re` y los 5.000 grupos anidados tardan menos
+    de `limit` segundos, y las construcciones no regulares se rechazan.
+    """
+    import random
+    import re
+    import time
+    from dfa import DFAPattern, compile_dfa
+
+    regexes = {expected for _, expected in
+               BASIC_TESTS + CLASS_TESTS + QUANTIFIER_TESTS + SYNONYM_TESTS}
+    regexes.update(r for pair in SIMPLIFY_TESTS for r in pair)
+    rng = random.Random(6)
+    failures = []
+    for regex in sorted(regexes):
+        alphabet = sorted(set(re.sub(r"[\\\[\]()|?*+{}^-]", "", regex)) | set("aZ09 _\n.é"))
+        pattern, automaton = re.compile(regex), compile_dfa(regex)
+        for _ in range(trials):
+            text = "".join(rng.choices(alphabet, k=rng.randint(0, 12)))
+            found, mine = pattern.search(text), automaton.search(text)
+            if ((pattern.fullmatch(text) is None) != (automaton.fullmatch(text) is None)
+                    or (found is None) != (mine is None)
+                    or (found and (mine.start() != found.start() or mine.end() < found.end()
+                                   or not pattern.fullmatch(text, *mine.span())))):
+                failures.append((regex, text, found, mine))
+                break
+
+    tiny = DFAPattern(r"(a|b)*a(a|b){6}", max_states=3)
+    reference = re.compile(tiny.pattern)
+    for _ in range(trials):
+        text = "".join(rng.choices("ab", k=rng.randint(0, 20)))
+        if (reference.fullmatch(text) is None) != (tiny.fullmatch(text) is None):
+            failures.append((tiny.pattern, text))
+    flushes = tiny.stats()["forward"]["flushes"]
+
+    start = time.perf_counter()
+    hostile = compile_dfa("([A-Za-z]+)+[0-9]")
+    slow_cases = (
+        hostile.search("a" * 20000 + "!") is None
+        and hostile.fullmatch("a" * 20000 + "1") is not None
+        and compile_dfa("(" * 5000 + "[0-9]" + ")" * 5000).fullmatch("7") is not None
+    )
+    elapsed = time.perf_counter() - start
+
+    rejected = []
+    for regex in ("^a", "a$", r"\bword", r"(a)\1", "a++", "(?=a)"):
+        try:
+            compile_dfa(regex)
+        except ValueError:
+            rejected.append(regex)
+
+    spans = [m.span() for m in compile_dfa("a*").finditer("baaab")]
+    ok = (
+        not failures and flushes > 0 and slow_cases and elapsed < limit
+        and len(rejected) == 6
+        and compile_dfa("(a|ab)").search("xab").span() == (1, 3)
+        and spans == [m.span() for m in re.finditer("a*", "baaab")]
+    )
+    if verbose or not ok:
+        print()
+        for failure in failures[:10]:
+            print("Fallo:", failure)
+        print("Vaciados con max_states=3:", flushes, "| entradas hostiles:", slow_cases,
+              f"{elapsed:.2f} s")
+        print("Rechazadas:", rejected, "| finditer:", spans)
+        print("Resultado:", "OK" if ok else "FALLÓ – motor DFA")
+    return ok
+
+
+REDOS_TESTS = [
+    # (regex, riesgo esperado, tipo del primer hallazgo)
+    ("([A-Za-z]+)+[0-9]", "high", "nested_quantifiers"),
+    ("([0-9]*[0-9])+y", "high", "nested_quantifiers"),
+    (r"(\s*[a-z]+)*", "high", "nested_quantifiers"),
+    ("(a*b*)+", "high", "nested_quantifiers"),
+    ("(?:(?:[a-z]+))*x", "high", "nested_quantifiers"),
+    ("(a+){2}", "medium", "nested_quantifiers"),
+    ("(k*){7,12}x", "high", "nested_quantifiers"),
+    (r"(x(\w{0,12}){7,11}\w)+", "high", "nested_quantifiers"),
+    ("(a{3})+", "none", None),
+    ("(a|[a-z])+", "high", "ambiguous_alternation"),
+    ("(a|aa)+", "high", "ambiguous_alternation"),
+    ("(ab|cd|abcd)+", "high", "ambiguous_alternation"),
+    ("[a-z]+[a-z0-9]+", "medium", "overlapping_quantifiers"),
+    (r"\s*[a-z]*\s*", "medium", "overlapping_quantifiers"),
+    ("[A-Za-z]+[0-9]+", "none", None),
+    ("([a-zA-Z][0-9])+", "none", None),
+    ("[A-Za-z]+( [A-Za-z]+)*", "none", None),
+    (r"(\w+\.)+\w+", "none", None),
+    ("(ab|a)+", "none", None),
+    ("(x(a|aa))+", "none", None),
+    ("(ab|cd|acbd)+", "none", None),
+    ("(hel(?:[mp]|lo)|world)", "none", None),
+]
+
+
+def check_redos(verbose: bool = False, limit: float = 2.0) -> bool:
+    """
+    Analizador de retroceso catastrófico (`redos.py`): el riesgo y el tipo
+    de hallazgo de cada regex de `REDOS_TESTS`; la reescritura segura
+    acepta lo mismo que la original (cadenas aleatorias) y ya no tarda
+    un tiempo exponencial; los 5.000 grupos anidados y las 10.000
+    alternativas se analizan en menos de `limit` segundos; y el modo por
+    lotes añade el campo "redos".
+    """
+    import io
+    import json
+    import random
+    import re
+    import time
+    from batch import translate_stream
+    from lark_parser import translate_record
+    from redos import MAX_FINDINGS, analyze_redos, safe_rewrite
+
+    failures = []
+    for regex, risk, kind in REDOS_TESTS:
+        report = analyze_redos(regex)
+        found = report["findings"][0]["kind"] if report["findings"] else None
+        if report["risk"] != risk or found != kind:
+            failures.append((regex, risk, kind, report))
+
+    rng = random.Random(25)
+    rewrites = {r: safe_rewrite(r) for r in
+                ("([A-Za-z]+)+[0-9]", "(((a+))+)+b", "([a-z]+){3,}", "(a*)+?c", "(?:[0-9]+)*x")}
+    for regex, rewrite in rewrites.items():
+        original, safe = re.compile(regex), re.compile(rewrite)
+        for _ in range(300):
+            text = "".join(rng.choices("aAz09bcx!", k=rng.randint(0, 10)))
+            if (original.fullmatch(text) is None) != (safe.fullmatch(text) is None):
+                failures.append((regex, rewrite, text))
+                break
+
+    start = time.perf_counter()
+    hostile = re.compile(rewrites["([A-Za-z]+)+[0-9]"]).fullmatch("a" * 5000 + "!") is None
+    deep = analyze_redos("(" * 5000 + "[0-9]+" + ")+" * 5000)
+    wide = analyze_redos("(" + "|".join(f"w{i}" for i in range(10000)) + "|w7)+")
+    elapsed = time.perf_counter() - start
+
+    record = translate_record("group letter one or more end group one or more followed by digit",
+                              redos=True)
+    out = io.StringIO()
+    summary = translate_stream(io.StringIO("letters then digits\nletter one or more or\n"),
+                               out, redos=True)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    ok = (
+        not failures
+        and rewrites["([A-Za-z]+)+[0-9]"] == "([A-Za-z])+[0-9]"
+        and rewrites["(a*)+?c"] == "(a)*?c" and rewrites["([a-z]+){3,}"] == "([a-z]){3,}"
+        and hostile and elapsed < limit
+        and deep["risk"] == "high" and len(deep["findings"]) == MAX_FINDINGS
+        and wide["risk"] == "high"
+        and record["redos"]["risk"] == "high" and record["redos"]["rewrite"] == "([A-Za-z])+[0-9]"
+        and [r["redos"] and r["redos"]["risk"] for r in records] == ["none", None]
+        and summary["risky"] == 0
+    )
+    if verbose or not ok:
+        print()
+        for failure in failures:
+            print("Fallo:", failure)
+        print("Reescrituras:", rewrites)
+        print(f"Entradas grandes: {elapsed:.2f} s | registro:", record.get("redos"))
+        print("Lotes:", [r.get("redos") for r in records], summary)
+        print("Resultado:", "OK" if ok else "FALLÓ – analizador ReDoS")
+    return ok
+
 
 if __name__ == "__main__":
     """
@@ -291,24 +1276,68 @@ if __name__ == "__main__":
 
     print("\n=== PRUEBAS DE NÚMEROS EN INGLÉS ===")
     for phrase, expected in ENGLISH_NUMBER_TESTS:
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         test_case(phrase, expected, args.verbose)
 
+    print("\n=== PRUEBAS DE SINÓNIMOS ===")
+    for phrase, expected in SYNONYM_TESTS:
+        test_case(phrase, expected, args.verbose)
+
+    print("\n=== PRUEBAS DEL NORMALIZADOR POR TOKENS ===")
+    check_normalizer_modes(args.verbose)
+
     print("\n=== PRUEBAS DE ERRORES ESPERADOS ===")
     for phrase, expected in ERROR_TESTS:
         test_case(phrase, expected, args.verbose)
-<<<<<<< HEAD
 
-    print("\n=== PRUEBAS DE NÚMEROS EN INGLÉS ===")
-    tests_num = [
-        ("digit twenty times", "[0-9]{20}"),
-        ("letter seventy two times", "[a-zA-Z]{72}"),
-        ("digit one hundred and five times", "[0-9]{105}"),
-        ("digit two thousand and eight times", "[0-9]{2008}"),
-        ("hex digit three hundred forty one times", "[0-9A-Fa-f]{341}"),
-    ]
+    print("\n=== PRUEBAS DEL SIMPLIFICADOR ===")
+    check_simplify(args.verbose)
+    check_factoring(args.verbose)
 
-    for phrase, expected in tests_num:
-        test_case(phrase, expected, args.verbose)
-=======
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
+    print("\n=== PRUEBAS DE CACHÉ ===")
+    check_cache(args.verbose)
+
+    print("\n=== PRUEBAS DE PATRONES COMPILADOS ===")
+    check_patterns(args.verbose)
+
+    print("\n=== PRUEBAS DE CACHÉ EN DISCO ===")
+    check_disk_cache(args.verbose)
+
+    print("\n=== PRUEBAS DE LA IR ===")
+    check_ir(args.verbose)
+    check_hashcons(args.verbose)
+
+    print("\n=== PRUEBAS DE ENTRADAS PROFUNDAS ===")
+    check_deep(args.verbose)
+
+    print("\n=== PRUEBAS DE GRUPOS SIN CAPTURA ===")
+    check_capture(args.verbose)
+
+    print("\n=== PRUEBAS DEL MOTOR DFA ===")
+    check_dfa(args.verbose)
+
+    print("\n=== PRUEBAS DEL ANALIZADOR DE RETROCESO CATASTRÓFICO ===")
+    check_redos(args.verbose)
+
+    print("\n=== PRUEBAS DEL MODO POR LOTES ===")
+    check_batch(args.verbose)
+
+    print("\n=== PRUEBAS DE TRADUCCIÓN EN PARALELO ===")
+    check_parallel(args.verbose)
+
+    print("\n=== PRUEBAS DEL SERVIDOR ===")
+    check_server(args.verbose)
+
+    print("\n=== PRUEBAS DE LA API ASÍNCRONA ===")
+    check_async(args.verbose)
+
+    print("\n=== PRUEBAS DEL PERFILADO ===")
+    check_profile(args.verbose)
+
+    print("\n=== PRUEBAS DE LA SUITE DE RENDIMIENTO ===")
+    check_bench_suite(args.verbose)
+
+    print("\n=== PRUEBAS DEL GENERADOR DE FRASES ===")
+    check_generator(args.verbose)
+
+    print("\n=== PRUEBAS DIFERENCIALES DE MOTORES (lark vs fast) ===")
+    check_engines(args.verbose)
@@ -7,80 +7,86 @@ expresión regular.
 
 Regla de oro:
 - Cada método con nombre de regla/token en la gramática devuelve
-  un fragmento de regex (str).
-- El árbol completo se traduce combinando esos fragmentos.
+  un nodo de la IR tipada de `regex_ir.py` (no un str).
+- El árbol completo se traduce combinando esos nodos; la regex en texto
+  se obtiene al final con `regex_ir.to_regex`.
+- Los nodos se crean a través de una `NodeTable` (hash-consing): un
+  subárbol que se repite en la frase es un único objeto, y el
+  optimizador lo simplifica una sola vez.
+- `transform` recorre el árbol sin recursión, así que la profundidad de
+  los grupos anidados no está limitada por la pila de Python.
 """
 
-from lark import Transformer, Tree
+from lark import Discard, Token, Transformer, Tree
+from regex_ir import CharClass, Quantifier, NodeTable, to_regex
+
+# Clases de caracteres constantes: los nodos no se modifican nunca, así
+# que cada término base devuelve siempre la misma instancia.
+LETTER = CharClass("a-zA-Z")
+DIGIT = CharClass("0-9")
+WHITESPACE = CharClass(r"\s", bracketed=False)
+NON_WHITESPACE = CharClass(r"\S", bracketed=False)
+ANY = CharClass(".", bracketed=False)
+UPPER = CharClass("A-Z")
+LOWER = CharClass("a-z")
+VOWEL = CharClass("AEIOUaeiou")
+CONSONANT = CharClass("BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz")
+ALPHANUMERIC = CharClass("A-Za-z0-9")
+WORD = CharClass(r"\w", bracketed=False)
+HEX = CharClass("0-9A-Fa-f")
+
+OPTIONAL = Quantifier(0, 1, "?")
+ONE_OR_MORE = Quantifier(1, None, "+")
+ZERO_OR_MORE = Quantifier(0, None, "*")
+
+CONSTANTS = (
+    LETTER, DIGIT, WHITESPACE, NON_WHITESPACE, ANY, UPPER, LOWER, VOWEL,
+    CONSONANT, ALPHANUMERIC, WORD, HEX, OPTIONAL, ONE_OR_MORE, ZERO_OR_MORE,
+)
 
 
 class RegexTranslator(Transformer):
     """
-    Transformer de Lark que convierte cada nodo del AST en un fragmento de regex.
+    Transformer de Lark que convierte cada nodo del AST en un nodo de la IR.
 
-<<<<<<< HEAD
-    # ---------- BASE TERMS ----------
-    def t_letter(self, _):
-        return "[a-zA-Z]"
-
-    def t_digit(self, _):
-        return "[0-9]"
-
-    def t_space(self, _):
-        # "space" en tu DSL lo tratamos como whitespace genérico
-        return r"\s"
-
-    def t_any(self, _):
-        return "."
-
-    def t_upper(self, _):
-        return "[A-Z]"
-
-    def t_lower(self, _):
-        return "[a-z]"
-
-    def t_vowel(self, _):
-        return "[AEIOUaeiou]"
-
-    def t_consonant(self, _):
-        # Todas las consonantes inglesas explícitas
-        return "[BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz]"
-
-    def t_alphanumeric(self, _):
-        return "[A-Za-z0-9]"
-
-    def t_word(self, _):
-        # Aquí sí queremos \w explícitamente para "word character"
-        return r"\w"
-
-    def t_hex(self, _):
-        return "[0-9A-Fa-f]"
-
-    def t_whitespace(self, _):
-        return r"\s"
-
-    def t_non_whitespace(self, _):
-        return r"\S"
-
-    def t_range(self, children):
-        # children son dos CHAR_LITERAL tipo "'a'", "'z'"
-        c1 = children[0][1:-1]
-        c2 = children[1][1:-1]
-        return f"[{c1}-{c2}]"
-
-    def t_char(self, tok):
-        # tok es un Token con valor "'a'" → nos quedamos con a
-        return tok[0][1:-1]
-
-    def t_string(self, tok):
-        # "'hello'" → "hello"
-        return tok[0][1:-1]
-=======
     La firma de cada método coincide con el nombre de la regla o token en
     `grammar.lark`. Lark llama automáticamente a estos métodos al recorrer
     el árbol.
+
+    `nodes` es la tabla de hash-consing compartida por todas las frases
+    que traduce la instancia (ver `regex_ir.NodeTable`).
     """
 
+    def __init__(self, visit_tokens: bool = True, nodes: NodeTable | None = None):
+        super().__init__(visit_tokens)
+        self.nodes = nodes if nodes is not None else NodeTable(seed=CONSTANTS)
+
+    def transform(self, tree):
+        """
+        Igual que `Transformer.transform`, pero en postorden con una pila
+        explícita en lugar de recursión: cada regla recibe los resultados
+        de sus hijos en el mismo orden y con las mismas reglas de Lark
+        (tokens visitados si `visit_tokens`, `Discard` descartado).
+        """
+        values = []                     # resultados pendientes de su padre
+        stack = [(tree, -1)]
+        while stack:
+            node, count = stack.pop()
+            if count >= 0:
+                # Todos los hijos de `node` ya están al final de `values`
+                start = len(values) - count
+                children = [v for v in values[start:] if v is not Discard]
+                del values[start:]
+                values.append(self._call_userfunc(node, children))
+            elif isinstance(node, Tree):
+                stack.append((node, len(node.children)))
+                stack.extend((child, -1) for child in reversed(node.children))
+            elif self.__visit_tokens__ and isinstance(node, Token):
+                values.append(self._call_userfunc_token(node))
+            else:
+                values.append(node)
+        return None if values[0] is Discard else values[0]
+
     # ------------------------------------------------------------------
     #  CLASES BÁSICAS DE CARACTERES (BASE TERMS)
     # ------------------------------------------------------------------
@@ -90,91 +96,91 @@ class RegexTranslator(Transformer):
         Regla: t_letter
         Representa cualquier letra (mayúscula o minúscula).
         """
-        return "[a-zA-Z]"
+        return LETTER
 
     def t_digit(self, _):
         """
         Regla: t_digit
         Representa cualquier dígito decimal.
         """
-        return "[0-9]"
+        return DIGIT
 
     def t_space(self, _):
         """
         Regla: t_space
         Un espacio según el DSL; se mapea a whitespace genérico.
         """
-        return r"\s"
+        return WHITESPACE
 
     def t_any(self, _):
         """
         Regla: t_any
         Cualquier carácter (.) en regex.
         """
-        return "."
+        return ANY
 
     def t_upper(self, _):
         """
         Regla: t_upper
         Letra mayúscula.
         """
-        return "[A-Z]"
+        return UPPER
 
     def t_lower(self, _):
         """
         Regla: t_lower
         Letra minúscula.
         """
-        return "[a-z]"
+        return LOWER
 
     def t_vowel(self, _):
         """
         Regla: t_vowel
         Vocal (mayúscula o minúscula).
         """
-        return "[AEIOUaeiou]"
+        return VOWEL
 
     def t_consonant(self, _):
         """
         Regla: t_consonant
         Consonantes inglesas explícitas (mayúsculas y minúsculas).
         """
-        return "[BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz]"
+        return CONSONANT
 
     def t_alphanumeric(self, _):
         """
         Regla: t_alphanumeric
         Carácter alfanumérico.
         """
-        return "[A-Za-z0-9]"
+        return ALPHANUMERIC
 
     def t_word(self, _):
         """
         Regla: t_word
         Carácter de palabra tal como lo entiende regex: \w
         """
-        return r"\w"
+        return WORD
 
     def t_hex(self, _):
         """
         Regla: t_hex
         Dígito hexadecimal.
         """
-        return "[0-9A-Fa-f]"
+        return HEX
 
     def t_whitespace(self, _):
         """
         Regla: t_whitespace
         Carácter de espacio en blanco (incluye tabs, saltos de línea, etc.).
         """
-        return r"\s"
+        return WHITESPACE
 
     def t_non_whitespace(self, _):
         """
         Regla: t_non_whitespace
         Cualquier carácter que NO sea whitespace.
         """
-        return r"\S"
+        return NON_WHITESPACE
 
     # ------------------------------------------------------------------
     #  RANGOS DE CARACTERES
@@ -207,7 +213,7 @@ class RegexTranslator(Transformer):
 
         if len(flat) < 2:
             # Si por alguna razón no hay dos extremos de rango, devolvemos vacío.
-            return ""
+            return self.nodes.literal("")
 
         def _unquote(tok):
             """
@@ -221,7 +227,7 @@ class RegexTranslator(Transformer):
 
         c1 = _unquote(flat[0])
         c2 = _unquote(flat[1])
-        return f"[{c1}-{c2}]"
+        return self.nodes.char_class(f"{c1}-{c2}")
 
     # ------------------------------------------------------------------
     #  LITERALES
@@ -237,8 +243,8 @@ class RegexTranslator(Transformer):
         tok = children[0]
         s = str(tok)
         if len(s) >= 2 and (s[0] in ("'", '"')) and s[-1] == s[0]:
-            return s[1:-1]
-        return s
+            return self.nodes.literal(s[1:-1])
+        return self.nodes.literal(s)
 
     def t_string(self, children):
         """
@@ -250,13 +256,12 @@ class RegexTranslator(Transformer):
         tok = children[0]
         s = str(tok)
         if len(s) >= 2 and (s[0] in ("'", '"')) and s[-1] == s[0]:
-            return s[1:-1]
-        return s
+            return self.nodes.literal(s[1:-1])
+        return self.nodes.literal(s)
 
     # ------------------------------------------------------------------
     #  NEGACIÓN / EXCEPT
     # ------------------------------------------------------------------
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 
     def t_except(self, children):
         """
@@ -272,37 +277,15 @@ class RegexTranslator(Transformer):
 
         Aquí tomamos el complemento del segundo argumento:
           [abc] → [^abc]
+          \\s   → [^\\s]
+          'a'   → [^a]
         """
         base, neg = children
-<<<<<<< HEAD
-        # Por ahora ignoramos 'base' y tomamos el complemento de 'neg'
-        neg_inside = str(neg).strip("[]")
-        return f"[^{neg_inside}]"
-
-    # ---------- REPETITIONS ----------
-    def r_optional(self, _):
-        return "?"
-
-    def r_one_or_more(self, _):
-        return "+"
-
-    def r_zero_or_more(self, _):
-        return "*"
-
-    def r_exact(self, children):
-        return f"{{{children[0]}}}"
-
-    def r_range(self, children):
-        return f"{{{children[0]},{children[1]}}}"
-
-    def r_at_least(self, children):
-        return f"{{{children[0]},}}"
-
-    def r_at_most(self, children):
-        return f"{{0,{children[0]}}}"
-=======
-        neg_inside = str(neg).strip("[]")
-        return f"[^{neg_inside}]"
+        if isinstance(neg, CharClass) and neg.bracketed and not neg.negated:
+            neg_inside = neg.body
+        else:
+            neg_inside = to_regex(neg).strip("[]")
+        return self.nodes.char_class(neg_inside, negated=True)
 
     # ------------------------------------------------------------------
     #  CUANTIFICADORES (REPETITIONS)
@@ -313,54 +296,57 @@ class RegexTranslator(Transformer):
         Regla: r_optional
         Cuantificador "optional" → ?
         """
-        return "?"
+        return OPTIONAL
 
     def r_one_or_more(self, _):
         """
         Regla: r_one_or_more
         Cuantificador "one or more" → +
         """
-        return "+"
+        return ONE_OR_MORE
 
     def r_zero_or_more(self, _):
         """
         Regla: r_zero_or_more
         Cuantificador "zero or more" → *
         """
-        return "*"
+        return ZERO_OR_MORE
 
     def r_exact(self, children):
         """
         Regla: r_exact
         "exactly N times" → {N}
         """
-        return f"{{{children[0]}}}"
+        n = children[0]
+        return self.nodes.quantifier(int(n), int(n), f"{{{n}}}")
 
     def r_range(self, children):
         """
         Regla: r_range
         "between N and M times" → {N,M}
         """
-        return f"{{{children[0]},{children[1]}}}"
+        n, m = children
+        return self.nodes.quantifier(int(n), int(m), f"{{{n},{m}}}")
 
     def r_at_least(self, children):
         """
         Regla: r_at_least
         "at least N times" → {N,}
         """
-        return f"{{{children[0]},}}"
+        n = children[0]
+        return self.nodes.quantifier(int(n), None, f"{{{n},}}")
 
     def r_at_most(self, children):
         """
         Regla: r_at_most
         "at most N times" → {0,N}
         """
-        return f"{{0,{children[0]}}}"
+        n = children[0]
+        return self.nodes.quantifier(0, int(n), f"{{0,{n}}}")
 
     # ------------------------------------------------------------------
     #  TÉRMINOS BÁSICOS (ENVOLTORIOS)
     # ------------------------------------------------------------------
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 
     def term(self, children):
         """
@@ -382,58 +368,25 @@ class RegexTranslator(Transformer):
 
     def repeated_term(self, children):
         """
-<<<<<<< HEAD
-        children puede ser:
-=======
         Regla: repeated_term
 
         Combina un término con uno o dos cuantificadores posibles.
 
         Casos típicos:
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
           [term]
           [rep_before, term]
           [term, rep_after]
           [rep_before, term, rep_after]
-<<<<<<< HEAD
-        """
-=======
 
-        Donde cada cuantificador puede ser:
-          ?, +, *, {N}, {N,M}, {N,}, {0,N}
+        Los cuantificadores llegan como nodos `Quantifier`, así que se
+        distinguen del término por tipo. Con dos cuantificadores el de
+        delante se aplica primero: "one or more digit optional" → [0-9]+?
         """
-        # Convertimos todo a string para simplificar la combinación final
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-        children = [str(c) for c in children]
-
-        if len(children) == 1:
-            # Solo un término sin repetición explícita
-            return children[0]
-
-        if len(children) == 2:
-            # Dos elementos: o bien [rep, term] o [term, rep]
-            a, b = children
-            rep_symbols = ["?", "+", "*"]
-<<<<<<< HEAD
-            # a = repetición antes del término
-            if a.startswith("{") or a in rep_symbols:
-                return b + a
-            # a = término, b = repetición
-=======
-            # Si `a` parece ser un cuantificador, lo aplicamos después de `b`
-            if a.startswith("{") or a in rep_symbols:
-                return b + a
-            # En caso contrario, asumimos que `b` es el cuantificador de `a`
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-            return a + b
-
-        if len(children) == 3:
-            # Tres elementos: cuantificador antes y después de un mismo término
-            rep_before, term, rep_after = children
-            return term + rep_before + rep_after
-
-        # Cualquier caso raro con más de tres elementos: concatenación directa
-        return "".join(children)
+        quantifiers = [c for c in children if isinstance(c, Quantifier)]
+        node = next(c for c in children if not isinstance(c, Quantifier))
+        for quantifier in quantifiers:
+            node = self.nodes.repeat(node, quantifier)
+        return node
 
     # ------------------------------------------------------------------
     #  AGRUPACIÓN (GRUPOS)
@@ -450,11 +403,11 @@ class RegexTranslator(Transformer):
         children[0] → parte agrupada
         children[1] → cuantificador opcional
         """
-        children = [str(c) for c in children]
+        node = self.nodes.group(children[0])
         if len(children) == 1:
-            return "(" + children[0] + ")"
-        # children[1] suele ser la repetición (ej. {2}, +, ?, etc.)
-        return "(" + children[0] + ")" + children[1]
+            return node
+        # children[1] es la repetición (ej. {2}, +, ?, etc.)
+        return self.nodes.repeat(node, children[1])
 
     # ------------------------------------------------------------------
     #  SECUENCIAS
@@ -465,7 +418,7 @@ class RegexTranslator(Transformer):
         Regla: sequence
         Concatenación directa de todos los elementos.
         """
-        return "".join(str(c) for c in children)
+        return self.nodes.concat(children)
 
     # ------------------------------------------------------------------
     #  ALTERNATIVAS (OR)
@@ -474,9 +427,9 @@ class RegexTranslator(Transformer):
     def or_expr(self, children):
         """
         Regla: or_expr
-        Alternativa entre dos expresiones: (A|B).
+        Alternativa entre todas las secuencias de "A or B or C": (A|B|C).
         """
-        return "(" + str(children[0]) + "|" + str(children[1]) + ")"
+        return self.nodes.group(self.nodes.alt(children))
 
     # ------------------------------------------------------------------
     #  ELEMENTOS (ENVOLTORIO)
@@ -494,11 +447,9 @@ class RegexTranslator(Transformer):
     # ------------------------------------------------------------------
 
     def start(self, children):
-<<<<<<< HEAD
-=======
         """
         Regla: start
-        Punto de entrada de la gramática; devuelve la expresión raíz.
+        Punto de entrada de la gramática; devuelve el nodo raíz de la IR
+        (se serializa con `regex_ir.to_regex`).
         """
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         return children[0]
@@ -3,8 +3,10 @@ Módulo `utils.py`
 
 Agrupa funciones utilitarias para:
 
-- Validar si una expresión regular es sintácticamente correcta.
-- Aplicar una serie de simplificaciones / optimizaciones locales sobre la regex,
+- Validar si una expresión regular es sintácticamente correcta y compilarla
+  una sola vez (`compile_regex`, con su propia caché acotada).
+- Aplicar una serie de simplificaciones / optimizaciones locales sobre la regex
+  (sobre la IR de `regex_ir.py`, en un único recorrido del árbol),
   con el objetivo de:
     * Hacerla más legible.
     * Eliminar redundancias.
@@ -13,15 +15,60 @@ Agrupa funciones utilitarias para:
 
 import re
 
+from cache import LRUCache, MISSING
+from regex_ir import (
+    Node, CharClass, Literal, Concat, Alt, Group, Quantifier, Repeat,
+    child_nodes, drop_captures, parse_regex, to_regex,
+)
+
 
 # ===============================================================
 #  VALIDACIÓN
 # ===============================================================
 
+# Patrones compilados por (regex, flags). Los errores de compilación
+# también se guardan, para no recompilar una regex inválida. A diferencia
+# de la caché interna de `re` (512 entradas), el límite es configurable.
+pattern_cache = LRUCache(maxsize=1024)
+
+
+def configure_pattern_cache(maxsize: int = 1024, ttl: float | None = None) -> None:
+    """Reemplaza la caché de patrones compilados (0 la desactiva)."""
+    global pattern_cache
+    pattern_cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+
+def pattern_cache_stats() -> dict:
+    """Contadores de la caché de patrones compilados."""
+    return pattern_cache.stats()
+
+
+def compile_regex(regex: str, flags: int = 0) -> re.Pattern:
+    """
+    Compila `regex` con `re` una sola vez por (regex, flags) y devuelve
+    el mismo `re.Pattern` en las llamadas siguientes.
+
+    Raises
+    ------
+    re.error
+        Si la regex no compila (el error también queda en la caché).
+    """
+    key = (regex, flags)
+    entry = pattern_cache.get(key)
+    if entry is MISSING:
+        try:
+            entry = re.compile(regex, flags)
+        except Exception as e:
+            # re.error, y también OverflowError / RecursionError con
+            # regex enormes
+            entry = e
+        pattern_cache.put(key, entry)
+    if isinstance(entry, Exception):
+        raise entry.with_traceback(None)
+    return entry
+
+
 def validate_regex(regex: str) -> bool:
-<<<<<<< HEAD
-    """Valida si una expresión regular es sintácticamente correcta."""
-=======
     """
     Verifica si una expresión regular es sintácticamente válida
     para el motor `re` de Python.
@@ -34,37 +81,32 @@ def validate_regex(regex: str) -> bool:
     Returns
     -------
     bool
-        True si `re.compile` no lanza excepción; False en caso contrario.
+        True si compila; False en caso contrario. El patrón compilado
+        queda en la caché de `compile_regex` para usarlo después.
     """
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     try:
-        re.compile(regex)
+        compile_regex(regex)
         return True
     except Exception:
         return False
 
 
 # ===============================================================
-<<<<<<< HEAD
-#  OPTIMIZADORES INTERNOS
-=======
 #  OPTIMIZADORES INTERNOS (NIVEL SINTÁCTICO)
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 # ===============================================================
 
+# Apertura de grupo en las reglas textuales: "(" o "(?:"
+_OPEN_GROUP = r'\((?:\?:)?'
+
+# Grupo completo sin paréntesis anidados, con o sin captura
+_WHOLE_GROUP = r'(\((?:\?:)?[^()]+\))'
+
+
 def simplify_parentheses(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Elimina paréntesis innecesarios como:
-      (a) → a
-      ([0-9]) → [0-9]
-    """
-    # (X) where X has no operators that require grouping
-    regex = re.sub(r'\((\[[^\]]+\])\)', r'\1', regex)
-=======
     Elimina paréntesis que no aportan agrupación real.
 
-    Casos tratados:
+    Casos tratados (con grupos de captura o sin captura `(?:...)`):
       - ([...]) → [...]
       - (a)     → a
 
@@ -72,25 +114,14 @@ def simplify_parentheses(regex: str) -> str:
     o una clase de caracteres, sin operadores adicionales.
     """
     # Clase de caracteres entre paréntesis → la clase sola
-    regex = re.sub(r'\((\[[^\]]+\])\)', r'\1', regex)
+    regex = re.sub(_OPEN_GROUP + r'(\[[^\]]+\])\)', r'\1', regex)
     # Literal alfanumérico simple entre paréntesis → literal solo
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-    regex = re.sub(r'\(([a-zA-Z0-9])\)', r'\1', regex)
+    regex = re.sub(_OPEN_GROUP + r'([a-zA-Z0-9])\)', r'\1', regex)
     return regex
 
 
 def collapse_repetitions(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Convierte secuencias repetidas en {n}
-    Ej: [0-9][0-9][0-9] → [0-9]{3}
-    """
-    pattern = r'(\[[^\]]+\])\1+'
-    def replacer(match):
-        token = match.group(1)
-        count = len(match.group(0)) // len(token)
-        return f"{token}{{{count}}}"
-=======
     Colapsa repeticiones consecutivas idénticas de la misma clase de caracteres
     en un cuantificador `{n}`.
 
@@ -105,50 +136,31 @@ def collapse_repetitions(regex: str) -> str:
         count = total_length // len(token)
         return f"{token}{{{count}}}"
 
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     return re.sub(pattern, replacer, regex)
 
 
 def simplify_or(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Convierte (a|b|c) en [abc] cuando sea posible.
-    Convierte ([0-9]|[1-9]) en [0-9]
-    """
-    # Primer caso: literales simples
-    regex = re.sub(
-        r'\((?:([a-zA-Z0-9])\|)+([a-zA-Z0-9])\)',
-        lambda m: "[" + "".join(m.group(0).replace("(", "").replace(")", "").split("|")) + "]",
-        regex
-    )
-
-    # Segundo caso: clases de dígitos
-    regex = re.sub(
-        r'\(\[0-9\]\|\[1-9\]\)',
-        r"[0-9]",
-        regex
-=======
     Simplifica algunas expresiones OR en clases de caracteres.
 
     Casos principales:
       - (a|b|c)    → [abc]  (cuando todos son literales alfanuméricos)
       - ([0-9]|[1-9]) → [0-9]
+
+    Igual con grupos sin captura: (?:a|b|c) → [abc].
     """
     # Literales simples entre paréntesis separados por '|'
     regex = re.sub(
-        r'\((?:([a-zA-Z0-9])\|)+([a-zA-Z0-9])\)',
-        lambda m: "[" + "".join(
-            m.group(0).replace("(", "").replace(")", "").split("|")
-        ) + "]",
+        _OPEN_GROUP + r'((?:[a-zA-Z0-9]\|)+[a-zA-Z0-9])\)',
+        lambda m: "[" + m.group(1).replace("|", "") + "]",
         regex,
     )
 
     # Caso especial de dígitos
     regex = re.sub(
-        r'\(\[0-9\]\|\[1-9\]\)',
+        _OPEN_GROUP + r'\[0-9\]\|\[1-9\]\)',
         r"[0-9]",
         regex,
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     )
 
     return regex
@@ -156,13 +168,6 @@ def simplify_or(regex: str) -> str:
 
 def reorder_char_classes(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Ordena caracteres dentro de clases:
-    Ej: [zaq] → [aqz]
-    """
-    def repl(m):
-        chars = list(m.group(1))
-=======
     Ordena alfabéticamente los caracteres dentro de una clase de caracteres
     siempre que sean letras o dígitos (sin rangos).
 
@@ -174,7 +179,6 @@ def reorder_char_classes(regex: str) -> str:
     def repl(m: re.Match) -> str:
         chars = list(m.group(1))
         # set(...) elimina duplicados; sorted(...) los ordena
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
         chars = sorted(set(chars))
         return "[" + "".join(chars) + "]"
 
@@ -187,30 +191,18 @@ def reorder_char_classes(regex: str) -> str:
 
 def collapse_A_Astar(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Simplifica A A* → A+
-    """
-    # Caso clase de caracteres: [a-z][a-z]*
-    regex = re.sub(r'(\[[^\]]+\])\1\*', r'\1+', regex)
-
-    # Caso literal/grupo simple: (X)(X)*
-    regex = re.sub(r'(\([^\)]+\))\1\*', r'\1+', regex)
-
-    # Caso token simple: a a*
-=======
     Simplifica patrones del tipo: A A* → A+
 
     Casos contemplados:
       - [class][class]*  → [class]+
-      - (grupo)(grupo)*  → (grupo)+
+      - (grupo)(grupo)*  → (grupo)+  (también (?:grupo)(?:grupo)*)
       - x x*             → x+
     """
     # Clase de caracteres repetida seguida de su '*'
     regex = re.sub(r'(\[[^\]]+\])\1\*', r'\1+', regex)
     # Grupo completo repetido y luego con '*'
-    regex = re.sub(r'(\([^\)]+\))\1\*', r'\1+', regex)
+    regex = re.sub(_WHOLE_GROUP + r'\1\*', r'\1+', regex)
     # Literal simple seguido de su '*'
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     regex = re.sub(r'([a-zA-Z0-9])\1\*', r'\1+', regex)
 
     return regex
@@ -218,39 +210,19 @@ def collapse_A_Astar(regex: str) -> str:
 
 def collapse_A_Aplus(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Simplifica A A+ → A{2,}
-    """
-    # Caso clase de caracteres
-    regex = re.sub(r'(\[[^\]]+\])\1\+', r'\1{2,}', regex)
-
-    # Caso grupo simple
-    regex = re.sub(r'(\([^\)]+\))\1\+', r'\1{2,}', regex)
-
-=======
     Simplifica patrones del tipo: A A+ → A{2,}
 
     Casos contemplados:
       - [class][class]+  → [class]{2,}
-      - (grupo)(grupo)+  → (grupo){2,}
+      - (grupo)(grupo)+  → (grupo){2,}  (también con (?:grupo))
     """
     regex = re.sub(r'(\[[^\]]+\])\1\+', r'\1{2,}', regex)
-    regex = re.sub(r'(\([^\)]+\))\1\+', r'\1{2,}', regex)
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
+    regex = re.sub(_WHOLE_GROUP + r'\1\+', r'\1{2,}', regex)
     return regex
 
 
 def collapse_Aexact_Aexact(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Simplifica A{m} A{n} → A{m+n}
-    """
-    def repl(m):
-        token = m.group(1)
-        m1 = int(m.group(2))
-        m2 = int(m.group(3))
-        return f"{token}{{{m1+m2}}}"
-=======
     Une dos cuantificadores exactos consecutivos sobre la misma clase
     de caracteres: A{m} A{n} → A{m+n}.
 
@@ -263,100 +235,684 @@ def collapse_Aexact_Aexact(regex: str) -> str:
         m1 = int(m.group(2))
         m2 = int(m.group(3))
         return f"{token}{{{m1 + m2}}}"
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 
     return re.sub(r'(\[[^\]]+\])\{(\d+)\}\1\{(\d+)\}', repl, regex)
 
 
 def collapse_Aexact_Astar(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Simplifica A{m} A* → A{m,}
-=======
     Combina un cuantificador exacto seguido del mismo token con '*':
     A{m} A* → A{m,}
 
     Ejemplo:
       [a-z]{2}[a-z]* → [a-z]{2,}
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
     """
     return re.sub(r'(\[[^\]]+\])\{(\d+)\}\1\*', r'\1{\2,}', regex)
 
 
 def remove_redundant_one(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Quita {1} → vacío.
-    """
-    regex = re.sub(r'\{1\}', '', regex)
-    return regex
-=======
     Elimina cuantificadores triviales {1}, que no cambian la semántica.
 
     Ejemplo:
       a{1} → a
     """
     return re.sub(r'\{1\}', '', regex)
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 
 
 def collapse_group_plus(regex: str) -> str:
     """
-<<<<<<< HEAD
-    Simplifica (X)+ → X+  cuando X es simple.
-    """
-    # si es un token simple o clase de caracteres
-=======
     Simplifica (X)+ a X+ cuando X es suficientemente simple:
 
       - Una clase de caracteres: ([...])+ → [...] +
       - Un literal simple:      (a)+     → a+
 
+    El grupo puede ser de captura o sin captura: (?:[...])+ → [...]+.
     De esta forma se reduce el número de paréntesis innecesarios.
     """
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
-    regex = re.sub(r'\((\[[^\]]+\])\)\+', r'\1+', regex)
-    regex = re.sub(r'\(([a-zA-Z0-9])\)\+', r'\1+', regex)
+    regex = re.sub(_OPEN_GROUP + r'(\[[^\]]+\])\)\+', r'\1+', regex)
+    regex = re.sub(_OPEN_GROUP + r'([a-zA-Z0-9])\)\+', r'\1+', regex)
     return regex
 
 
-<<<<<<< HEAD
-
-=======
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593
 # ===============================================================
-#  OPTIMIZADOR PRINCIPAL
+#  OPTIMIZADOR ESTRUCTURAL (SOBRE LA IR)
 # ===============================================================
 
+# Versión de las reglas de simplificación: forma parte de la clave de la
+# caché en disco (`disk_cache.py`). Debe incrementarse al cambiar el
+# resultado de `optimize_regex` para que no se sirvan regex antiguas.
+SIMPLIFIER_VERSION = 3
+
+# Forma canónica de la clase de letras con '+': [a-zA-Z]+ → [A-Za-z]+
+_LETTERS = "a-zA-Z"
+_LETTERS_CANONICAL = "A-Za-z"
+
+# Unidades de un literal: un carácter o un escape "\x"
+_LITERAL_UNIT_RE = re.compile(r"\\.|.", re.DOTALL)
+
+# Cuerpo de clase formado solo por letras/dígitos y rangos entre ellos
+_SIMPLE_CLASS_RE = re.compile(r"(?:[a-zA-Z0-9](?:-[a-zA-Z0-9])?)+")
+
+# Caracteres que significan lo mismo fuera y dentro de una clase: un
+# literal de uno de ellos puede pasar a formar parte de una clase
+_CLASS_SAFE_CHARS = frozenset(" !\"#%&',/:;<=>@_`~")
+
+# Atajos que pueden ir dentro de una clase ("." no: ahí es un punto literal)
+_CLASS_SHORTHANDS = frozenset((r"\d", r"\D", r"\s", r"\S", r"\w", r"\W"))
+
+# Caracteres con significado especial fuera de una clase: un literal que
+# los contiene sin escapar no es texto fijo y no se factoriza
+_REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+
+
 def simplify_regex(regex: str) -> str:
-<<<<<<< HEAD
+    """
+    Simplifica una regex en texto: la convierte en la IR de `regex_ir`,
+    aplica `optimize_regex` y la vuelve a serializar.
 
-    old = None
-    new = regex
+    Las reglas son las mismas que las del optimizador textual (ver
+    `optimize_regex`), pero se aplican en un único recorrido del árbol.
+    Si la regex usa construcciones que la IR no representa, se devuelve
+    sin cambios.
 
-    while new != old:
-        old = new
+    Parameters
+    ----------
+    regex : str
+        Expresión regular generada por el traductor.
 
-        
-        new = simplify_parentheses(new)
-        new = collapse_repetitions(new)
-        new = simplify_or(new)
-        new = reorder_char_classes(new)
+    Returns
+    -------
+    str
+        Expresión regular simplificada.
+    """
+    try:
+        node = parse_regex(regex)
+    except ValueError:
+        return regex
+    return to_regex(optimize_regex(node))
 
-       
-        new = collapse_A_Astar(new)
-        new = collapse_A_Aplus(new)
-        new = collapse_Aexact_Aexact(new)
-        new = collapse_Aexact_Astar(new)
-        new = remove_redundant_one(new)
-        new = collapse_group_plus(new)
 
-    return new
+def noncapturing_regex(regex: str) -> str:
+    """
+    Reescribe cada grupo `( ... )` de `regex` como `(?: ... )` (ver
+    `regex_ir.drop_captures`). Como `simplify_regex`, devuelve la regex
+    sin cambios si usa construcciones que la IR no representa.
+    """
+    try:
+        node = parse_regex(regex)
+    except ValueError:
+        return regex
+    return to_regex(drop_captures(node))
+
+
+def optimize_regex(node: Node, memo: dict | None = None) -> Node:
+    """
+    Devuelve una versión simplificada del árbol `node` (no lo modifica).
+
+    Recorre el árbol una sola vez, de abajo arriba; cada nodo se reescribe
+    cuando sus hijos ya están simplificados, por lo que el proceso siempre
+    termina. Reglas:
+
+      - ([...]) → [...] y (a) → a  (paréntesis alrededor de un átomo)
+      - (a|b|c) → [abc]; ([0-9]|[1-9]) → [0-9]  (una clase contiene al resto)
+      - ([0-9]|[a-zA-Z]|\\s) → [0-9A-Za-z\\s]  (ramas de un solo carácter
+        consecutivas se unen en una clase; con otras ramas: (ab|c|d) → (ab|[cd]))
+      - (hello|help|helm|world) → (hel(?:lo|[pm])|world)  (prefijos y sufijos
+        comunes de alternativas literales, en forma de trie)
+      - [zaq] → [aqz]  (clases de letras/dígitos ordenadas y sin duplicados)
+      - A{1} → A
+      - [a-zA-Z]+ → [A-Za-z]+
+      - [c][c][c] → [c]{3} y [c]{m}[c]{n} → [c]{m+n}
+      - A A* → A+
+      - A A+ → A{2,}  (clases y grupos)
+      - [c]{m}[c]* → [c]{m,}
+
+    Un `Repeat` cuyo hijo es otro `Repeat` es un modificador perezoso o
+    posesivo ("+?", "{2}+") y no se combina con nada.
+
+    Los resultados se memorizan por identidad en `memo` (uno nuevo por
+    llamada si no se pasa): en un árbol internado por `NodeTable`, un
+    subárbol repetido se simplifica una sola vez.
+
+    El árbol se recorre en postorden con una pila explícita y cada nodo
+    se simplifica cuando sus hijos ya están en `memo`, así que la
+    profundidad de anidamiento no depende del límite de recursión.
+    """
+    if memo is None:
+        memo = {}
+    done = memo.get(id(node))
+    if done is not None:
+        return done[1]
+    stack = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if id(current) in memo:
+            continue
+        if not expanded:
+            stack.append((current, True))
+            stack.extend((child, False) for child in child_nodes(current)
+                         if type(child) is not Quantifier)
+            continue
+        # Se guarda también el nodo para que su id no se reutilice mientras viva `memo`
+        memo[id(current)] = (current, _optimize_node(current, memo))
+    return memo[id(node)][1]
+
+
+def _optimize_node(node: Node, memo: dict) -> Node:
+    """Un paso de `optimize_regex`: los hijos de `node` ya están en `memo`."""
+    kind = type(node)
+    if kind is CharClass:
+        result = _canonical_class(node)
+    elif kind is Repeat:
+        result = _optimize_repeat(node, memo)
+    elif kind is Concat:
+        result = _optimize_concat(node.items, memo)
+    elif kind is Literal:
+        result = node
+    elif kind is Alt:
+        branches = [optimize_regex(branch, memo) for branch in node.branches]
+        result = _factor_literals(branches)
+        if result is None:
+            result = Alt(branches)
+    elif kind is Group:
+        child = optimize_regex(node.child, memo)
+        result = None
+        if _is_atom(child) and type(child) is not Group:
+            result = child
+        elif type(child) is Alt:
+            merged = _alt_to_class(child)
+            if type(merged) is Alt:
+                child = merged
+            elif merged is not None:
+                result = merged
+        if result is None:
+            result = Group(child, node.capturing)
+    else:
+        raise TypeError(f"Nodo de IR desconocido: {node!r}")
+    return result
+
+
+def _optimize_repeat(node: Repeat, memo: dict) -> Node:
+    """Simplifica un `Repeat` (ver `optimize_regex`)."""
+    # Cadena de cuantificadores sobre un mismo término: x, x+, (x+)?, ...
+    chain = []
+    base = node
+    while type(base) is Repeat:
+        chain.append(base.quantifier)
+        base = base.child
+
+    # Un literal de varios caracteres solo repite su último carácter
+    if type(base) is Literal:
+        units = _LITERAL_UNIT_RE.findall(base.text)
+        if len(units) > 1:
+            last = Literal(units[-1])
+            for quantifier in reversed(chain):
+                last = Repeat(last, quantifier)
+            return _optimize_concat([Literal("".join(units[:-1])), last], memo)
+
+    if type(node.child) is Repeat:
+        inner = _optimize_repeat(node.child, memo)
+        if type(inner) is not Repeat:
+            # Se ha quitado un {1}: se conserva para no cambiar el modificador
+            inner = Repeat(inner, node.child.quantifier)
+        return Repeat(inner, node.quantifier)
+
+    quantifier = node.quantifier
+    child = optimize_regex(node.child, memo)
+    if quantifier.min == quantifier.max == 1:
+        return child
+    return _repeat(child, quantifier)
+
+
+def _optimize_concat(items, memo: dict) -> Node:
+    """Simplifica y concatena `items` combinando vecinos repetidos."""
+    out = []
+    for item in items:
+        item = optimize_regex(item, memo)
+        if type(item) is Concat:
+            for sub in item.items:
+                _push(out, sub)
+        else:
+            _push(out, item)
+
+    return out[0] if len(out) == 1 else Concat(out)
+
+
+def _push(out: list, item: Node) -> None:
+    """Añade `item` a `out`, combinándolo con el último elemento si se puede."""
+    if not out:
+        out.append(item)
+        return
+    last = out[-1]
+    if type(item) is Literal:
+        # Dos literales seguidos solo se concatenan
+        if type(last) is Literal:
+            out[-1] = Literal(last.text + item.text)
+        else:
+            out.append(item)
+        return
+    if type(last) is Literal and type(item) is Repeat:
+        # "xa" seguido de "a*": se separa el último carácter del literal
+        unit = item.child
+        if type(unit) is Literal and last.text != unit.text and last.text.endswith(unit.text):
+            units = _LITERAL_UNIT_RE.findall(last.text)
+            if units[-1] == unit.text:
+                merged = _merge(Literal(units[-1]), item)
+                if merged is not None:
+                    out[-1] = Literal(last.text[:-len(unit.text)])
+                    out.append(merged)
+                    return
+    merged = _merge(last, item)
+    if merged is not None:
+        out[-1] = merged
+    else:
+        out.append(item)
+
+
+def _parts(node: Node):
+    """(átomo, mínimo, máximo, es_desnudo) de un nodo, o None si no aplica."""
+    if type(node) is Repeat:
+        if type(node.child) is not Repeat and _is_atom(node.child):
+            quantifier = node.quantifier
+            return node.child, quantifier.min, quantifier.max, False
+        return None
+    if _is_atom(node):
+        return node, 1, 1, True
+    return None
+
+
+def _merge(left: Node, right: Node):
+    """Combina dos nodos consecutivos sobre el mismo átomo (o None)."""
+    a, b = _parts(left), _parts(right)
+    if a is None or b is None:
+        return None
+    atom, a_min, a_max, a_bare = a
+    if not _same_atom(atom, b[0]):
+        return None
+    _, b_min, b_max, _ = b
+    bracketed = type(atom) is CharClass and atom.bracketed
+
+    # [c][c] → [c]{2}, [c]{m}[c]{n} → [c]{m+n}
+    if bracketed and a_min == a_max and b_min == b_max:
+        return _repeat(atom, _quantifier(a_min + b_min, a_min + b_min))
+    # A A* → A+
+    if a_bare and (b_min, b_max) == (0, None):
+        return _repeat(atom, _quantifier(1, None))
+    # A A+ → A{2,}
+    if a_bare and (b_min, b_max) == (1, None) and (bracketed or type(atom) is Group):
+        return _repeat(atom, _quantifier(2, None))
+    # [c]{m}[c]* → [c]{m,}
+    if bracketed and a_min == a_max and (b_min, b_max) == (0, None):
+        return _repeat(atom, _quantifier(a_min, None))
+    return None
+
+
+def _same_atom(a: Node, b: Node) -> bool:
+    """True si dos átomos se serializan igual."""
+    if a is b:
+        return True
+    kind = type(a)
+    if kind is not type(b):
+        return False
+    if kind is CharClass:
+        return a.body == b.body and a.negated == b.negated and a.bracketed == b.bracketed
+    if kind is Literal:
+        return a.text == b.text
+    return to_regex(a) == to_regex(b)
+
+
+def _is_atom(node: Node) -> bool:
+    """True si un cuantificador detrás de `node` se aplica a todo el nodo."""
+    kind = type(node)
+    if kind is CharClass or kind is Group:
+        return True
+    if kind is Literal:
+        text = node.text
+        return (len(text) == 1 and text.isalnum()) or (len(text) == 2 and text[0] == "\\")
+    return False
+
+
+def _quantifier(low: int, high: int | None) -> Quantifier:
+    """Cuantificador con su forma textual más corta."""
+    if (low, high) == (0, 1):
+        return Quantifier(0, 1, "?")
+    if high is None:
+        text = {0: "*", 1: "+"}.get(low, f"{{{low},}}")
+    elif low == high:
+        text = f"{{{low}}}"
+    else:
+        text = f"{{{low},{high}}}"
+    return Quantifier(low, high, text)
+
+
+def _repeat(child: Node, quantifier: Quantifier) -> Repeat:
+    """`Repeat` con la forma canónica [A-Za-z]+ para la clase de letras."""
+    if (
+        quantifier.text == "+"
+        and type(child) is CharClass
+        and child.bracketed
+        and not child.negated
+        and child.body == _LETTERS
+    ):
+        child = CharClass(_LETTERS_CANONICAL)
+    return Repeat(child, quantifier)
+
+
+def _canonical_class(node: CharClass) -> CharClass:
+    """Ordena y deduplica las clases formadas solo por letras/dígitos."""
+    body = node.body
+    if body.isalnum() and body.isascii() and node.bracketed and not node.negated:
+        chars = "".join(sorted(set(body)))
+        if chars != body:
+            return CharClass(chars)
+    return node
+
+
+def _class_chars(node: Node):
+    """Conjunto de caracteres de una clase o literal simple, o None."""
+    if type(node) is Literal:
+        text = node.text
+        if len(text) == 1 and text.isascii() and text.isalnum():
+            return {text}
+        return None
+    if type(node) is not CharClass or not node.bracketed or node.negated:
+        return None
+    body = node.body
+    if not _SIMPLE_CLASS_RE.fullmatch(body):
+        return None
+    chars = set()
+    i = 0
+    while i < len(body):
+        if i + 2 < len(body) and body[i + 1] == "-":
+            chars.update(chr(c) for c in range(ord(body[i]), ord(body[i + 2]) + 1))
+            i += 3
+        else:
+            chars.add(body[i])
+            i += 1
+    return chars
+
+
+def _class_piece(node: Node):
+    """
+    Cómo entra `node` en una clase de caracteres: (conjunto de letras y
+    dígitos, fragmento de cuerpo extra o None), o None si `node` no es un
+    único carácter de una clase (literales de varios caracteres, ".",
+    clases negadas...).
+    """
+    chars = _class_chars(node)
+    if chars is not None:
+        return chars, None
+    if type(node) is Literal:
+        text = node.text
+        if len(text) == 1 and (text.isalnum() or text in _CLASS_SAFE_CHARS):
+            return set(), text
+        if len(text) == 2 and text[0] == "\\" and not text[1].isalnum():
+            return set(), text
+        return None
+    if type(node) is not CharClass or node.negated:
+        return None
+    body = node.body
+    if not node.bracketed:
+        return (set(), body) if body in _CLASS_SHORTHANDS else None
+    # Un cuerpo que empieza por "]", "^" o "-", o acaba en "-", cambia de
+    # significado al concatenarlo con otro
+    if body.startswith(("]", "^", "-")) or (body.endswith("-") and not body.endswith("\\-")):
+        return None
+    return set(), body
+
+
+def _class_body(chars) -> str:
+    """Cuerpo de clase para letras/dígitos: tramos de 3 o más como rango ("0-9")."""
+    codes = sorted(map(ord, chars))
+    parts = []
+    i = 0
+    while i < len(codes):
+        j = i
+        while j + 1 < len(codes) and codes[j + 1] == codes[j] + 1:
+            j += 1
+        if j - i >= 2:
+            parts.append(f"{chr(codes[i])}-{chr(codes[j])}")
+        else:
+            parts.extend(chr(c) for c in codes[i:j + 1])
+        i = j + 1
+    return "".join(parts)
+
+
+def _merge_class_run(branches, pieces) -> Node:
+    """Une ramas consecutivas de un solo carácter en un único nodo."""
+    if all(type(branch) is Literal and extra is None
+           for branch, (_, extra) in zip(branches, pieces)):
+        chars = set().union(*(chars for chars, _ in pieces))
+        return CharClass("".join(sorted(chars)))
+    union = set().union(*(chars for chars, _ in pieces))
+    extras = list(dict.fromkeys(extra for _, extra in pieces if extra is not None))
+    if not extras:
+        # Una de las ramas ya contiene a todas las demás: ([0-9]|[1-9])
+        for branch, (chars, _) in zip(branches, pieces):
+            if chars == union:
+                return branch
+    return CharClass(_class_body(union) + "".join(extras))
+
+
+def _alt_to_class(alt: Alt):
+    """
+    Une en una clase las ramas consecutivas que son un solo carácter o una
+    clase: (a|b|c) → [abc], ([0-9]|[a-zA-Z]|\\s) → [0-9A-Za-z\\s]. Si una
+    rama ya contiene a las demás, se queda esa rama: ([0-9]|[1-9]) → [0-9].
+
+    Solo se unen ramas vecinas, así que el orden en que se prueban las
+    alternativas no cambia: (ab|c|d) → (ab|[cd]), pero (c|ab|d) se queda
+    igual. Devuelve el nodo que sustituye al grupo, una `Alt` con las
+    ramas que quedan si solo se ha unido una parte, o None si no hay nada
+    que unir.
+    """
+    branches = alt.branches
+    pieces = [_class_piece(branch) for branch in branches]
+    merged = []
+    changed = False
+    i = 0
+    while i < len(branches):
+        j = i
+        while j < len(branches) and pieces[j] is not None:
+            j += 1
+        if j - i >= 2:
+            merged.append(_merge_class_run(branches[i:j], pieces[i:j]))
+            changed = True
+        else:
+            merged.extend(branches[i:max(j, i + 1)])
+        i = max(j, i + 1)
+    if not changed:
+        return None
+    if len(merged) == 1:
+        return merged[0]
+    return Alt(merged)
+
+
+def _literal_units(node: Node):
+    """Unidades (caracteres o escapes) de un literal de texto fijo, o None."""
+    if type(node) is not Literal:
+        return None
+    units = _LITERAL_UNIT_RE.findall(node.text)
+    for unit in units:
+        if len(unit) == 2 and unit[1].isalnum():
+            return None         # \b, \1...: no es un carácter fijo
+        if len(unit) == 1 and unit in _REGEX_SPECIAL:
+            return None
+    return tuple(units)
+
+
+def _common_prefix(words) -> int:
+    """Número de unidades iniciales comunes a todas las palabras."""
+    shortest = min(words, key=len)
+    for i, unit in enumerate(shortest):
+        if any(word[i] != unit for word in words):
+            return i
+    return len(shortest)
+
+
+def _common_suffix(words) -> int:
+    """Número de unidades finales comunes a todas las palabras."""
+    shortest = min(words, key=len)
+    for i in range(1, len(shortest) + 1):
+        unit = shortest[-i]
+        if any(word[-i] != unit for word in words):
+            return i - 1
+    return len(shortest)
+
+
+# Caracteres no ASCII que `re.IGNORECASE` iguala a una letra ASCII
+_ASCII_FOLDS = {"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"}
+
+
+def _fold_key(unit: str):
+    """
+    Clave del primer carácter de un literal: dos claves distintas no
+    coinciden ni con `re.IGNORECASE`. Lo ASCII va en minúscula (İ, ı, ſ y
+    K con su letra ASCII); el resto de lo no ASCII comparte una sola
+    clave, None.
+    """
+    ch = unit[-1] if len(unit) > 1 and unit[0] == "\\" else unit
+    if not ch.isascii():
+        return _ASCII_FOLDS.get(ch)
+    return ch.lower()
+
+
+def _factor_literals(branches):
+    """
+    Factoriza prefijos y sufijos comunes de una alternativa cuyas ramas son
+    todas texto fijo, en forma de trie: hello|help|helm|world →
+    hel(?:lo|[pm])|world. Devuelve None si alguna rama no es un literal.
+
+    La regex resultante prueba las mismas alternativas en el mismo orden:
+      - P(?:a|b) y (?:a|b)S equivalen a Pa|Pb y aS|bS.
+      - Dos literales cuyos primeros caracteres no son iguales ni siquiera
+        con `re.IGNORECASE` no pueden coincidir en la misma posición, así
+        que se pueden agrupar y ordenar por `_fold_key` del primer carácter
+        sin cambiar el resultado, con o sin ese flag (la regex simplificada
+        se compila con los flags que pida quien llama). Dentro de un mismo
+        `_fold_key` (`ab|A`) las ramas no cambian de orden y solo se
+        factorizan las vecinas con el mismo primer carácter. La palabra
+        vacía (el fin de una palabra que es prefijo de otras) no se mueve:
+        corta el tramo que se puede reordenar.
+      - Una repetición posterior de la misma palabra nunca se elige, y se
+        quita.
+
+    El trie se construye sin recursión: primero se reparten las palabras
+    en nodos (preorden) y después se construye la IR de abajo arriba.
+    """
+    if len(branches) < 2:
+        return None
+    words = []
+    for branch in branches:
+        units = _literal_units(branch)
+        if units is None:
+            return None
+        words.append(units)
+    words = list(dict.fromkeys(words))
+    if len(words) == 1:
+        return Literal("".join(words[0]))
+
+    # Cada nodo del trie: [palabras, prefijo, sufijo, partes, nodo IR]. Las
+    # partes son palabras sueltas (tuplas) o nodos hijos (listas).
+    root = [words, (), (), None, None]
+    order = []
+    stack = [root]
+    while stack:
+        frame = stack.pop()
+        order.append(frame)
+        words = frame[0]
+        start = _common_prefix(words)
+        words = [word[start:] for word in words]
+        end = _common_suffix(words)
+        if end:
+            frame[2] = words[0][len(words[0]) - end:]
+            words = [word[:len(word) - end] for word in words]
+        frame[1] = frame[0][0][:start]
+        parts = []
+        groups = {}             # `_fold_key` del primer carácter → grupo del tramo
+        for word in words + [()]:
+            if not word:
+                # Fin de tramo: sus grupos no pueden coincidir a la vez y se
+                # pueden reordenar; los de un solo carácter van delante para
+                # unirse en una clase
+                segment = list(groups.values())
+                segment.sort(key=lambda group: len(group) > 1 or len(group[0]) > 1)
+                for group in segment:
+                    # Dentro del grupo, en orden: solo se juntan las vecinas
+                    # que empiezan por el mismo carácter
+                    runs = []
+                    for member in group:
+                        if runs and runs[-1][0][0] == member[0]:
+                            runs[-1].append(member)
+                        else:
+                            runs.append([member])
+                    parts.extend(runs)
+                parts.append(word)
+                groups = {}
+                continue
+            key = _fold_key(word[0])
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = []
+            group.append(word)
+        parts.pop()             # la palabra vacía añadida como centinela
+        for i, part in enumerate(parts):
+            if type(part) is list:
+                if len(part) == 1:
+                    parts[i] = part[0]
+                else:
+                    parts[i] = child = [part, (), (), None, None]
+                    stack.append(child)
+        frame[3] = parts
+
+    for frame in reversed(order):
+        _, prefix, suffix, parts, _ = frame
+        alternatives = [part[4] if type(part) is list else Literal("".join(part))
+                        for part in parts]
+        if not prefix and not suffix:
+            # Solo la raíz: el grupo que la contiene hace de paréntesis
+            frame[4] = Alt(alternatives)
+            continue
+        body = _alternation_atom(alternatives)
+        items = [Literal("".join(prefix))] if prefix else []
+        items.append(body)
+        if suffix:
+            items.append(Literal("".join(suffix)))
+        frame[4] = items[0] if len(items) == 1 else Concat(items)
+    return root[4]
+
+
+def _alternation_atom(alternatives) -> Node:
+    """
+    Alternativa lista para concatenarse: (?:a|b), una clase si se puede
+    ([pm]) y X? cuando la última rama es vacía: (?:lo|) → (?:lo)?.
+    """
+    optional = type(alternatives[-1]) is Literal and alternatives[-1].text == ""
+    if optional:
+        alternatives = alternatives[:-1]
+    node = alternatives[0] if len(alternatives) == 1 else Alt(alternatives)
+    if type(node) is Alt:
+        merged = _alt_to_class(node)
+        if merged is not None:
+            node = merged
+    if type(node) is Alt or (optional and not _is_atom(node)) or type(node) is Concat:
+        node = Group(node, capturing=False)
+    if optional:
+        node = Repeat(node, _quantifier(0, 1))
+    return node
+
+
+# ===============================================================
+#  OPTIMIZADOR TEXTUAL (PUNTO FIJO)
+# ===============================================================
 
-=======
+def simplify_regex_legacy(regex: str) -> str:
     """
-    Aplica iterativamente todas las simplificaciones definidas arriba
-    hasta alcanzar un punto fijo (cuando ya no hay cambios).
+    Versión textual anterior de `simplify_regex`: aplica iterativamente
+    todas las simplificaciones definidas arriba hasta alcanzar un punto
+    fijo (cuando ya no hay cambios). Se conserva como referencia para
+    `bench.py`.
 
     Orden aproximado:
       1. Simplificaciones sintácticas básicas (paréntesis, repeticiones).
@@ -402,4 +958,3 @@ def simplify_regex(regex: str) -> str:
         new = collapse_group_plus(new)
 
     return new
->>>>>>> c2e13238c6ee0f0eebeed2a6b7618046035fb593